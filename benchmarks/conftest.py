@@ -0,0 +1,137 @@
+import contextlib
+import functools
+import json
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator
+
+import httpx
+import pytest
+from anyio.from_thread import BlockingPortal, start_blocking_portal
+from datahub.ingestion.graph.client import DataHubGraph
+from datahub.ingestion.graph.config import DatahubClientConfig
+from datahub.ingestion.graph.links import make_url_for_urn
+from datahub.sdk.main_client import DataHubClient
+from fastmcp import Client
+
+os.environ["DATAHUB_TELEMETRY_ENABLED"] = "false"
+
+from gql_responses import (  # noqa: E402
+    get_entity_response,
+    scroll_across_entities_response,
+    search_across_lineage_graph_response,
+    search_across_lineage_response,
+)
+
+from mcp_server_datahub._graphql_client import AsyncGraphQLClient  # noqa: E402
+from mcp_server_datahub.mcp_server import (  # noqa: E402
+    _graphql_clients,
+    _is_datahub_cloud_by_graph,
+    mcp,
+    with_datahub_client,
+)
+
+
+@pytest.fixture(scope="session")
+def entity_response() -> Dict[str, Any]:
+    return get_entity_response(num_fields=5000)
+
+
+@pytest.fixture(scope="session")
+def lineage_response() -> Dict[str, Any]:
+    return search_across_lineage_response(num_results=30)
+
+
+@pytest.fixture(scope="session")
+def scroll_response() -> Dict[str, Any]:
+    return scroll_across_entities_response()
+
+
+@pytest.fixture(scope="session")
+def graphql_responses(
+    entity_response: Dict[str, Any],
+    lineage_response: Dict[str, Any],
+    scroll_response: Dict[str, Any],
+) -> Dict[str, bytes]:
+    """Serialized GMS responses, keyed by GraphQL operation name."""
+    return {
+        "GetEntity": json.dumps({"data": entity_response}).encode(),
+        "GetSchemaFields": json.dumps({"data": entity_response}).encode(),
+        "GetEntityLineage": json.dumps({"data": lineage_response}).encode(),
+        "GetEntityLineageGraph": json.dumps(
+            {"data": search_across_lineage_graph_response(num_results=30)}
+        ).encode(),
+        "search": json.dumps({"data": scroll_response}).encode(),
+    }
+
+
+@pytest.fixture
+def graphql_transport(graphql_responses: Dict[str, bytes]) -> httpx.MockTransport:
+    """Answers GraphQL requests in-process, by operation name."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        operation_name = json.loads(request.content)["operationName"]
+        return httpx.Response(
+            200,
+            content=graphql_responses[operation_name],
+            headers={"Content-Type": "application/json"},
+        )
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.fixture
+def datahub_client(graphql_transport: httpx.MockTransport) -> DataHubClient:
+    """A DataHub Cloud client whose GraphQL requests are answered in-process."""
+    graph = DataHubGraph(
+        DatahubClientConfig(server="http://localhost:8080", token="test-token")
+    )
+    _graphql_clients[graph] = AsyncGraphQLClient(graph, transport=graphql_transport)
+    _is_datahub_cloud_by_graph[graph] = True
+    graph.url_for = functools.partial(  # type: ignore[method-assign]
+        make_url_for_urn, "https://example.acryl.io"
+    )
+    return DataHubClient(graph=graph)
+
+
+class AsyncRunner:
+    """Runs coroutines on a long-lived event loop, so that benchmarks don't pay
+    for starting a new loop (and connection pool) on every iteration."""
+
+    def __init__(self, portal: BlockingPortal, client: DataHubClient) -> None:
+        self._portal = portal
+        self._client = client
+
+    def run(self, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        async def _run() -> Any:
+            with with_datahub_client(self._client):
+                return await fn(*args, **kwargs)
+
+        return self._portal.call(_run)
+
+
+@pytest.fixture
+def runner(datahub_client: DataHubClient) -> Iterator[AsyncRunner]:
+    with start_blocking_portal() as portal:
+        yield AsyncRunner(portal, datahub_client)
+
+
+@pytest.fixture
+def call_tool(
+    runner: AsyncRunner, datahub_client: DataHubClient
+) -> Iterator[Callable[..., Any]]:
+    """Calls a tool through an in-memory MCP client, like a real MCP client would."""
+
+    @contextlib.asynccontextmanager
+    async def _connect() -> AsyncIterator[Client]:
+        with with_datahub_client(datahub_client):
+            async with Client(mcp) as mcp_client:
+                yield mcp_client
+
+    with runner._portal.wrap_async_context_manager(_connect()) as mcp_client:
+
+        def _call_tool(name: str, **arguments: Any) -> Any:
+            result = runner._portal.call(mcp_client.call_tool, name, arguments)
+            assert not result.is_error, result
+            return result
+
+        yield _call_tool
@@ -0,0 +1,280 @@
+"""Synthetic GraphQL responses shaped like the ones returned by DataHub GMS.
+
+The responses mirror the selection sets in `gql/*.gql`, including the noise that
+real responses contain (`__typename` everywhere, explicit nulls, empty lists and
+HTML/markdown in descriptions), at sizes that we see on large deployments. They
+are generated deterministically so that benchmark runs are comparable.
+"""
+
+from typing import Any, Dict, List
+
+_PLATFORMS = ["snowflake", "bigquery", "looker", "dbt", "airflow", "tableau"]
+
+_DESCRIPTION = (
+    "<p>Contains one row per <b>order line</b>. Joined from the raw "
+    "<code>orders</code> and <code>order_items</code> tables.</p>\n\n"
+    "![lineage](data:image/png;base64," + "iVBORw0KGgo" * 40 + ")\n\n"
+    "See the [runbook](https://wiki.example.com/runbooks/orders) for details. "
+)
+
+
+def dataset_urn(i: int, platform: str = "snowflake") -> str:
+    return f"urn:li:dataset:(urn:li:dataPlatform:{platform},analytics.public.table_{i},PROD)"
+
+
+def _platform(name: str) -> Dict[str, Any]:
+    return {
+        "urn": f"urn:li:dataPlatform:{name}",
+        "name": name,
+        "properties": {
+            "displayName": name.title(),
+            "logoUrl": f"/assets/platforms/{name}logo.png",
+            "__typename": "DataPlatformProperties",
+        },
+        "__typename": "DataPlatform",
+    }
+
+
+def _owner(i: int) -> Dict[str, Any]:
+    return {
+        "owner": {
+            "urn": f"urn:li:corpuser:user{i}",
+            "type": "CORP_USER",
+            "username": f"user{i}",
+            "properties": {
+                "displayName": f"User {i}",
+                "email": f"user{i}@example.com",
+                "title": None,
+                "__typename": "CorpUserProperties",
+            },
+            "editableProperties": None,
+            "__typename": "CorpUser",
+        },
+        "ownershipType": {
+            "urn": "urn:li:ownershipType:__system__technical_owner",
+            "info": {"name": "Technical Owner", "__typename": "OwnershipTypeInfo"},
+            "__typename": "OwnershipTypeEntity",
+        },
+        "associatedUrn": None,
+        "__typename": "Owner",
+    }
+
+
+def _tags(names: List[str]) -> Dict[str, Any]:
+    return {
+        "tags": [
+            {
+                "tag": {
+                    "urn": f"urn:li:tag:{name}",
+                    "name": name,
+                    "properties": {
+                        "name": name,
+                        "colorHex": None,
+                        "__typename": "TagProperties",
+                    },
+                    "__typename": "Tag",
+                },
+                "associatedUrn": None,
+                "__typename": "TagAssociation",
+            }
+            for name in names
+        ],
+        "__typename": "GlobalTags",
+    }
+
+
+def _dataset_preview(i: int, platform: str = "snowflake") -> Dict[str, Any]:
+    return {
+        "urn": dataset_urn(i, platform),
+        "type": "DATASET",
+        "name": f"table_{i}",
+        "platform": _platform(platform),
+        "editableProperties": {
+            "name": None,
+            "description": _DESCRIPTION if i % 3 == 0 else None,
+            "__typename": "DatasetEditableProperties",
+        },
+        "properties": {
+            "name": f"table_{i}",
+            "description": _DESCRIPTION,
+            "customProperties": [
+                {
+                    "key": f"prop_{j}",
+                    "value": f"value_{j}",
+                    "__typename": "CustomProperty",
+                }
+                for j in range(5)
+            ],
+            "__typename": "DatasetProperties",
+        },
+        "ownership": {
+            "owners": [_owner(j) for j in range(3)],
+            "__typename": "Ownership",
+        },
+        "tags": _tags(["pii", "gold"]),
+        "glossaryTerms": {"terms": [], "__typename": "GlossaryTerms"},
+        "structuredProperties": None,
+        "subTypes": {"typeNames": ["Table"], "__typename": "SubTypes"},
+        "domain": None,
+        "dataProduct": None,
+        "deprecation": None,
+        "health": [],
+        "__typename": "Dataset",
+    }
+
+
+def _schema_field(i: int) -> Dict[str, Any]:
+    return {
+        "fieldPath": f"column_{i}",
+        "label": None,
+        "jsonPath": None,
+        "nullable": i % 2 == 0,
+        "description": _DESCRIPTION if i % 10 == 0 else f"Column {i} of the table.",
+        "type": "STRING",
+        "nativeDataType": "VARCHAR(16777216)",
+        "recursive": False,
+        "isPartOfKey": i == 0,
+        "isPartitioningKey": None,
+        "globalTags": _tags(["pii"]) if i % 7 == 0 else None,
+        "glossaryTerms": None,
+        "schemaFieldEntity": None,
+        "__typename": "SchemaField",
+    }
+
+
+def get_entity_response(num_fields: int = 5000) -> Dict[str, Any]:
+    """A `GetEntity` response for a dataset with `num_fields` columns."""
+    entity = _dataset_preview(0)
+    entity["schemaMetadata"] = {
+        "name": "analytics.public.table_0",
+        "platformSchema": {"schema": "", "__typename": "OtherSchema"},
+        "primaryKeys": ["column_0"],
+        "foreignKeys": [],
+        "fields": [_schema_field(i) for i in range(num_fields)],
+        "__typename": "SchemaMetadata",
+    }
+    entity["viewProperties"] = None
+    entity["status"] = {"removed": False, "__typename": "Status"}
+    return {"entity": entity}
+
+
+def _facets(num_facets: int, num_aggregations: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "field": f"facet_{i}",
+            "displayName": f"Facet {i}",
+            "aggregations": [
+                {
+                    "value": dataset_urn(j),
+                    "count": num_aggregations - j,
+                    "displayName": None,
+                    "entity": {
+                        "name": f"table_{j}",
+                        "properties": {
+                            "name": f"table_{j}",
+                            "__typename": "DatasetProperties",
+                        },
+                        "__typename": "Dataset",
+                    },
+                    "__typename": "AggregationMetadata",
+                }
+                for j in range(num_aggregations)
+            ],
+            "__typename": "FacetMetadata",
+        }
+        for i in range(num_facets)
+    ]
+
+
+def search_across_lineage_response(num_results: int = 30) -> Dict[str, Any]:
+    """A `GetEntityLineage` response with `num_results` related datasets."""
+    return {
+        "searchAcrossLineage": {
+            "total": num_results,
+            "facets": _facets(10, 3),
+            "searchResults": [
+                {
+                    # Numbered from 1, so that they're distinct from the
+                    # `dataset_urn(0)` that lineage is requested for.
+                    "entity": _dataset_preview(i + 1, _PLATFORMS[i % len(_PLATFORMS)]),
+                    "degree": 1 + i % 3,
+                    "__typename": "SearchAcrossLineageResult",
+                }
+                for i in range(num_results)
+            ],
+            "__typename": "SearchAcrossLineageResults",
+        }
+    }
+
+
+def search_across_lineage_graph_response(num_results: int = 30) -> Dict[str, Any]:
+    """A `GetEntityLineageGraph` response matching `search_across_lineage_response`.
+
+    Results form chains of up to 3 hops, so every lineage path only goes through
+    other results.
+    """
+    results = search_across_lineage_response(num_results)["searchAcrossLineage"][
+        "searchResults"
+    ]
+    root = {"urn": dataset_urn(0), "__typename": "Dataset"}
+    return {
+        "searchAcrossLineage": {
+            "total": num_results,
+            "searchResults": [
+                {
+                    "entity": {
+                        "urn": result["entity"]["urn"],
+                        "type": "DATASET",
+                        "name": result["entity"]["name"],
+                        "platform": {
+                            "name": result["entity"]["platform"]["name"],
+                            "__typename": "DataPlatform",
+                        },
+                        "__typename": "Dataset",
+                    },
+                    "degree": result["degree"],
+                    "paths": [
+                        {
+                            "path": [root]
+                            + [
+                                {"urn": r["entity"]["urn"], "__typename": "Dataset"}
+                                for r in results[i - result["degree"] + 1 : i + 1]
+                            ],
+                            "__typename": "EntityPath",
+                        }
+                    ],
+                    "__typename": "SearchAcrossLineageResult",
+                }
+                for i, result in enumerate(results)
+            ],
+            "__typename": "SearchAcrossLineageResults",
+        }
+    }
+
+
+def scroll_across_entities_response(
+    num_results: int = 10, num_facets: int = 25, num_aggregations: int = 20
+) -> Dict[str, Any]:
+    """A facet-heavy `search` (scrollAcrossEntities) response."""
+    return {
+        "scrollAcrossEntities": {
+            "count": num_results,
+            "total": 123456,
+            "searchResults": [
+                {
+                    "entity": {
+                        "urn": dataset_urn(i),
+                        "properties": {
+                            "name": f"table_{i}",
+                            "__typename": "DatasetProperties",
+                        },
+                        "__typename": "Dataset",
+                    },
+                    "__typename": "SearchResult",
+                }
+                for i in range(num_results)
+            ],
+            "facets": _facets(num_facets, num_aggregations),
+            "__typename": "ScrollResults",
+        }
+    }
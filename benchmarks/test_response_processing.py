@@ -0,0 +1,73 @@
+from typing import Any, Dict
+
+from gql_responses import _DESCRIPTION
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from mcp_server_datahub.mcp_server import (
+    DESCRIPTION_LENGTH_HARD_LIMIT,
+    _entity_response_processor,
+    _lineage_response_processor,
+    clean_gql_response,
+    sanitize_and_truncate_description,
+)
+
+
+def url_for(urn: str) -> str:
+    return f"https://example.acryl.io/{urn}"
+
+
+def test_clean_gql_response_entity(
+    benchmark: BenchmarkFixture, entity_response: Dict[str, Any]
+) -> None:
+    result = benchmark(clean_gql_response, entity_response["entity"])
+    assert len(result["schemaMetadata"]["fields"]) == 5000
+
+
+def test_clean_gql_response_lineage(
+    benchmark: BenchmarkFixture, lineage_response: Dict[str, Any]
+) -> None:
+    result = benchmark(clean_gql_response, lineage_response)
+    assert len(result["searchAcrossLineage"]["searchResults"]) == 30
+
+
+def test_clean_gql_response_scroll(
+    benchmark: BenchmarkFixture, scroll_response: Dict[str, Any]
+) -> None:
+    result = benchmark(clean_gql_response, scroll_response)
+    assert len(result["scrollAcrossEntities"]["facets"]) == 25
+
+
+def test_sanitize_and_truncate_description(benchmark: BenchmarkFixture) -> None:
+    result = benchmark(
+        sanitize_and_truncate_description, _DESCRIPTION, DESCRIPTION_LENGTH_HARD_LIMIT
+    )
+    assert "base64" not in result
+
+
+def test_sanitize_and_truncate_huge_description(benchmark: BenchmarkFixture) -> None:
+    # Descriptions pasted from documents can be huge, with inline images.
+    description = _DESCRIPTION * 500
+    result = benchmark(
+        sanitize_and_truncate_description, description, DESCRIPTION_LENGTH_HARD_LIMIT
+    )
+    assert len(result) == DESCRIPTION_LENGTH_HARD_LIMIT
+
+
+def test_process_entity_response(
+    benchmark: BenchmarkFixture, entity_response: Dict[str, Any]
+) -> None:
+    result = benchmark(
+        _entity_response_processor.process, entity_response["entity"], url_for=url_for
+    )
+    assert result["url"]
+
+
+def test_process_lineage_response(
+    benchmark: BenchmarkFixture, lineage_response: Dict[str, Any]
+) -> None:
+    lineage = {
+        "upstreams": lineage_response["searchAcrossLineage"],
+        "downstreams": lineage_response["searchAcrossLineage"],
+    }
+    result = benchmark(_lineage_response_processor.process, lineage, url_for=url_for)
+    assert result["upstreams"]["searchResults"][0]["entity"]["url"]
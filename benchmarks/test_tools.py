@@ -0,0 +1,116 @@
+import json
+from typing import Any, Callable
+
+import httpx
+import pytest
+from conftest import AsyncRunner
+from datahub.sdk.main_client import DataHubClient
+from gql_responses import dataset_urn
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from mcp_server_datahub._graphql_client import AsyncGraphQLClient
+from mcp_server_datahub.mcp_server import (
+    _entity_cache,
+    _graphql_clients,
+    _lineage_cache,
+    _search_cache,
+    get_entity,
+    get_lineage,
+    get_schema_fields,
+)
+
+
+def test_get_entity(benchmark: BenchmarkFixture, runner: AsyncRunner) -> None:
+    def _get_entity() -> Any:
+        # Measure the uncached path.
+        _entity_cache.clear()
+        return runner.run(get_entity.fn, dataset_urn(0))
+
+    result = benchmark(_get_entity)
+    # Only the first fields are included, the rest are paged with get_schema_fields.
+    assert len(result["schemaMetadata"]["fields"]) == 100
+    assert result["schemaMetadata"]["totalFields"] == 5000
+
+
+def test_get_entity_streaming_parse(
+    benchmark: BenchmarkFixture,
+    runner: AsyncRunner,
+    datahub_client: DataHubClient,
+    graphql_transport: httpx.MockTransport,
+) -> None:
+    # Streaming parsing needs the optional ijson dependency.
+    pytest.importorskip("ijson")
+    graph = datahub_client._graph
+    _graphql_clients[graph] = AsyncGraphQLClient(
+        graph, streaming_parse=True, transport=graphql_transport
+    )
+    assert _graphql_clients[graph].streaming_parse
+
+    def _get_entity() -> Any:
+        _entity_cache.clear()
+        return runner.run(get_entity.fn, dataset_urn(0))
+
+    result = benchmark(_get_entity)
+    assert result["schemaMetadata"]["totalFields"] == 5000
+
+
+def test_get_schema_fields(benchmark: BenchmarkFixture, runner: AsyncRunner) -> None:
+    def _get_schema_fields() -> Any:
+        # Measure the uncached path.
+        _entity_cache.clear()
+        return runner.run(
+            get_schema_fields.fn,
+            dataset_urn(0),
+            start=100,
+            count=100,
+            pattern="column_1",
+        )
+
+    result = benchmark(_get_schema_fields)
+    # column_1, column_10..19, column_100..199 and column_1000..1999 match.
+    assert result["total"] == 1111
+    assert len(result["fields"]) == 100
+
+
+def test_get_lineage(benchmark: BenchmarkFixture, runner: AsyncRunner) -> None:
+    result = benchmark(runner.run, get_lineage.fn, dataset_urn(0), column=None)
+    assert len(result["upstreams"]["searchResults"]) == 30
+
+
+def test_get_lineage_graph(benchmark: BenchmarkFixture, runner: AsyncRunner) -> None:
+    def _get_lineage_graph() -> Any:
+        # Measure the uncached path.
+        _lineage_cache.clear()
+        return runner.run(get_lineage.fn, dataset_urn(0), column=None, format="graph")
+
+    result = benchmark(_get_lineage_graph)
+    assert len(result["nodes"]) == 31
+    assert len(result["edges"]) == 30
+
+    full = runner.run(get_lineage.fn, dataset_urn(0), column=None)
+    # The graph format is meant to be several times smaller.
+    assert len(json.dumps(full)) > 5 * len(json.dumps(result))
+
+
+def test_search_tool_call(
+    benchmark: BenchmarkFixture, call_tool: Callable[..., Any]
+) -> None:
+    def _search() -> Any:
+        # Measure the uncached path.
+        _search_cache.clear()
+        return call_tool("search", query="orders")
+
+    result = benchmark(_search)
+    assert len(result.structured_content["facets"]) == 25
+
+
+def test_fetch_tool_call(
+    benchmark: BenchmarkFixture, call_tool: Callable[..., Any]
+) -> None:
+    def _fetch() -> Any:
+        _entity_cache.clear()
+        return call_tool("fetch", id=dataset_urn(0))
+
+    result = benchmark(_fetch)
+    document = json.loads(result.content[0].text)
+    assert document["id"] == dataset_urn(0)
@@ -1,5 +1,6 @@
 import logging
 
+import anyio
 import click
 from datahub.ingestion.graph.config import ClientMode
 from datahub.sdk.main_client import DataHubClient
@@ -9,7 +10,11 @@ from typing_extensions import Literal
 
 from mcp_server_datahub._telemetry import TelemetryMiddleware
 from mcp_server_datahub._version import __version__
-from mcp_server_datahub.mcp_server import mcp, with_datahub_client
+from mcp_server_datahub.mcp_server import (
+    close_graphql_clients,
+    mcp,
+    with_datahub_client,
+)
 
 logging.basicConfig(level=logging.INFO)
 
@@ -41,14 +46,25 @@ def main(transport: Literal["stdio", "sse", "http"], debug: bool) -> None:
     mcp.add_middleware(TelemetryMiddleware())
 
     with with_datahub_client(client):
-        if transport == "http":
-            mcp.run(transport=transport, show_banner=False, stateless_http=True)
-        else:
-            mcp.run(transport=transport, show_banner=False)
+        anyio.run(_run, transport)
         mcp.remove_tool("get_entity")
         mcp.remove_tool("get_dataset_queries")
         mcp.remove_tool("get_lineage")
 
 
+async def _run(transport: Literal["stdio", "sse", "http"]) -> None:
+    # Equivalent to mcp.run, but closes the GraphQL connection pools on shutdown,
+    # while the event loop they were used on is still running.
+    try:
+        if transport == "http":
+            await mcp.run_async(
+                transport=transport, show_banner=False, stateless_http=True
+            )
+        else:
+            await mcp.run_async(transport=transport, show_banner=False)
+    finally:
+        await close_graphql_clients()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,131 @@
+import collections
+import dataclasses
+import threading
+import time
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    entries: int
+    bytes: int
+
+
+class TTLCache(Generic[_K, _V]):
+    """A thread-safe LRU cache with a per-entry TTL and entry/byte bounds.
+
+    Entries are evicted in least-recently-used order whenever either `max_entries`
+    or `max_bytes` would be exceeded. The size of each entry is computed by `sizeof`,
+    which defaults to counting every entry as zero bytes.
+
+    A `ttl_seconds` of None means entries never expire. A cache with
+    `max_entries <= 0` or `ttl_seconds == 0` is disabled and never stores anything.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: Optional[float],
+        max_entries: int,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[_V], int] = lambda _: 0,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._timer = timer
+
+        self._lock = threading.Lock()
+        # Maps key -> (expires_at, size, value), in least-recently-used order.
+        self._entries: collections.OrderedDict[_K, Tuple[float, int, _V]] = (
+            collections.OrderedDict()
+        )
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds != 0
+
+    def get(self, key: _K) -> Optional[_V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            expires_at, _, value = entry
+            if expires_at <= self._timer():
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: _K, value: _V) -> None:
+        if not self.enabled:
+            return
+
+        size = self._sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Never cache something that would evict everything else.
+            return
+
+        expires_at = (
+            self._timer() + self.ttl_seconds
+            if self.ttl_seconds is not None
+            else float("inf")
+        )
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, size, value)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._evictions += 1
+
+    def invalidate(self, key: _K) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                entries=len(self._entries),
+                bytes=self._bytes,
+            )
+
+    def _remove(self, key: _K) -> None:
+        # Caller must hold the lock.
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
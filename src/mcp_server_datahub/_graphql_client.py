@@ -0,0 +1,328 @@
+import hashlib
+import importlib
+import importlib.util
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import anyio
+import httpx
+from datahub.configuration.common import GraphError, OperationalError
+from datahub.ingestion.graph.client import DataHubGraph
+from loguru import logger
+
+# Mirrors the backoff used by the DataHub SDK's requests session.
+_RETRY_BACKOFF_FACTOR = 2
+
+# Error messages used by the automatic persisted queries protocol.
+_PERSISTED_QUERY_NOT_FOUND = "PersistedQueryNotFound"
+_PERSISTED_QUERY_NOT_SUPPORTED = "PersistedQueryNotSupported"
+# Client errors that don't mean that a request without query text was rejected.
+_AUTH_STATUS_CODES = {401, 403, 429}
+# Client errors that mean that the server doesn't accept requests without query
+# text at all, rather than just this one.
+_UNSUPPORTED_STATUS_CODES = {404, 405}
+
+# ijson is used to parse responses as they are received. It's an optional
+# dependency: install mcp-server-datahub[streaming].
+_ijson: Any = (
+    importlib.import_module("ijson") if importlib.util.find_spec("ijson") else None
+)
+
+
+class AsyncGraphQLClient:
+    """Executes GraphQL requests against DataHub using a pooled async HTTP client.
+
+    This is an async replacement for `DataHubGraph.execute_graphql`. It reuses the
+    graph's server url, auth headers, TLS settings and retry configuration, but sends
+    requests over an `httpx.AsyncClient`, so that concurrent tool calls are bounded by
+    the connection pool instead of by a worker thread pool.
+
+    When `persisted_queries` is enabled, requests use the automatic persisted
+    queries protocol: only the sha256 hash of the query is sent, and the full query
+    text is sent only if the server does not know the hash yet. If the server does
+    not support persisted queries, the client falls back to always sending the full
+    query text.
+
+    When `streaming_parse` is enabled, responses are parsed while they are received,
+    instead of being buffered and then parsed. Responses of requests that allow it
+    are also cleaned while they are parsed. Together, this means that a large
+    response is never held in memory more than once, at the cost of slower parsing.
+    Otherwise, responses of at least `thread_parse_min_bytes` bytes are parsed in a
+    worker thread, so that parsing them doesn't block the event loop.
+    """
+
+    def __init__(
+        self,
+        graph: DataHubGraph,
+        *,
+        max_connections: int = 100,
+        timeout: Optional[float] = None,
+        http2: bool = False,
+        persisted_queries: bool = False,
+        streaming_parse: bool = False,
+        thread_parse_min_bytes: int = 256 * 1024,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.url = f"{graph._gms_server}/api/graphql"
+
+        session = graph._session
+        session_config = graph._session_config
+        self._retry_status_codes = set(session_config.retry_status_codes)
+        self._retry_max_times = session_config.retry_max_times
+
+        self.persisted_queries = persisted_queries
+        self._query_hashes: Dict[str, str] = {}
+
+        default_timeout: Union[None, float, tuple]
+        if timeout is not None:
+            default_timeout = timeout
+        else:
+            default_timeout = session_config.timeout
+
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning(
+                "HTTP/2 was requested for GraphQL requests, but the h2 package "
+                "is not installed. Falling back to HTTP/1.1. "
+                "Install mcp-server-datahub[http2] to enable it."
+            )
+            http2 = False
+
+        if streaming_parse and _ijson is None:
+            logger.warning(
+                "Streaming parsing of GraphQL responses was requested, but the ijson "
+                "package is not installed. Falling back to buffered parsing. "
+                "Install mcp-server-datahub[streaming] to enable it."
+            )
+            streaming_parse = False
+        self.streaming_parse = streaming_parse
+        self.thread_parse_min_bytes = thread_parse_min_bytes
+
+        self._client = httpx.AsyncClient(
+            headers=dict(session.headers),
+            verify=session.verify,
+            cert=session.cert,
+            http2=http2,
+            timeout=_make_timeout(default_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            transport=transport,
+        )
+
+    async def execute(
+        self,
+        query: str,
+        *,
+        variables: Optional[Dict[str, Any]] = None,
+        operation_name: Optional[str] = None,
+        timeout: Optional[float] = None,
+        clean: bool = False,
+    ) -> Dict[str, Any]:
+        """Execute a GraphQL request and return its data.
+
+        `clean` allows the `clean_gql_response` rules to be applied to the values of
+        the data while the response is parsed. This only happens with streaming
+        parsing, so callers still have to clean the response themselves.
+        """
+        body: Dict[str, Any] = {}
+        if variables:
+            body["variables"] = variables
+        if operation_name:
+            body["operationName"] = operation_name
+
+        logger.debug(f"Executing {operation_name or ''} graphql query")
+        if self.persisted_queries:
+            result = await self._post_persisted(
+                query, body, timeout=timeout, clean=clean
+            )
+        else:
+            result = await self._post(
+                {**body, "query": query}, timeout=timeout, clean=clean
+            )
+        if result.get("errors"):
+            raise GraphError(f"Error executing graphql query: {result['errors']}")
+
+        return result["data"]
+
+    def _query_hash(self, query: str) -> str:
+        query_hash = self._query_hashes.get(query)
+        if query_hash is None:
+            query_hash = hashlib.sha256(query.encode("utf-8")).hexdigest()
+            self._query_hashes[query] = query_hash
+        return query_hash
+
+    async def _post_persisted(
+        self,
+        query: str,
+        body: Dict[str, Any],
+        *,
+        timeout: Optional[float],
+        clean: bool,
+    ) -> Dict[str, Any]:
+        extensions = {
+            "persistedQuery": {"version": 1, "sha256Hash": self._query_hash(query)}
+        }
+        try:
+            result = await self._post(
+                {**body, "extensions": extensions}, timeout=timeout, clean=clean
+            )
+        except OperationalError as e:
+            status_code = _rejected_status_code(e)
+            if status_code is None:
+                raise
+            # Servers that don't implement the protocol at all may reject requests
+            # without query text, instead of answering with an error. Only a
+            # 404 or 405 tells us for sure; other client errors may be specific to
+            # this request, so we just retry it with the query text.
+            message = (
+                _PERSISTED_QUERY_NOT_SUPPORTED
+                if status_code in _UNSUPPORTED_STATUS_CODES
+                else _PERSISTED_QUERY_NOT_FOUND
+            )
+            result = {"errors": [{"message": message}]}
+
+        error_messages = {error.get("message") for error in result.get("errors") or []}
+        if _PERSISTED_QUERY_NOT_SUPPORTED in error_messages:
+            logger.warning(
+                "DataHub does not support persisted GraphQL queries. "
+                "Falling back to sending full query text."
+            )
+            self.persisted_queries = False
+            return await self._post(
+                {**body, "query": query}, timeout=timeout, clean=clean
+            )
+        if _PERSISTED_QUERY_NOT_FOUND in error_messages:
+            # Register the query under its hash and execute it in one request.
+            return await self._post(
+                {**body, "query": query, "extensions": extensions},
+                timeout=timeout,
+                clean=clean,
+            )
+        return result
+
+    async def _post(
+        self, body: Dict[str, Any], *, timeout: Optional[float], clean: bool = False
+    ) -> Dict[str, Any]:
+        extra: Dict[str, Any] = {}
+        if timeout is not None:
+            extra["timeout"] = _make_timeout(timeout)
+
+        attempt = 0
+        while True:
+            try:
+                async with self._client.stream(
+                    "POST", self.url, json=body, **extra
+                ) as response:
+                    if (
+                        response.status_code not in self._retry_status_codes
+                        or attempt >= self._retry_max_times
+                    ):
+                        return await self._read(response, clean=clean)
+            except httpx.TransportError as e:
+                # Connection failures and timeouts are retried like retryable
+                # status codes, as the DataHub SDK's requests session does.
+                if attempt >= self._retry_max_times:
+                    raise
+                logger.debug(f"Retrying GraphQL request after {e!r}")
+            await anyio.sleep(_RETRY_BACKOFF_FACTOR * (2**attempt))
+            attempt += 1
+
+    async def _read(self, response: httpx.Response, *, clean: bool) -> Dict[str, Any]:
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            await response.aread()
+            try:
+                info = response.json()
+            except ValueError:
+                info = {"message": str(e)}
+            raise OperationalError("Unable to get metadata from DataHub", info) from e
+
+        if not self.streaming_parse:
+            content = await response.aread()
+            if len(content) >= self.thread_parse_min_bytes:
+                return await anyio.to_thread.run_sync(response.json)
+            return response.json()
+
+        builder = _ResponseBuilder(clean=clean)
+        parser = _ijson.basic_parse_coro(builder, use_float=True)
+        async for chunk in response.aiter_bytes():
+            parser.send(chunk)
+        parser.close()
+        return builder.result
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class _ResponseBuilder:
+    """Builds a GraphQL response from ijson parse events.
+
+    With `clean`, the `clean_gql_response` rules are applied to the values of
+    `data` while they are built: `__typename` keys and keys whose value is null,
+    an empty list or an empty object (after cleaning) are dropped. `data` itself
+    and the rest of the response are left as they are, so that e.g. `data.entity`
+    is still present when the entity doesn't exist.
+    """
+
+    def __init__(self, *, clean: bool) -> None:
+        self.result: Any = None
+        self._clean = clean
+        # The containers being built, innermost last, with the pending key of each
+        # object and whether each container is cleaned.
+        self._containers: List[Any] = []
+        self._keys: List[Optional[str]] = []
+        self._cleaned: List[bool] = []
+
+    def send(self, event: Tuple[str, Any]) -> None:
+        kind, value = event
+        if kind == "map_key":
+            self._keys[-1] = value
+        elif kind == "start_map" or kind == "start_array":
+            containers = self._containers
+            depth = len(containers)
+            if depth > 2:
+                cleaned = self._cleaned[-1]
+            else:
+                cleaned = depth == 2 and self._clean and self._keys[0] == "data"
+            containers.append({} if kind == "start_map" else [])
+            self._keys.append(None)
+            self._cleaned.append(cleaned)
+        elif kind == "end_map" or kind == "end_array":
+            container = self._containers.pop()
+            self._keys.pop()
+            self._cleaned.pop()
+            if not self._containers:
+                self.result = container
+            elif type(self._containers[-1]) is list:
+                self._containers[-1].append(container)
+            else:
+                key = self._keys[-1]
+                if not (self._cleaned[-1] and (not container or key == "__typename")):
+                    self._containers[-1][key] = container
+        elif not self._containers:
+            self.result = value
+        elif type(self._containers[-1]) is list:
+            self._containers[-1].append(value)
+        else:
+            key = self._keys[-1]
+            if not (self._cleaned[-1] and (value is None or key == "__typename")):
+                self._containers[-1][key] = value
+
+
+def _rejected_status_code(error: OperationalError) -> Optional[int]:
+    """Return the status code of a client error that rejected the request itself."""
+    cause = error.__cause__
+    if not isinstance(cause, httpx.HTTPStatusError):
+        return None
+    status_code = cause.response.status_code
+    if 400 <= status_code < 500 and status_code not in _AUTH_STATUS_CODES:
+        return status_code
+    return None
+
+
+def _make_timeout(timeout: Union[None, float, tuple]) -> httpx.Timeout:
+    if isinstance(timeout, tuple):
+        connect_timeout, read_timeout = timeout
+        return httpx.Timeout(read_timeout, connect=connect_timeout)
+    return httpx.Timeout(timeout)
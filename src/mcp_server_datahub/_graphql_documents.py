@@ -0,0 +1,121 @@
+import re
+from typing import Dict, List, Optional, Set
+
+# Block strings, strings, comments, whitespace and everything else.
+_TOKEN_RE = re.compile(r'"""[\s\S]*?"""|"(?:\\.|[^"\\])*"|#[^\n]*|\s+|[^\s"#]+')
+_DEFINITION_RE = re.compile(
+    r"(?:(fragment)\s+([_A-Za-z]\w*)|(?:query|mutation|subscription)\s+([_A-Za-z]\w*))"
+)
+_FRAGMENT_SPREAD_RE = re.compile(r"\.\.\.\s*(?!on\b)([_A-Za-z]\w*)")
+_WORD_CHARS = frozenset(
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$."
+)
+
+
+class _Definition:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.is_fragment = False
+        self.name: Optional[str] = None
+
+        match = _DEFINITION_RE.match(text)
+        if match:
+            self.is_fragment = match.group(1) is not None
+            self.name = match.group(2) or match.group(3)
+
+        self.fragment_refs = _FRAGMENT_SPREAD_RE.findall(_strip_strings(text))
+
+
+def minify_document(document: str) -> str:
+    """Strip comments and insignificant whitespace from a GraphQL document."""
+    out: List[str] = []
+    pending_space = False
+    for token in _TOKEN_RE.findall(document):
+        if token[0] == "#" or token.isspace():
+            pending_space = True
+        else:
+            if (
+                pending_space
+                and out
+                and out[-1][-1] in _WORD_CHARS
+                and token[0] in _WORD_CHARS
+            ):
+                out.append(" ")
+            out.append(token)
+            pending_space = False
+    return "".join(out)
+
+
+def split_document(document: str) -> Dict[str, str]:
+    """Split a GraphQL document into one minimal document per named operation.
+
+    Each resulting document contains the operation plus only the fragments that it
+    transitively references, in their original order. Comments and insignificant
+    whitespace are removed.
+    """
+    definitions = [_Definition(text) for text in _split_definitions(document)]
+    fragments = {d.name: d for d in definitions if d.is_fragment and d.name}
+
+    documents: Dict[str, str] = {}
+    for operation in definitions:
+        if operation.is_fragment or operation.name is None:
+            continue
+
+        used: Set[str] = set()
+        stack = list(operation.fragment_refs)
+        while stack:
+            name = stack.pop()
+            if name in used:
+                continue
+            if name not in fragments:
+                raise ValueError(
+                    f"Operation {operation.name} references unknown fragment {name}"
+                )
+            used.add(name)
+            stack.extend(fragments[name].fragment_refs)
+
+        documents[operation.name] = " ".join(
+            [operation.text]
+            + [d.text for d in definitions if d.is_fragment and d.name in used]
+        )
+    return documents
+
+
+def _split_definitions(document: str) -> List[str]:
+    text = minify_document(document)
+
+    definitions: List[str] = []
+    start = 0
+    brace_depth = 0
+    paren_depth = 0
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == '"':
+            # Skip over string literals, which may contain braces.
+            match = _TOKEN_RE.match(text, i)
+            assert match is not None
+            i = match.end()
+            continue
+        if char == "(":
+            paren_depth += 1
+        elif char == ")":
+            paren_depth -= 1
+        elif char == "{":
+            brace_depth += 1
+        elif char == "}":
+            brace_depth -= 1
+            if brace_depth == 0 and paren_depth == 0:
+                definitions.append(text[start : i + 1].strip())
+                start = i + 1
+        i += 1
+
+    if text[start:].strip():
+        raise ValueError(f"Unterminated GraphQL definition: {text[start:][:100]}")
+    return definitions
+
+
+def _strip_strings(text: str) -> str:
+    return "".join(
+        token for token in _TOKEN_RE.findall(text) if not token.startswith('"')
+    )
@@ -0,0 +1,42 @@
+import dataclasses
+import importlib
+import importlib.util
+import json
+from typing import Any
+
+# orjson is several times faster than the standard library at encoding large
+# responses. It's an optional dependency: install mcp-server-datahub[orjson].
+_orjson: Any = (
+    importlib.import_module("orjson") if importlib.util.find_spec("orjson") else None
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class Fragment:
+    """A value that has already been encoded as JSON.
+
+    `dumps` splices fragments into its output as-is instead of encoding them again.
+    Fragments are only supported as values of the top-level object.
+    """
+
+    contents: str
+
+
+def dumps(obj: Any) -> str:
+    """Encode a value as compact JSON, leaving non-ASCII characters as they are."""
+    if isinstance(obj, dict) and any(isinstance(v, Fragment) for v in obj.values()):
+        return (
+            "{"
+            + ",".join(
+                f"{_dumps(str(k))}:{v.contents if isinstance(v, Fragment) else _dumps(v)}"
+                for k, v in obj.items()
+            )
+            + "}"
+        )
+    return _dumps(obj)
+
+
+def _dumps(obj: Any) -> str:
+    if _orjson is not None:
+        return _orjson.dumps(obj, option=_orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
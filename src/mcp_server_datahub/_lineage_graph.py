@@ -0,0 +1,173 @@
+import dataclasses
+import itertools
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+@dataclasses.dataclass
+class LineageNode:
+    urn: str
+    type: Optional[str]
+    # The number of hops between this node and the root of the graph.
+    degree: int
+    name: Optional[str] = None
+    platform: Optional[str] = None
+
+
+@dataclasses.dataclass(frozen=True)
+class LineageNeighbors:
+    """The entities directly related to an entity in one lineage direction."""
+
+    # The total number of neighbors, which may be more than we fetched.
+    total: int
+    # (urn, type, name, platform) of each neighbor we fetched.
+    neighbors: Tuple[Tuple[str, Optional[str], Optional[str], Optional[str]], ...]
+
+
+class LineageGraph:
+    """An in-memory lineage graph around a single root entity.
+
+    Edges always point downstream, i.e. in the direction data flows, regardless of
+    the direction the lineage was explored in. Nodes and edges are kept in insertion
+    order, so that output built from the graph is deterministic.
+    """
+
+    def __init__(self, root: str, root_type: Optional[str] = None) -> None:
+        self.root = root
+        self.nodes: Dict[str, LineageNode] = {}
+        self._downstreams: Dict[str, Dict[str, None]] = {}
+        self._upstreams: Dict[str, Dict[str, None]] = {}
+        # The total number of related entities per direction, which may be more
+        # than the number of entities that were fetched.
+        self.totals: Dict[str, int] = {}
+        self.add_node(root, type=root_type, degree=0)
+
+    def add_node(
+        self,
+        urn: str,
+        *,
+        type: Optional[str],
+        degree: int,
+        name: Optional[str] = None,
+        platform: Optional[str] = None,
+    ) -> LineageNode:
+        """Add a node, or update it if it already exists.
+
+        A node that is reachable in several ways keeps its smallest degree.
+        """
+        node = self.nodes.get(urn)
+        if node is None:
+            node = self.nodes[urn] = LineageNode(
+                urn=urn, type=type, degree=degree, name=name, platform=platform
+            )
+        else:
+            node.degree = min(node.degree, degree)
+            node.type = node.type or type
+            node.name = node.name or name
+            node.platform = node.platform or platform
+        return node
+
+    def add_edge(self, upstream: str, downstream: str) -> None:
+        self._downstreams.setdefault(upstream, {})[downstream] = None
+        self._upstreams.setdefault(downstream, {})[upstream] = None
+
+    def add_path(self, path: Sequence[str], *, upstream: bool) -> None:
+        """Add a lineage path that starts at the root.
+
+        `upstream` indicates whether the path leads upstream from the root, in which
+        case data flows from the end of the path towards its start.
+        """
+        for degree, urn in enumerate(path):
+            self.add_node(urn, type=None, degree=degree)
+        for a, b in itertools.pairwise(path):
+            if upstream:
+                self.add_edge(b, a)
+            else:
+                self.add_edge(a, b)
+
+    def update(self, other: "LineageGraph") -> None:
+        """Merge the nodes, edges and totals of another graph into this one."""
+        for node in other.nodes.values():
+            self.add_node(
+                node.urn,
+                type=node.type,
+                degree=node.degree,
+                name=node.name,
+                platform=node.platform,
+            )
+        for upstream, downstream in other.edges:
+            self.add_edge(upstream, downstream)
+        self.totals.update(other.totals)
+
+    def truncate(self, max_nodes: int) -> "LineageGraph":
+        """Copy the graph with only the `max_nodes` nodes closest to the root.
+
+        The root is always kept, and so are the edges between kept nodes. Nodes stay
+        in insertion order. Totals are copied as is, so they still count every
+        related entity.
+        """
+        others = [node for urn, node in self.nodes.items() if urn != self.root]
+        kept = {node.urn for node in sorted(others, key=lambda n: n.degree)[:max_nodes]}
+        kept.add(self.root)
+
+        truncated = LineageGraph(self.root)
+        for node in self.nodes.values():
+            if node.urn in kept:
+                truncated.add_node(
+                    node.urn,
+                    type=node.type,
+                    degree=node.degree,
+                    name=node.name,
+                    platform=node.platform,
+                )
+        for upstream, downstream in self.edges:
+            if upstream in kept and downstream in kept:
+                truncated.add_edge(upstream, downstream)
+        truncated.totals = dict(self.totals)
+        return truncated
+
+    def upstreams(self, urn: str) -> List[str]:
+        return list(self._upstreams.get(urn, ()))
+
+    def downstreams(self, urn: str) -> List[str]:
+        return list(self._downstreams.get(urn, ()))
+
+    @property
+    def edges(self) -> List[Tuple[str, str]]:
+        """All edges as (upstream, downstream) pairs."""
+        return [
+            (upstream, downstream)
+            for upstream, downstreams in self._downstreams.items()
+            for downstream in downstreams
+        ]
+
+    def to_compact_dict(self) -> Dict[str, Any]:
+        """Serialize the graph into a compact, table-oriented form.
+
+        Every node is listed once as a row of `node_columns`, platforms are listed
+        once and referenced by index, and edges are [upstream, downstream] pairs of
+        node indexes. For wide lineage, this is several times smaller than the
+        equivalent search results.
+        """
+        node_indexes: Dict[str, int] = {}
+        platform_indexes: Dict[str, int] = {}
+        nodes: List[List[Any]] = []
+        for urn, node in self.nodes.items():
+            node_indexes[urn] = len(nodes)
+            platform = None
+            if node.platform is not None:
+                platform = platform_indexes.setdefault(
+                    node.platform, len(platform_indexes)
+                )
+            nodes.append([urn, node.type, node.name, platform, node.degree])
+
+        return {
+            "root": node_indexes[self.root],
+            "total": self.totals,
+            "platforms": list(platform_indexes),
+            "node_columns": ["urn", "type", "name", "platform", "degree"],
+            "nodes": nodes,
+            "edges": [
+                [node_indexes[upstream], node_indexes[downstream]]
+                for upstream, downstream in self.edges
+            ],
+        }
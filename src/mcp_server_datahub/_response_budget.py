@@ -0,0 +1,141 @@
+import dataclasses
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Keys that are dropped first when a response is too large, lowest priority first.
+# Each key is dropped wherever it appears in the response. editableSchemaMetadata
+# isn't one of them: it holds column docs written by users, so it is only ever cut
+# short like the rest of the response.
+LOW_PRIORITY_KEYS = (
+    "health",
+    "schemaFieldEntity",
+    "foreignKeys",
+    "structuredProperties",
+    "customProperties",
+    "statsSummary",
+)
+
+# Strings that are useless once truncated, so they are never cut.
+_UNTRUNCATED_KEYS = ("urn", "url")
+
+# Lists are never cut shorter than this, and strings never shorter than
+# _MIN_STRING_LENGTH characters.
+_MIN_LIST_ITEMS = 1
+_MIN_STRING_LENGTH = 100
+# Upper bound on the number of lists and strings we cut, to keep this linear.
+_MAX_CUTS = 10
+
+_Container = Union[Dict[str, Any], List[Any]]
+
+
+@dataclasses.dataclass
+class _Measurement:
+    total: int
+    keys: Dict[str, List[Dict[str, Any]]]
+    # (size, parent, key, value) of every list and string that could be cut.
+    lists: List[Tuple[int, _Container, Any, List[Any]]]
+    strings: List[Tuple[int, _Container, Any, str]]
+    # Sizes of list items, by list id.
+    item_sizes: Dict[int, List[int]]
+
+
+def estimate_size(value: Any) -> int:
+    """Estimate the size of a value encoded as JSON, in bytes.
+
+    Only quotes, backslashes and newlines are assumed to be escaped in strings, so
+    strings with other control characters make this an underestimate.
+    """
+    return _measure(value).total
+
+
+def _measure(value: Any) -> _Measurement:
+    measurement = _Measurement(total=0, keys={}, lists=[], strings=[], item_sizes={})
+
+    def _size(value: Any, parent: Optional[_Container], key: Any) -> int:
+        if isinstance(value, str):
+            size = len(value) if value.isascii() else len(value.encode("utf-8"))
+            # Quotes, plus the escape characters that are common in descriptions.
+            size += 2 + value.count('"') + value.count("\\") + value.count("\n")
+            if (
+                parent is not None
+                and len(value) > _MIN_STRING_LENGTH
+                and key not in _UNTRUNCATED_KEYS
+            ):
+                measurement.strings.append((size, parent, key, value))
+            return size
+        if isinstance(value, dict):
+            # Braces and commas. Colons are counted with the keys.
+            size = len(value) + 1 if value else 2
+            for k, v in value.items():
+                if k in LOW_PRIORITY_KEYS:
+                    measurement.keys.setdefault(k, []).append(value)
+                size += len(k) + 3 + _size(v, value, k)
+            return size
+        if isinstance(value, list):
+            item_sizes = [_size(item, value, i) for i, item in enumerate(value)]
+            size = (len(value) + 1 if value else 2) + sum(item_sizes)
+            if parent is not None and len(value) > _MIN_LIST_ITEMS:
+                measurement.lists.append((size, parent, key, value))
+                measurement.item_sizes[id(value)] = item_sizes
+            return size
+        if value is None or value is True:
+            return 4
+        if value is False:
+            return 5
+        return len(str(value))
+
+    measurement.total = _size(value, None, None)
+    return measurement
+
+
+def fit_to_budget(value: Any, max_bytes: int) -> Any:
+    """Prune a response so that it encodes to roughly `max_bytes` bytes of JSON.
+
+    Pruning is deterministic and happens in phases, each of which stops as soon as
+    the response fits:
+    1. `LOW_PRIORITY_KEYS` are dropped, lowest priority first.
+    2. Lists are cut short, longest first, and end with a "N more ..." marker.
+    3. Strings are truncated, longest first. Urns and urls are never truncated.
+
+    Each step walks the response once, and the number of steps is bounded, so this
+    takes linear time. The value is modified in place and returned.
+    """
+    measurement = _measure(value)
+
+    for key in LOW_PRIORITY_KEYS:
+        if measurement.total <= max_bytes:
+            return value
+        if key in measurement.keys:
+            for container in measurement.keys[key]:
+                container.pop(key, None)
+            measurement = _measure(value)
+
+    for _ in range(_MAX_CUTS):
+        if measurement.total <= max_bytes or not measurement.lists:
+            break
+        size, parent, key, items = max(measurement.lists, key=lambda x: x[0])
+        item_sizes = measurement.item_sizes[id(items)]
+        name = key if isinstance(key, str) else "items"
+        marker = f"({len(items)} more {name} not shown)"
+        target = size - (measurement.total - max_bytes) - len(marker) - 3
+        keep, kept_size = 0, 2
+        while keep < len(items) and (
+            keep < _MIN_LIST_ITEMS or kept_size + item_sizes[keep] + 1 <= target
+        ):
+            kept_size += item_sizes[keep] + 1
+            keep += 1
+        if keep == len(items):
+            break
+        parent[key] = items[:keep] + [f"({len(items) - keep} more {name} not shown)"]
+        measurement = _measure(value)
+
+    for _ in range(_MAX_CUTS):
+        if measurement.total <= max_bytes or not measurement.strings:
+            break
+        size, parent, key, text = max(measurement.strings, key=lambda x: x[0])
+        length = max(_MIN_STRING_LENGTH, len(text) - (measurement.total - max_bytes))
+        if length >= len(text):
+            break
+        parent[key] = text[: length - 3] + "..."
+        measurement = _measure(value)
+
+    return value
@@ -0,0 +1,241 @@
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+# Steps of a (tiny subset of a) jmespath expression: `key`, `*` and `[]`.
+_VALUES = ("*", None)
+_FLATTEN = ("[]", None)
+
+_Step = Tuple[str, Optional[str]]
+# (path index, step index) pairs describing how far into each path a node is.
+_States = Tuple[Tuple[int, int], ...]
+
+_SCHEMA_FIELD_DEFAULTS = ("recursive", "isPartOfKey")
+
+# Roles of nodes that need extra cleanup when stripping schema defaults.
+_ROLE_ROOT = 1
+_ROLE_SCHEMA_METADATA = 2
+_ROLE_PLATFORM_SCHEMA = 3
+_ROLE_SCHEMA_FIELDS = 4
+_ROLE_SCHEMA_FIELD = 5
+
+_VISIT = 0
+_FINALIZE = 1
+
+
+def _compile_path(path: str) -> List[_Step]:
+    steps: List[_Step] = []
+    for segment in path.split(".") if path else []:
+        flatten = segment.endswith("[]")
+        if flatten:
+            segment = segment[:-2]
+        if segment == "*":
+            steps.append(_VALUES)
+        elif segment:
+            steps.append(("key", segment))
+        if flatten:
+            steps.append(_FLATTEN)
+    return steps
+
+
+class ResponseProcessor:
+    """Post-processes a JSON-decoded GraphQL response in a single, non-recursive pass.
+
+    It injects URLs next to the urns of objects at `url_paths`, truncates
+    descriptions and applies the `clean_gql_response` rules, all while walking the
+    response once. With `strip_schema_field_defaults`, empty platform schemas and
+    schema field flags that are false are dropped too. It never recurses, so large
+    responses (e.g. datasets with thousands of schema fields) are cheap to process.
+
+    `transform_description` is called with each description and its length limit.
+    `description_limits` maps paths of objects to the limit for their own
+    description, and all other descriptions are limited to `description_limit`.
+    If several paths match an object, the first one wins.
+
+    Paths use a subset of jmespath syntax: dotted keys, `*` (values of an
+    object) and `[]` (elements of a list). An empty path matches the
+    root of the response.
+    """
+
+    def __init__(
+        self,
+        *,
+        url_paths: Sequence[str] = (),
+        transform_description: Optional[Callable[[str, int], str]] = None,
+        description_limit: int = 0,
+        description_limits: Optional[Mapping[str, int]] = None,
+        strip_schema_field_defaults: bool = False,
+    ) -> None:
+        description_limits = description_limits or {}
+        # URL and description limit paths are tracked together, in a single list:
+        # the first len(url_paths) paths are URL paths.
+        self._num_url_paths = len(url_paths)
+        self._paths = [_compile_path(path) for path in url_paths] + [
+            _compile_path(path) for path in description_limits
+        ]
+        self._limits = [0] * len(url_paths) + list(description_limits.values())
+        self._url_states: _States = tuple((i, 0) for i in range(len(url_paths)))
+        self._limit_states: _States = tuple(
+            (i, 0) for i in range(len(url_paths), len(self._paths))
+        )
+        self._transform_description = transform_description
+        self._description_limit = description_limit
+        self._strip_schema_field_defaults = strip_schema_field_defaults
+
+    def _match(self, states: _States) -> Tuple[bool, Optional[int]]:
+        """Return whether a node matches a URL path, and its description limit."""
+        paths = self._paths
+        url = False
+        limit = None
+        for path, step in states:
+            if step == len(paths[path]):
+                if path < self._num_url_paths:
+                    url = True
+                elif limit is None:
+                    limit = self._limits[path]
+        return url, limit
+
+    def _advance(self, states: _States, key: Optional[str]) -> _States:
+        # key is None when descending into a list element.
+        paths = self._paths
+        advanced = []
+        for path, step in states:
+            steps = paths[path]
+            if step == len(steps):
+                continue
+            kind, name = steps[step]
+            if key is None:
+                if kind == "[]":
+                    advanced.append((path, step + 1))
+            elif kind == "*" or name == key:
+                advanced.append((path, step + 1))
+        return tuple(advanced)
+
+    def process(
+        self, response: Any, *, url_for: Optional[Callable[[str], str]] = None
+    ) -> Any:
+        """Return a cleaned copy of `response`. The input is left untouched.
+
+        URLs are only injected when `url_for` is provided.
+        """
+        if isinstance(response, dict):
+            result: Any = {}
+        elif isinstance(response, list):
+            result = []
+        else:
+            return response
+
+        transform_description = self._transform_description
+        default_limit = self._description_limit
+        strip_defaults = self._strip_schema_field_defaults
+        initial_states = self._url_states if url_for is not None else ()
+        if transform_description is not None:
+            initial_states += self._limit_states
+
+        # Each frame is either
+        #   (_VISIT, source, output, path states, role) - fill output from source, or
+        #   (_FINALIZE, parent output, key, output, role) - drop output if empty.
+        # Children are attached to their parent before they are filled in, which
+        # preserves key order; empty objects are removed again once finalized.
+        stack: List[Tuple[Any, ...]] = [
+            (
+                _VISIT,
+                response,
+                result,
+                initial_states,
+                _ROLE_ROOT if strip_defaults else 0,
+            )
+        ]
+        push = stack.append
+        advance = self._advance
+        while stack:
+            frame = stack.pop()
+            if frame[0] == _FINALIZE:
+                _, parent, key, output, role = frame
+                if not output or (
+                    role == _ROLE_PLATFORM_SCHEMA and not output.get("schema")
+                ):
+                    del parent[key]
+                continue
+
+            _, source, output, states, role = frame
+            if type(source) is list:
+                child_role = _ROLE_SCHEMA_FIELD if role == _ROLE_SCHEMA_FIELDS else 0
+                child_states = advance(states, None) if states else ()
+                for item in source:
+                    item_type = type(item)
+                    if item_type is dict:
+                        child: Any = {}
+                    elif item_type is list:
+                        child = []
+                    else:
+                        output.append(item)
+                        continue
+                    output.append(child)
+                    push((_VISIT, item, child, child_states, child_role))
+                continue
+
+            skip_key = None
+            url, limit = self._match(states) if states else (False, None)
+            if limit is None:
+                limit = default_limit
+            if url:
+                urn = source.get("urn")
+                if urn and type(urn) is str:
+                    assert url_for is not None
+                    # Ensure that urn and url are the first keys.
+                    output["urn"] = urn
+                    output["url"] = url_for(urn)
+                    skip_key = "urn"
+
+            for key, value in source.items():
+                if key == "__typename":
+                    continue
+                value_type = type(value)
+                if value_type is str:
+                    if key == skip_key:
+                        continue
+                    if key == "description" and transform_description is not None:
+                        value = transform_description(value, limit)
+                    output[key] = value
+                    continue
+                if value_type is dict:
+                    child = output[key] = {}
+                    child_role = _child_role(role, key) if role else 0
+                    push((_FINALIZE, output, key, child, child_role))
+                elif value_type is list:
+                    if not value:
+                        continue
+                    child = output[key] = []
+                    child_role = _child_role(role, key) if role else 0
+                else:
+                    if value is None:
+                        continue
+                    if (
+                        role == _ROLE_SCHEMA_FIELD
+                        and value is False
+                        and key in _SCHEMA_FIELD_DEFAULTS
+                    ):
+                        continue
+                    output[key] = value
+                    continue
+                push(
+                    (
+                        _VISIT,
+                        value,
+                        child,
+                        advance(states, key) if states else (),
+                        child_role,
+                    )
+                )
+
+        return result
+
+
+_CHILD_ROLES: Dict[Tuple[int, str], int] = {
+    (_ROLE_ROOT, "schemaMetadata"): _ROLE_SCHEMA_METADATA,
+    (_ROLE_SCHEMA_METADATA, "platformSchema"): _ROLE_PLATFORM_SCHEMA,
+    (_ROLE_SCHEMA_METADATA, "fields"): _ROLE_SCHEMA_FIELDS,
+}
+
+
+def _child_role(role: int, key: str) -> int:
+    return _CHILD_ROLES.get((role, key), 0)
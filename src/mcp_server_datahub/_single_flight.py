@@ -0,0 +1,81 @@
+import copy
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Optional,
+    TypeVar,
+    cast,
+)
+
+import anyio
+
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
+
+
+class _Call(Generic[_V]):
+    def __init__(self) -> None:
+        self.done = anyio.Event()
+        self.result: Optional[_V] = None
+        self.error: Optional[Exception] = None
+        self.cancelled = False
+        self.waiters = 0
+
+
+class SingleFlight(Generic[_K, _V]):
+    """Coalesces identical concurrent calls into a single call.
+
+    While a call for a key is in flight, further calls for the same key wait for it
+    and share its result (or exception) instead of issuing their own call. Every
+    caller gets its own deep copy of the result, so callers are free to modify it.
+    Results can be large, so they are copied in a worker thread.
+
+    If the in-flight call is cancelled (e.g. because the caller that started it went
+    away), waiting callers are not cancelled with it; one of them retries instead.
+
+    All calls must happen on the same event loop.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[_K, _Call[_V]] = {}
+        self.coalesced = 0
+
+    async def do(self, key: _K, fn: Callable[[], Awaitable[_V]]) -> _V:
+        while (call := self._calls.get(key)) is not None:
+            call.waiters += 1
+            self.coalesced += 1
+            await call.done.wait()
+            if call.cancelled:
+                continue
+            if call.error is not None:
+                raise call.error
+            return await anyio.to_thread.run_sync(copy.deepcopy, cast(_V, call.result))
+
+        call = _Call()
+        self._calls[key] = call
+        try:
+            result = await fn()
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException:
+            # Cancellation (or interpreter shutdown).
+            call.cancelled = True
+            raise
+        else:
+            call.result = result
+        finally:
+            del self._calls[key]
+            call.done.set()
+
+        # Waiters copy the result once they resume, so we must not hand out the
+        # shared object to our own caller, which may modify it in the meantime.
+        if call.waiters:
+            return await anyio.to_thread.run_sync(copy.deepcopy, result)
+        return result
+
+    def in_flight(self) -> int:
+        return len(self._calls)
@@ -1,11 +1,15 @@
+import base64
+import binascii
 import contextlib
 import contextvars
 import functools
+import hashlib
 import html
-import inspect
 import json
+import os
 import pathlib
 import re
+import weakref
 from typing import (
     Annotated,
     Any,
@@ -16,13 +20,14 @@ from typing import (
     List,
     Literal,
     Optional,
-    ParamSpec,
+    Tuple,
     TypeVar,
 )
 
-import asyncer
-import jmespath
+import anyio
+import httpx
 from datahub.cli.env_utils import get_boolean_env_variable
+from datahub.configuration.common import GraphError, OperationalError
 from datahub.errors import ItemNotFoundError
 from datahub.ingestion.graph.client import DataHubGraph
 from datahub.metadata.urns import DatasetUrn, SchemaFieldUrn, Urn
@@ -30,14 +35,39 @@ from datahub.sdk.main_client import DataHubClient
 from datahub.sdk.search_client import compile_filters
 from datahub.sdk.search_filters import Filter, FilterDsl, load_filters
 from datahub.utilities.ordered_set import OrderedSet
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
 from fastmcp.tools.tool import TextContent, ToolResult
 from loguru import logger
 from pydantic import BaseModel, Field
 
-_P = ParamSpec("_P")
+from mcp_server_datahub import _json
+from mcp_server_datahub._cache import CacheStats, TTLCache
+from mcp_server_datahub._graphql_client import AsyncGraphQLClient
+from mcp_server_datahub._graphql_documents import split_document
+from mcp_server_datahub._lineage_graph import LineageGraph, LineageNeighbors
+from mcp_server_datahub._response_budget import estimate_size, fit_to_budget
+from mcp_server_datahub._response_processor import ResponseProcessor
+from mcp_server_datahub._single_flight import SingleFlight
+
 _R = TypeVar("_R")
 DESCRIPTION_LENGTH_HARD_LIMIT = 1000
+# Schema fields, and entities nested in other entities (e.g. glossary terms,
+# domains or owners), get shorter descriptions than the entities themselves.
+SCHEMA_FIELD_DESCRIPTION_LENGTH_LIMIT = 200
+NESTED_DESCRIPTION_LENGTH_LIMIT = 100
+
+
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+# ![alt text](data:image/type;base64,encoded_data)
+_MARKDOWN_DATA_EMBED_RE = re.compile(r"!\[([^\]]*)\]\(data:[^)]+\)")
+# HTML tags and markdown embeds that were cut off by truncation.
+_PARTIAL_HTML_TAG_RE = re.compile(r"<[^>]*\Z")
+_PARTIAL_MARKDOWN_EMBED_RE = re.compile(r"!\[[^\]]*(?:\](?:\([^)]*)?)?\Z")
+_PARTIAL_HTML_ENTITY_RE = re.compile(r"&#?\w*\Z")
+
+# Descriptions that are this many times longer than the length they are truncated
+# to are truncated before they are sanitized.
+_PRE_TRUNCATION_FACTOR = 8
 
 
 def sanitize_html_content(text: str) -> str:
@@ -46,10 +76,12 @@ def sanitize_html_content(text: str) -> str:
         return text
 
     # Remove HTML tags (including img tags)
-    text = re.sub(r"<[^>]+>", "", text)
+    if "<" in text:
+        text = _HTML_TAG_RE.sub("", text)
 
     # Decode HTML entities
-    text = html.unescape(text)
+    if "&" in text:
+        text = html.unescape(text)
 
     return text.strip()
 
@@ -71,17 +103,35 @@ def sanitize_markdown_content(text: str) -> str:
 
     # Remove markdown embeds with data URLs (base64 encoded content) but preserve alt text
     # Pattern: ![alt text](data:image/type;base64,encoded_data) -> alt text
-    text = re.sub(r"!\[([^\]]*)\]\(data:[^)]+\)", r"\1", text)
+    if "](data:" in text:
+        text = _MARKDOWN_DATA_EMBED_RE.sub(r"\1", text)
 
     return text.strip()
 
 
+def _sanitize_prefix(text: str) -> str:
+    """Sanitize a prefix of a description, dropping anything that was cut off."""
+    text = _PARTIAL_HTML_TAG_RE.sub("", text)
+    text = _PARTIAL_HTML_ENTITY_RE.sub("", text)
+    text = sanitize_html_content(text)
+    text = _PARTIAL_MARKDOWN_EMBED_RE.sub("", text)
+    return sanitize_markdown_content(text)
+
+
 def sanitize_and_truncate_description(text: str, max_length: int) -> str:
     """Sanitize HTML content and truncate to specified length."""
     if not text:
         return text
 
     try:
+        # Sanitization only ever shortens text, so for very long descriptions we
+        # only need to sanitize the beginning. If the beginning turns out to be
+        # mostly markup, we fall back to sanitizing everything.
+        if len(text) > _PRE_TRUNCATION_FACTOR * max_length:
+            sanitized = _sanitize_prefix(text[: _PRE_TRUNCATION_FACTOR * max_length])
+            if len(sanitized) > max_length:
+                return truncate_with_ellipsis(sanitized, max_length)
+
         # First sanitize HTML content
         sanitized = sanitize_html_content(text)
 
@@ -95,35 +145,28 @@ def sanitize_and_truncate_description(text: str, max_length: int) -> str:
         return text[:max_length] if len(text) > max_length else text
 
 
-def truncate_descriptions(
-    data: dict | list, max_length: int = DESCRIPTION_LENGTH_HARD_LIMIT
-) -> None:
-    """
-    Recursively truncates values of keys named 'description' in a dictionary in place.
-    """
-    # TODO: path-aware truncate, for different length limits per entity type
-    if isinstance(data, dict):
-        for key, value in data.items():
-            if key == "description" and isinstance(value, str):
-                data[key] = sanitize_and_truncate_description(value, max_length)
-            elif isinstance(value, (dict, list)):
-                truncate_descriptions(value)
-    elif isinstance(data, list):
-        for item in data:
-            truncate_descriptions(item)
+async def _gather(*fns: Callable[[], Awaitable[Any]]) -> List[Any]:
+    """Run independent async calls concurrently and return their results in order.
 
+    Any exception raised by one of the calls is re-raised once all calls complete.
+    """
+    results: List[Any] = [None] * len(fns)
+    errors: List[Optional[Exception]] = [None] * len(fns)
 
-# See https://github.com/jlowin/fastmcp/issues/864#issuecomment-3103678258
-# for why we need to wrap sync functions with asyncify.
-def async_background(fn: Callable[_P, _R]) -> Callable[_P, Awaitable[_R]]:
-    if inspect.iscoroutinefunction(fn):
-        raise RuntimeError("async_background can only be used on non-async functions")
+    async def _run(i: int, fn: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            results[i] = await fn()
+        except Exception as e:
+            errors[i] = e
 
-    @functools.wraps(fn)
-    async def wrapper(*args: _P.args, **kwargs: _P.kwargs) -> _R:
-        return await asyncer.asyncify(fn)(*args, **kwargs)
+    async with anyio.create_task_group() as tg:
+        for i, fn in enumerate(fns):
+            tg.start_soon(_run, i, fn)
 
-    return wrapper
+    for error in errors:
+        if error is not None:
+            raise error
+    return results
 
 
 mcp = FastMCP[None](name="datahub")
@@ -154,44 +197,143 @@ def _enable_cloud_fields(query: str) -> str:
     return query.replace("#[CLOUD]", "")
 
 
+# The deployment flavour doesn't change over the lifetime of a client,
+# so we only probe it once per graph.
+_is_datahub_cloud_by_graph: "weakref.WeakKeyDictionary[DataHubGraph, bool]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
 def _is_datahub_cloud(graph: DataHubGraph) -> bool:
-    try:
-        # Only DataHub Cloud has a frontend base url.
-        _ = graph.frontend_base_url
-    except ValueError:
-        return False
-    return True
+    is_cloud = _is_datahub_cloud_by_graph.get(graph)
+    if is_cloud is None:
+        try:
+            # Only DataHub Cloud has a frontend base url.
+            _ = graph.frontend_base_url
+            is_cloud = True
+        except ValueError:
+            is_cloud = False
+        _is_datahub_cloud_by_graph[graph] = is_cloud
+    return is_cloud
+
+
+_cache_scopes: "weakref.WeakKeyDictionary[DataHubGraph, str]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _cache_scope(graph: DataHubGraph) -> str:
+    """Identify the server and credentials a graph talks to, for scoping caches.
 
+    Clients with different tokens may be allowed to see different metadata, so
+    anything we cache must only be served to clients with the same credentials.
+    Graphs for the same server and credentials share a scope, so that clients
+    created per request still share cache entries.
+    """
+    scope = _cache_scopes.get(graph)
+    if scope is None:
+        config = graph.config
+        payload = json.dumps(
+            [
+                config.server,
+                config.token,
+                config.extra_headers,
+                config.client_certificate_path,
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        scope = hashlib.sha256(payload.encode()).hexdigest()
+        _cache_scopes[graph] = scope
+    return scope
 
-def _execute_graphql(
+
+def _get_thread_offload_min_bytes() -> int:
+    # JSON payloads of at least this size are parsed in a worker thread.
+    return _get_int_env_variable("THREAD_OFFLOAD_MIN_BYTES", 256 * 1024)
+
+
+async def _loads(payload: str) -> Any:
+    """Decode a cached JSON payload, in a worker thread if it is large."""
+    if len(payload) >= _get_thread_offload_min_bytes():
+        return await anyio.to_thread.run_sync(json.loads, payload)
+    return json.loads(payload)
+
+
+_graphql_clients: "weakref.WeakKeyDictionary[DataHubGraph, AsyncGraphQLClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_graphql_client(graph: DataHubGraph) -> AsyncGraphQLClient:
+    client = _graphql_clients.get(graph)
+    if client is None:
+        client = AsyncGraphQLClient(
+            graph,
+            max_connections=_get_int_env_variable("GRAPHQL_POOL_SIZE", 100),
+            # 0 means "use the timeout configured on the DataHub client".
+            timeout=_get_int_env_variable("GRAPHQL_TIMEOUT_SECONDS", 0) or None,
+            http2=get_boolean_env_variable("GRAPHQL_HTTP2_ENABLED", default=False),
+            persisted_queries=get_boolean_env_variable(
+                "GRAPHQL_PERSISTED_QUERIES_ENABLED", default=False
+            ),
+            streaming_parse=get_boolean_env_variable(
+                "GRAPHQL_STREAMING_PARSE_ENABLED", default=False
+            ),
+            thread_parse_min_bytes=_get_thread_offload_min_bytes(),
+        )
+        _graphql_clients[graph] = client
+    return client
+
+
+async def close_graphql_clients() -> None:
+    """Close the connection pools of all GraphQL clients.
+
+    Must be called before the event loop the clients were used on shuts down.
+    Clients created afterwards, e.g. on another event loop, start with a new pool.
+    """
+    clients = list(_graphql_clients.values())
+    _graphql_clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+# Identical GraphQL requests that are in flight at the same time (e.g. several
+# sessions fetching the same entity) are only sent to GMS once.
+_graphql_single_flight = SingleFlight[
+    Tuple[DataHubGraph, Optional[str], str, str, bool], Any
+]()
+
+
+async def _execute_graphql(
     graph: DataHubGraph,
     *,
     query: str,
     operation_name: Optional[str] = None,
     variables: Optional[Dict[str, Any]] = None,
+    timeout: Optional[float] = None,
+    clean: bool = False,
 ) -> Any:
-    if _is_datahub_cloud(graph):
-        query = _enable_cloud_fields(query)
+    # clean allows the response to be cleaned as it is parsed (see
+    # AsyncGraphQLClient.execute). Only set it if the caller cleans the response
+    # anyway, and doesn't rely on nulls or empty lists below the top level.
 
-    return graph.execute_graphql(
-        query=query, variables=variables, operation_name=operation_name
+    # The query variant already reflects whether this is DataHub Cloud.
+    query = _get_query_variant(
+        query, operation_name=operation_name, is_cloud=_is_datahub_cloud(graph)
     )
 
-
-def inject_urls_for_urns(
-    graph: DataHubGraph, response: Any, json_paths: List[str]
-) -> None:
-    if not _is_datahub_cloud(graph):
-        return
-
-    for path in json_paths:
-        for item in jmespath.search(path, response) if path else [response]:
-            if isinstance(item, dict) and item.get("urn"):
-                # Update item in place with url, ensuring that urn and url are first.
-                new_item = {"urn": item["urn"], "url": graph.url_for(item["urn"])}
-                new_item.update({k: v for k, v in item.items() if k != "urn"})
-                item.clear()
-                item.update(new_item)
+    key = (graph, operation_name, query, json.dumps(variables, sort_keys=True), clean)
+    return await _graphql_single_flight.do(
+        key,
+        lambda: _get_graphql_client(graph).execute(
+            query,
+            variables=variables,
+            operation_name=operation_name,
+            timeout=timeout,
+            clean=clean,
+        ),
+    )
 
 
 def maybe_convert_to_schema_field_urn(urn: str, column: Optional[str]) -> str:
@@ -216,6 +358,38 @@ entity_details_fragment_gql = (
 queries_gql = (pathlib.Path(__file__).parent / "gql/queries.gql").read_text()
 
 
+def _compile_query_variants(query: str) -> Dict[str, Tuple[str, str]]:
+    oss_documents = split_document(query)
+    cloud_documents = split_document(_enable_cloud_fields(query))
+    return {
+        operation_name: (oss_documents[operation_name], cloud_documents[operation_name])
+        for operation_name in oss_documents
+    }
+
+
+# Precomputed (OSS, Cloud) variants of each operation, so that we don't need to
+# rewrite the query text on every request. Each variant is a minimal document
+# containing only the fragments used by that operation.
+_query_variants: Dict[str, Dict[str, Tuple[str, str]]] = {
+    query: _compile_query_variants(query)
+    for query in (
+        search_gql,
+        semantic_search_gql,
+        entity_details_fragment_gql,
+        queries_gql,
+    )
+}
+
+
+def _get_query_variant(
+    query: str, *, operation_name: Optional[str], is_cloud: bool
+) -> str:
+    variants = _query_variants.get(query, {}).get(operation_name or "")
+    if variants is None:
+        return _enable_cloud_fields(query) if is_cloud else query
+    return variants[1] if is_cloud else variants[0]
+
+
 def _is_semantic_search_enabled() -> bool:
     """Check if semantic search is enabled via environment variable.
 
@@ -235,6 +409,192 @@ def is_openai_search_enabled() -> bool:
     return get_boolean_env_variable("OPENAI_SEARCH_ENABLED", default=False)
 
 
+def _get_int_env_variable(key: str, default: int) -> int:
+    value = os.environ.get(key)
+    if value is None or not value.strip():
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"Ignoring invalid integer value for {key}: {value!r}")
+        return default
+
+
+def _get_max_response_bytes() -> int:
+    # 0 or a negative value disables the limit.
+    return _get_int_env_variable("MAX_RESPONSE_BYTES", 256 * 1024)
+
+
+def _fit_response(response: _R) -> _R:
+    """Prune a tool response so that it fits within MAX_RESPONSE_BYTES."""
+    max_bytes = _get_max_response_bytes()
+    if max_bytes <= 0:
+        return response
+    return fit_to_budget(response, max_bytes)
+
+
+def _fit_lineage_graph(
+    graph: LineageGraph, to_dict: Callable[[LineageGraph], Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Like `_fit_response`, for lineage graphs serialized by `to_dict`.
+
+    Cutting the node table of a compact graph short would leave edges pointing at
+    missing nodes, so the graph itself is pruned first: the nodes furthest from the
+    root are dropped, with their edges, until the graph fits.
+    """
+    response = to_dict(graph)
+    max_bytes = _get_max_response_bytes()
+    size = estimate_size(response)
+    while 0 < max_bytes < size and len(graph.nodes) > 1:
+        num_nodes = len(graph.nodes) - 1
+        graph = graph.truncate(min(num_nodes * max_bytes // size, num_nodes - 1))
+        response = to_dict(graph)
+        size = estimate_size(response)
+    return _fit_response(response)
+
+
+# How much of an entity to fetch. "summary" is enough to identify an entity,
+# "standard" adds ownership, tags, terms, domains and usage, and "full" also
+# includes schemas and other type-specific details.
+DetailLevel = Literal["summary", "standard", "full"]
+
+_entity_detail_operations: Dict[str, str] = {
+    "summary": "GetEntitySummary",
+    "standard": "GetEntityStandard",
+    "full": "GetEntity",
+}
+_entities_detail_operations: Dict[str, str] = {
+    "summary": "GetEntitiesSummary",
+    "standard": "GetEntitiesStandard",
+    "full": "GetEntities",
+}
+
+# Cache of processed entity details, keyed by (cache scope, urn, is_datahub_cloud,
+# detail_level). The schema fields of a dataset are cached under the detail level
+# "schemaFields". Values are stored JSON-encoded, so that callers always get a
+# private copy and so that the max bytes bound reflects the actual payload size.
+_entity_cache = TTLCache[Tuple[str, str, bool, str], str](
+    ttl_seconds=_get_int_env_variable("ENTITY_CACHE_TTL_SECONDS", 300),
+    max_entries=_get_int_env_variable("ENTITY_CACHE_MAX_ENTRIES", 1000),
+    max_bytes=_get_int_env_variable("ENTITY_CACHE_MAX_BYTES", 64 * 1024 * 1024),
+    sizeof=len,
+)
+
+# Agents tend to repeat the same exploratory searches (e.g. query="*" with no
+# filters) over and over, so search results are cached briefly as well.
+_search_cache = TTLCache[Tuple[str, str, bool, int, str], str](
+    ttl_seconds=_get_int_env_variable("SEARCH_CACHE_TTL_SECONDS", 60),
+    max_entries=_get_int_env_variable("SEARCH_CACHE_MAX_ENTRIES", 500),
+    max_bytes=_get_int_env_variable("SEARCH_CACHE_MAX_BYTES", 16 * 1024 * 1024),
+    sizeof=len,
+)
+
+
+# Agents tend to explore lineage hop by hop, re-fetching overlapping
+# neighborhoods. We remember the direct lineage of every entity we've seen, so
+# that lineage graphs can be expanded from memory.
+_lineage_cache = TTLCache[Tuple[str, str, bool, str, str], LineageNeighbors](
+    ttl_seconds=_get_int_env_variable("LINEAGE_CACHE_TTL_SECONDS", 300),
+    max_entries=_get_int_env_variable("LINEAGE_CACHE_MAX_ENTRIES", 5000),
+)
+
+# Parsing filters runs them through pydantic validation, which is expensive
+# relative to the rest of a search call. Clients tend to send the same handful of
+# filters over and over, so we memoize both the parsed and the compiled form.
+# Filters don't depend on the DataHub instance, so these entries never expire.
+_parsed_filter_cache = TTLCache[str, Filter](
+    ttl_seconds=None,
+    max_entries=_get_int_env_variable("FILTER_CACHE_MAX_ENTRIES", 256),
+)
+_compiled_filter_cache = TTLCache[str, Tuple[Optional[List[str]], List[Any]]](
+    ttl_seconds=None,
+    max_entries=_get_int_env_variable("FILTER_CACHE_MAX_ENTRIES", 256),
+)
+
+
+def get_cache_stats() -> Dict[str, CacheStats]:
+    """Get hit/miss/eviction counters for the in-process caches."""
+    return {
+        "entity": _entity_cache.stats(),
+        "search": _search_cache.stats(),
+        "parsed_filters": _parsed_filter_cache.stats(),
+        "compiled_filters": _compiled_filter_cache.stats(),
+        "lineage": _lineage_cache.stats(),
+    }
+
+
+def _load_filters(filters: str) -> Filter:
+    """Like `load_filters`, but memoized on the raw filter string."""
+    if (cached := _parsed_filter_cache.get(filters)) is not None:
+        return cached
+    parsed = load_filters(filters)
+    _parsed_filter_cache.set(filters, parsed)
+    return parsed
+
+
+def _compile_filters(
+    filters: Optional[Filter],
+) -> Tuple[Optional[List[str]], List[Any]]:
+    """Like `compile_filters`, but memoized on the filter's serialized form.
+
+    The result is shared between callers, so it must not be modified.
+    """
+    key = (
+        "null"
+        if filters is None
+        else f"{type(filters).__name__}:{filters.model_dump_json()}"
+    )
+    if (cached := _compiled_filter_cache.get(key)) is not None:
+        return cached
+    compiled = compile_filters(filters)
+    _compiled_filter_cache.set(key, compiled)
+    return compiled
+
+
+def _canonicalize(value: Any) -> Any:
+    # Filters, entity types and filter values are all sets, so order doesn't
+    # matter for any of the lists we canonicalize.
+    if isinstance(value, dict):
+        return {k: _canonicalize(v) for k, v in sorted(value.items())}
+    if isinstance(value, list):
+        items = [_canonicalize(item) for item in value]
+        return sorted(items, key=lambda item: json.dumps(item, sort_keys=True))
+    return value
+
+
+def _canonical_search(
+    query: str, types: Optional[List[Any]], compiled_filters: Any
+) -> Dict[str, Any]:
+    """Normalize a search, so that searches with the same results compare equal."""
+    return {
+        # Whitespace doesn't affect search results.
+        "query": " ".join(query.split()),
+        "types": _canonicalize(types),
+        "orFilters": _canonicalize(compiled_filters),
+    }
+
+
+def _search_cache_key(
+    graph: DataHubGraph,
+    operation_name: str,
+    variables: Dict[str, Any],
+    num_results: int,
+) -> Tuple[str, str, bool, int, str]:
+    variables = {
+        **variables,
+        **_canonical_search(
+            variables["query"], variables.get("types"), variables.get("orFilters")
+        ),
+    }
+    return (
+        _cache_scope(graph),
+        operation_name,
+        _is_datahub_cloud(graph),
+        num_results,
+        json.dumps(variables, sort_keys=True),
+    )
+
+
 def clean_gql_response(response: Any) -> Any:
     if isinstance(response, dict):
         banned_keys = {
@@ -256,40 +616,210 @@ def clean_gql_response(response: Any) -> Any:
         return response
 
 
-def clean_get_entity_response(raw_response: dict) -> dict:
-    response = clean_gql_response(raw_response)
+def _description_limits(entity_path: str) -> Dict[str, int]:
+    """Description length limits for an entity and its schema fields.
+
+    Descriptions that aren't covered by these get NESTED_DESCRIPTION_LENGTH_LIMIT.
+    """
+    prefix = f"{entity_path}." if entity_path else ""
+    return {
+        entity_path: DESCRIPTION_LENGTH_HARD_LIMIT,
+        f"{prefix}properties": DESCRIPTION_LENGTH_HARD_LIMIT,
+        f"{prefix}editableProperties": DESCRIPTION_LENGTH_HARD_LIMIT,
+        f"{prefix}schemaMetadata.fields[]": SCHEMA_FIELD_DESCRIPTION_LENGTH_LIMIT,
+        f"{prefix}editableSchemaMetadata.editableSchemaFieldInfo[]": (
+            SCHEMA_FIELD_DESCRIPTION_LENGTH_LIMIT
+        ),
+    }
+
+
+_ENTITY_DESCRIPTION_LIMITS = _description_limits("")
+_LINEAGE_DESCRIPTION_LIMITS = _description_limits("*.searchResults[].entity")
+
+# Inject urls, truncate descriptions and clean entity and lineage responses.
+_entity_response_processor = ResponseProcessor(
+    url_paths=[""],
+    transform_description=sanitize_and_truncate_description,
+    description_limit=NESTED_DESCRIPTION_LENGTH_LIMIT,
+    description_limits=_ENTITY_DESCRIPTION_LIMITS,
+    strip_schema_field_defaults=True,
+)
+_lineage_response_processor = ResponseProcessor(
+    url_paths=["*.searchResults[].entity"],
+    transform_description=sanitize_and_truncate_description,
+    description_limit=NESTED_DESCRIPTION_LENGTH_LIMIT,
+    description_limits=_LINEAGE_DESCRIPTION_LIMITS,
+)
+
+
+def _url_for_urns(graph: DataHubGraph) -> Optional[Callable[[str], str]]:
+    return graph.url_for if _is_datahub_cloud(graph) else None
+
+
+def _check_entity_exists(urn: str, raw_entity: Optional[dict]) -> None:
+    # GMS resolves urns that don't exist to a stub entity, whose `exists` is false,
+    # and malformed ones to null. Soft-deleted entities still exist, so we also
+    # check their status aspect. Both fields are dropped from the entity.
+    if raw_entity is None or raw_entity.pop("exists", None) is False:
+        raise ItemNotFoundError(f"Entity {urn} not found")
+
+    status = raw_entity.pop("status", None)
+    if isinstance(status, dict) and status.get("removed"):
+        raise ItemNotFoundError(f"Entity {urn} not found (it has been soft-deleted)")
+
+
+def _entity_cache_key(
+    graph: DataHubGraph, urn: str, detail_level: str
+) -> Tuple[str, str, bool, str]:
+    return (_cache_scope(graph), urn, _is_datahub_cloud(graph), detail_level)
+
+
+async def _get_cached_entity(
+    graph: DataHubGraph, urn: str, detail_level: DetailLevel
+) -> Optional[dict]:
+    cached = _entity_cache.get(_entity_cache_key(graph, urn, detail_level))
+    return await _loads(cached) if cached is not None else None
+
+
+def _limit_schema_fields(raw_entity: dict) -> None:
+    """Keep only the first ENTITY_SCHEMA_FIELDS_LIMIT schema fields of an entity.
+
+    Wide datasets can have thousands of fields, which are expensive to process and
+    rarely all needed. The total number of fields is recorded as `totalFields`, and
+    the rest can be fetched with get_schema_fields.
+    """
+    limit = _get_int_env_variable("ENTITY_SCHEMA_FIELDS_LIMIT", 100)
+    schema_metadata = raw_entity.get("schemaMetadata")
+    if limit <= 0 or not isinstance(schema_metadata, dict):
+        return
+    fields = schema_metadata.get("fields") or []
+    if len(fields) <= limit:
+        return
+
+    schema_metadata["fields"] = fields[:limit]
+    schema_metadata["totalFields"] = len(fields)
+    editable_schema_metadata = raw_entity.get("editableSchemaMetadata") or {}
+    if field_infos := editable_schema_metadata.get("editableSchemaFieldInfo"):
+        field_paths = {field.get("fieldPath") for field in fields[:limit]}
+        editable_schema_metadata["editableSchemaFieldInfo"] = [
+            info for info in field_infos if info.get("fieldPath") in field_paths
+        ]
+
+
+def _process_encoded_entity(
+    graph: DataHubGraph, urn: str, raw_entity: Optional[dict], detail_level: DetailLevel
+) -> Tuple[dict, str]:
+    """Like `_process_entity`, but also returns the entity encoded as JSON."""
+    _check_entity_exists(urn, raw_entity)
+    assert raw_entity is not None
+    _limit_schema_fields(raw_entity)
+
+    entity = _entity_response_processor.process(
+        raw_entity, url_for=_url_for_urns(graph)
+    )
+    encoded = _json.dumps(entity)
+    _entity_cache.set(_entity_cache_key(graph, urn, detail_level), encoded)
+    return entity, encoded
 
-    if response and (schema_metadata := response.get("schemaMetadata")):
-        # Remove empty platformSchema to reduce response clutter
-        if platform_schema := schema_metadata.get("platformSchema"):
-            schema_value = platform_schema.get("schema")
-            if not schema_value or schema_value == "":
-                del schema_metadata["platformSchema"]
 
-        # Remove default field attributes (false values) to keep only meaningful data
-        if fields := schema_metadata.get("fields"):
-            for field in fields:
-                if field.get("recursive") is False:
-                    field.pop("recursive", None)
-                if field.get("isPartOfKey") is False:
-                    field.pop("isPartOfKey", None)
+def _process_entity(
+    graph: DataHubGraph, urn: str, raw_entity: Optional[dict], detail_level: DetailLevel
+) -> dict:
+    return _process_encoded_entity(graph, urn, raw_entity, detail_level)[0]
 
-    return response
 
+async def _get_encoded_entity_details(
+    client: DataHubClient, urn: str, detail_level: DetailLevel = "full"
+) -> Tuple[dict, str]:
+    """Like `_get_entity_details`, but also returns the entity encoded as JSON, so
+    that callers embedding it in a larger JSON document don't have to encode it
+    again."""
+    key = _entity_cache_key(client._graph, urn, detail_level)
+    if (cached := _entity_cache.get(key)) is not None:
+        return await _loads(cached), cached
 
-def _get_entity_details(client: DataHubClient, urn: str) -> dict:
     variables = {"urn": urn}
-    result = _execute_graphql(
-        client._graph,
-        query=entity_details_fragment_gql,
-        variables=variables,
-        operation_name="GetEntity",
+    result = (
+        await _execute_graphql(
+            client._graph,
+            query=entity_details_fragment_gql,
+            variables=variables,
+            operation_name=_entity_detail_operations[detail_level],
+            clean=True,
+        )
     )["entity"]
+    # Processing and encoding is CPU-bound, so we keep it off the event loop.
+    return await anyio.to_thread.run_sync(
+        _process_encoded_entity, client._graph, urn, result, detail_level
+    )
+
+
+async def _get_entity_details(
+    client: DataHubClient, urn: str, detail_level: DetailLevel = "full"
+) -> dict:
+    return (await _get_encoded_entity_details(client, urn, detail_level))[0]
+
 
-    inject_urls_for_urns(client._graph, result, [""])
-    truncate_descriptions(result)
+async def _get_entities_details(
+    client: DataHubClient, urns: List[str], detail_level: DetailLevel = "full"
+) -> Dict[str, dict]:
+    """Fetch many entities, keyed by urn in the order they were requested.
 
-    return clean_get_entity_response(result)
+    Entities that don't exist are returned as `{"error": ...}` instead of failing
+    the whole batch. Uncached entities are fetched in chunks of ENTITY_BATCH_SIZE
+    urns, and the chunks are fetched concurrently, at most ENTITY_BATCH_CONCURRENCY
+    at once.
+    """
+    graph = client._graph
+    results: Dict[str, dict] = {}
+    uncached: List[str] = []
+    for urn in dict.fromkeys(urns):
+        if (cached := await _get_cached_entity(graph, urn, detail_level)) is not None:
+            results[urn] = cached
+        else:
+            # Placeholder, so that results stay in request order.
+            results[urn] = {}
+            uncached.append(urn)
+
+    batch_size = max(1, _get_int_env_variable("ENTITY_BATCH_SIZE", 25))
+    chunks = [uncached[i : i + batch_size] for i in range(0, len(uncached), batch_size)]
+
+    limiter = anyio.CapacityLimiter(
+        max(1, _get_int_env_variable("ENTITY_BATCH_CONCURRENCY", 8))
+    )
+
+    async def _get_chunk(chunk: List[str]) -> List[dict]:
+        async with limiter:
+            raw_entities = (
+                await _execute_graphql(
+                    graph,
+                    query=entity_details_fragment_gql,
+                    variables={"urns": chunk},
+                    operation_name=_entities_detail_operations[detail_level],
+                    clean=True,
+                )
+            )["entities"] or []
+            # GMS may omit entities that don't exist, so match the results by urn.
+            by_urn = {entity["urn"]: entity for entity in raw_entities if entity}
+            return await anyio.to_thread.run_sync(
+                _process_chunk, [(urn, by_urn.get(urn)) for urn in chunk]
+            )
+
+    def _process_chunk(raw_entities: List[Tuple[str, Optional[dict]]]) -> List[dict]:
+        processed = []
+        for urn, raw_entity in raw_entities:
+            try:
+                processed.append(_process_entity(graph, urn, raw_entity, detail_level))
+            except ItemNotFoundError as e:
+                processed.append({"error": str(e)})
+        return processed
+
+    chunk_results = await _gather(
+        *(functools.partial(_get_chunk, chunk) for chunk in chunks)
+    )
+    for chunk, processed in zip(chunks, chunk_results):
+        results.update(zip(chunk, processed))
+    return results
 
 
 def _extract_search_result_title(entity: Any, fallback: str) -> str:
@@ -345,16 +875,132 @@ def _openai_format_search_results(
     return {"results": openai_results}
 
 
-@mcp.tool(description="Get an entity by its DataHub URN.")
-@async_background
-def get_entity(urn: str) -> dict:
+@mcp.tool(
+    description="""Get an entity by its DataHub URN.
+
+Use detail_level to control how much metadata is returned:
+- "summary": name, type, platform and description only. Use this to identify an entity.
+- "standard": adds ownership, tags, glossary terms, domain, deprecation and usage stats.
+- "full" (default): also includes schema fields and other type-specific details.
+  Only the first schema fields of wide datasets are included; use get_schema_fields for the rest.
+"""
+)
+async def get_entity(urn: str, detail_level: DetailLevel = "full") -> dict:
     client = get_datahub_client()
 
-    if not client._graph.exists(urn):
-        # TODO: Ideally we use the `exists` field to check this, and also deal with soft-deleted entities.
-        raise ItemNotFoundError(f"Entity {urn} not found")
+    return _fit_response(await _get_entity_details(client, urn, detail_level))
 
-    return _get_entity_details(client, urn)
+
+@mcp.tool(
+    description="""Get multiple entities by their DataHub URNs in a single call.
+
+Prefer this over repeated get_entity/fetch calls, e.g. to look up the results of a search.
+Returns an object keyed by URN. Entities that could not be found have an "error" field instead.
+detail_level works the same way as for get_entity.
+"""
+)
+async def get_entities(urns: List[str], detail_level: DetailLevel = "full") -> dict:
+    client = get_datahub_client()
+
+    return _fit_response(await _get_entities_details(client, urns, detail_level))
+
+
+# Upper bound on the number of schema fields get_schema_fields returns at once.
+MAX_SCHEMA_FIELDS_PAGE_SIZE = 1000
+# Upper bound on the length of get_schema_fields patterns, which limits how slow a
+# pathological regular expression can get.
+MAX_SCHEMA_FIELDS_PATTERN_LENGTH = 200
+
+
+async def _get_schema_fields(graph: DataHubGraph, urn: str) -> Dict[str, List[dict]]:
+    """Fetch all schema fields of a dataset, and their editable field info."""
+    key = _entity_cache_key(graph, urn, "schemaFields")
+    if (cached := _entity_cache.get(key)) is not None:
+        return await _loads(cached)
+
+    raw_entity = (
+        await _execute_graphql(
+            graph,
+            query=entity_details_fragment_gql,
+            variables={"urn": urn},
+            operation_name="GetSchemaFields",
+            clean=True,
+        )
+    )["entity"]
+    _check_entity_exists(urn, raw_entity)
+
+    def _process() -> Dict[str, List[dict]]:
+        entity = _entity_response_processor.process(raw_entity)
+        schema_fields = {
+            "fields": (entity.get("schemaMetadata") or {}).get("fields") or [],
+            "editableSchemaFieldInfo": (entity.get("editableSchemaMetadata") or {}).get(
+                "editableSchemaFieldInfo"
+            )
+            or [],
+        }
+        _entity_cache.set(key, _json.dumps(schema_fields))
+        return schema_fields
+
+    return await anyio.to_thread.run_sync(_process)
+
+
+@mcp.tool(
+    description="""Get the schema fields (columns) of a dataset, a page at a time.
+
+get_entity, get_entities and fetch only include the first fields of wide datasets; \
+their schemaMetadata then has a totalFields count. Use this tool to page through the \
+remaining fields with start and count, or to find fields by name.
+pattern is a case-insensitive regular expression of up to 200 characters matched against field paths, e.g. "customer" or "^id$".
+Returns the total number of matching fields and the requested page of them.
+"""
+)
+async def get_schema_fields(
+    urn: str, start: int = 0, count: int = 100, pattern: Optional[str] = None
+) -> dict:
+    client = get_datahub_client()
+
+    if Urn.from_string(urn).entity_type != DatasetUrn.ENTITY_TYPE:
+        raise ValueError(f"Input urn should be a dataset urn, but got {urn}.")
+    regex = None
+    if pattern:
+        if len(pattern) > MAX_SCHEMA_FIELDS_PATTERN_LENGTH:
+            raise ValueError(
+                f"Pattern is too long: at most {MAX_SCHEMA_FIELDS_PATTERN_LENGTH} "
+                "characters are allowed."
+            )
+        try:
+            regex = re.compile(pattern, re.IGNORECASE)
+        except re.error as e:
+            raise ValueError(f"Invalid pattern {pattern!r}: {e}") from e
+    start = max(start, 0)
+    count = min(max(count, 1), MAX_SCHEMA_FIELDS_PAGE_SIZE)
+
+    schema_fields = await _get_schema_fields(client._graph, urn)
+    fields = schema_fields["fields"]
+    if regex is not None:
+        # Matching wide schemas against an arbitrary pattern can be slow, so we
+        # keep it off the event loop.
+        search = regex.search
+        fields = await anyio.to_thread.run_sync(
+            lambda: [field for field in fields if search(field["fieldPath"])]
+        )
+    page = fields[start : start + count]
+
+    result: Dict[str, Any] = {
+        "urn": urn,
+        "total": len(fields),
+        "start": start,
+        "count": len(page),
+        "fields": page,
+    }
+    field_paths = {field["fieldPath"] for field in page}
+    if field_infos := [
+        info
+        for info in schema_fields["editableSchemaFieldInfo"]
+        if info.get("fieldPath") in field_paths
+    ]:
+        result["editableSchemaFieldInfo"] = field_infos
+    return _fit_response(result)
 
 
 @mcp.tool(
@@ -362,41 +1008,53 @@ def get_entity(urn: str) -> dict:
         "Fetch a DataHub entity with details formatted for OpenAI's fetch tool response."
     )
 )
-@async_background
-def fetch(document_id: Annotated[str, Field(alias="id")]) -> ToolResult:
+async def fetch(
+    document_id: Annotated[str, Field(alias="id")],
+    detail_level: DetailLevel = "full",
+) -> ToolResult:
     """Return entity details plus lineage formatted for OpenAI's fetch requirements."""
 
     client = get_datahub_client()
 
-    if not client._graph.exists(document_id):
-        raise ItemNotFoundError(f"Entity {document_id} not found")
-    
-    entity = _get_entity_details(client, document_id)
+    async def _get_lineage() -> Dict[str, Any]:
+        try:
+            lineage_api = AssetLineageAPI(client._graph)
+            asset_lineage_directive = AssetLineageDirective(
+                urn=document_id,
+                upstream=True,
+                downstream=True,
+                max_hops=1,
+                extra_filters=None,
+            )
+            return await lineage_api.get_lineage(asset_lineage_directive)
+        except Exception as exc:  # pragma: no cover - defensive guard
+            logger.warning(f"Unable to retrieve lineage for {document_id}: {exc}")
+            return {}
+
+    # The lineage doesn't depend on the entity details, so fetch both in parallel.
+    (entity, encoded_entity), lineage = await _gather(
+        functools.partial(
+            _get_encoded_entity_details, client, document_id, detail_level
+        ),
+        _get_lineage,
+    )
 
     url = entity.get("url")
     if not url:
         with contextlib.suppress(Exception):
             url = client._graph.url_for(document_id)
 
-    lineage: Dict[str, Any] = {}
-    try:
-        lineage_api = AssetLineageAPI(client._graph)
-        asset_lineage_directive = AssetLineageDirective(
-            urn=document_id,
-            upstream=True,
-            downstream=True,
-            max_hops=1,
-            extra_filters=None,
-        )
-        lineage = lineage_api.get_lineage(asset_lineage_directive)
-        inject_urls_for_urns(client._graph, lineage, ["*.searchResults[].entity"])
-        truncate_descriptions(lineage)
-    except Exception as exc:  # pragma: no cover - defensive guard
-        logger.warning(f"Unable to retrieve lineage for {document_id}: {exc}")
-        lineage = {}
-
-    document_payload = {"entity": entity, "lineage": lineage}
-    text_payload = json.dumps(document_payload, ensure_ascii=False)
+    # The entity is usually the bulk of the document, so we splice in its existing
+    # encoding rather than encoding it again, unless it has to be pruned.
+    max_bytes = _get_max_response_bytes()
+    if 0 < max_bytes < len(encoded_entity) + estimate_size(lineage):
+        text_payload = _json.dumps(
+            fit_to_budget({"entity": entity, "lineage": lineage}, max_bytes)
+        )
+    else:
+        text_payload = _json.dumps(
+            {"entity": _json.Fragment(encoded_entity), "lineage": lineage}
+        )
 
     metadata: Dict[str, Any] = {"source": "datahub"}
     if entity_type := entity.get("type") or entity.get("entityType"):
@@ -416,20 +1074,58 @@ def fetch(document_id: Annotated[str, Field(alias="id")]) -> ToolResult:
         "metadata": metadata,
     }
 
-    return ToolResult(
-        content=[
-            TextContent(type="text", text=json.dumps(document, ensure_ascii=False))
-        ]
+    return ToolResult(content=[TextContent(type="text", text=_json.dumps(document))])
+
+
+# Upper bound on the number of pages a single search tool call may fetch.
+MAX_SEARCH_PAGES = 10
+
+
+def _search_fingerprint(
+    query: str, types: Optional[List[Any]], compiled_filters: Any
+) -> str:
+    # Scroll ids are only valid for the search they came from. Equivalent searches
+    # share cached results (see _search_cache_key), including their cursors, so
+    # they must have the same fingerprint too.
+    payload = json.dumps(
+        _canonical_search(query, types, compiled_filters), sort_keys=True
     )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _encode_search_cursor(scroll_id: str, fingerprint: str) -> str:
+    payload = json.dumps({"scrollId": scroll_id, "search": fingerprint})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
 
 
-def _search_implementation(
+def _decode_search_cursor(cursor: str, fingerprint: str) -> str:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        scroll_id = payload["scrollId"]
+        search_fingerprint = payload["search"]
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid search cursor: {cursor}") from e
+    if search_fingerprint != fingerprint:
+        raise ValueError(
+            "The search cursor belongs to a different search. Pass the same query "
+            "and filters that were used to obtain it."
+        )
+    return scroll_id
+
+
+async def _search_implementation(
     query: str,
     filters: Optional[Filter | str],
     num_results: int,
     search_strategy: Optional[Literal["semantic", "keyword"]] = None,
+    *,
+    cursor: Optional[str] = None,
 ) -> dict:
-    """Core search implementation that can use either semantic or keyword search."""
+    """Core search implementation that can use either semantic or keyword search.
+
+    Keyword search results include a `nextCursor` if there are more results, which
+    can be passed back as `cursor` to get the next page.
+    """
     client = get_datahub_client()
 
     # As of 2025-07-25: Our Filter type is a tagged/discriminated union.
@@ -445,8 +1141,8 @@ def _search_implementation(
     # handling this, but removed it in
     # https://github.com/jlowin/fastmcp/commit/7b9696405b1427f4dc5430891166286744b3dab5
     if isinstance(filters, str):
-        filters = load_filters(filters)
-    types, compiled_filters = compile_filters(filters)
+        filters = _load_filters(filters)
+    types, compiled_filters = _compile_filters(filters)
     variables = {
         "query": query,
         "types": types,
@@ -456,7 +1152,10 @@ def _search_implementation(
 
     # Choose GraphQL query and operation based on strategy
     use_semantic = search_strategy == "semantic"
+    fingerprint = _search_fingerprint(query, types, compiled_filters)
     if use_semantic:
+        if cursor:
+            raise ValueError("Pagination is not supported for semantic search.")
         gql_query = semantic_search_gql
         operation_name = "semanticSearch"
         response_key = "semanticSearchAcrossEntities"
@@ -464,31 +1163,103 @@ def _search_implementation(
         gql_query = search_gql
         operation_name = "search"
         response_key = "scrollAcrossEntities"
-        # Add scrollId for keyword search (maintaining compatibility)
-        variables["scrollId"] = None
-
-    response = _execute_graphql(
-        client._graph,
-        query=gql_query,
-        variables=variables,
-        operation_name=operation_name,
+        variables["scrollId"] = (
+            _decode_search_cursor(cursor, fingerprint) if cursor else None
+        )
+
+    cache_key = _search_cache_key(client._graph, operation_name, variables, num_results)
+    if (cached := _search_cache.get(cache_key)) is not None:
+        return await _loads(cached)
+
+    response = (
+        await _execute_graphql(
+            client._graph,
+            query=gql_query,
+            variables=variables,
+            operation_name=operation_name,
+            clean=True,
+        )
     )[response_key]
 
+    if isinstance(response, dict):
+        # The scroll id is wrapped in an opaque cursor that is tied to this search.
+        next_scroll_id = response.pop("nextScrollId", None)
+        if next_scroll_id and num_results > 0:
+            response["nextCursor"] = _encode_search_cursor(next_scroll_id, fingerprint)
+
     if num_results == 0 and isinstance(response, dict):
         # Hack to support num_results=0 without support for it in the backend.
         response.pop("searchResults", None)
         response.pop("count", None)
 
-    cleaned_response = clean_gql_response(response)
-    return cleaned_response
+    def _process() -> Any:
+        cleaned_response = clean_gql_response(response)
+        _search_cache.set(cache_key, _json.dumps(cleaned_response))
+        return cleaned_response
+
+    return await anyio.to_thread.run_sync(_process)
+
+
+async def _search_pages(
+    query: str,
+    filters: Optional[Filter | str],
+    num_results: int,
+    search_strategy: Optional[Literal["semantic", "keyword"]],
+    *,
+    cursor: Optional[str],
+    max_pages: int,
+    ctx: Optional[Context],
+) -> dict:
+    """Fetch up to max_pages pages of search results, following the cursor.
+
+    Each page is also sent as a progress notification as soon as it arrives, so
+    that clients which support it can start working with the results early. The
+    final result contains the results of all pages, the facets of the first page
+    and the cursor for the page after the last one.
+    """
+    max_pages = min(max(max_pages, 1), MAX_SEARCH_PAGES)
+
+    result: Optional[dict] = None
+    for page in range(1, max_pages + 1):
+        kwargs: Dict[str, Any] = {"cursor": cursor} if cursor else {}
+        response = await _search_implementation(
+            query, filters, num_results, search_strategy, **kwargs
+        )
+        cursor = response.get("nextCursor")
+
+        if result is None:
+            result = response
+        else:
+            result["searchResults"] = result.get("searchResults", []) + response.get(
+                "searchResults", []
+            )
+            result["count"] = result.get("count", 0) + response.get("count", 0)
+            result.pop("nextCursor", None)
+            if cursor:
+                result["nextCursor"] = cursor
+
+        if max_pages > 1 and ctx is not None:
+            await ctx.report_progress(
+                progress=page,
+                total=max_pages,
+                message=_json.dumps(response),
+            )
+        if not cursor:
+            break
+
+    assert result is not None
+    return result
 
 
 # Define enhanced search tool when semantic search is enabled
-def enhanced_search(
+async def enhanced_search(
     query: str = "*",
     search_strategy: Optional[Literal["semantic", "keyword"]] = None,
     filters: Optional[Filter | str] = None,
     num_results: int = 10,
+    cursor: Optional[str] = None,
+    max_pages: int = 1,
+    ctx: Optional[Context] = None,
 ) -> dict:
     """Enhanced search across DataHub entities with semantic and keyword capabilities.
 
@@ -558,15 +1329,37 @@ def enhanced_search(
     - Semantic: "financial performance metrics" → finds revenue_kpis, profit_analysis, financial_dashboards
     - Keyword: "/q financial_performance_metrics" → finds exact table name matches
     - Keyword: "/q (financial OR revenue) AND metrics" → complex boolean logic
+
+    PAGINATION (keyword search only):
+    If there are more results, the response contains a `nextCursor`. To get the next page, repeat the
+    same search with `cursor` set to it. Set `max_pages` (up to 10) to fetch several pages in one call;
+    each page is also streamed as a progress notification.
     """
-    return _search_implementation(query, filters, num_results, search_strategy)
+    if cursor is None and max_pages <= 1:
+        return _fit_response(
+            await _search_implementation(query, filters, num_results, search_strategy)
+        )
+    return _fit_response(
+        await _search_pages(
+            query,
+            filters,
+            num_results,
+            search_strategy,
+            cursor=cursor,
+            max_pages=max_pages,
+            ctx=ctx,
+        )
+    )
 
 
 # Define original search tool for backward compatibility
-def search(
+async def search(
     query: str = "*",
     filters: Optional[Filter | str] = None,
     num_results: int = 10,
+    cursor: Optional[str] = None,
+    max_pages: int = 1,
+    ctx: Optional[Context] = None,
 ) -> dict:
     """Search across DataHub entities.
 
@@ -600,11 +1393,29 @@ def search(
       ]
     }
     ```
+
+    If there are more results, the response contains a `nextCursor`. To get the next page, repeat the
+    same search with `cursor` set to it. Set `max_pages` (up to 10) to fetch several pages in one call;
+    each page is also streamed as a progress notification.
     """
-    return _search_implementation(query, filters, num_results, "keyword")
+    if cursor is None and max_pages <= 1:
+        return _fit_response(
+            await _search_implementation(query, filters, num_results, "keyword")
+        )
+    return _fit_response(
+        await _search_pages(
+            query,
+            filters,
+            num_results,
+            "keyword",
+            cursor=cursor,
+            max_pages=max_pages,
+            ctx=ctx,
+        )
+    )
 
 
-def openai_search(query: str) -> ToolResult:
+async def openai_search(query: str) -> ToolResult:
     """Search across DataHub entities with OpenAI-compatible response format.
 
     This is a simplified search interface that conforms to OpenAI requirements
@@ -619,10 +1430,10 @@ def openai_search(query: str) -> ToolResult:
     """
     # Use defaults that work well for OpenAI integration
     dbt_filter: Filter = FilterDsl.custom_filter(
-       field="platform", condition="EQUAL", values=["urn:li:dataPlatform:dbt"]
+        field="platform", condition="EQUAL", values=["urn:li:dataPlatform:dbt"]
     )
 
-    result = _search_implementation(
+    result = await _search_implementation(
         query, filters=dbt_filter, num_results=10, search_strategy="keyword"
     )
 
@@ -630,19 +1441,14 @@ def openai_search(query: str) -> ToolResult:
     client = get_datahub_client()
     openai_formatted = _openai_format_search_results(result, client)
     return ToolResult(
-        content=[
-            TextContent(
-                type="text", text=json.dumps(openai_formatted, ensure_ascii=False)
-            )
-        ]
+        content=[TextContent(type="text", text=_json.dumps(openai_formatted))]
     )
 
 
 @mcp.tool(
     description="Use this tool to get the SQL queries associated with a dataset or a dataset column."
 )
-@async_background
-def get_dataset_queries(
+async def get_dataset_queries(
     urn: str, column: Optional[str] = None, start: int = 0, count: int = 10
 ) -> dict:
     client = get_datahub_client()
@@ -652,7 +1458,7 @@ def get_dataset_queries(
     entities_filter = FilterDsl.custom_filter(
         field="entities", condition="EQUAL", values=[urn]
     )
-    _, compiled_filters = compile_filters(entities_filter)
+    _, compiled_filters = _compile_filters(entities_filter)
 
     # Set up variables for the query
     variables = {
@@ -660,18 +1466,20 @@ def get_dataset_queries(
     }
 
     # Execute the GraphQL query
-    result = _execute_graphql(
-        client._graph,
-        query=queries_gql,
-        variables=variables,
-        operation_name="listQueries",
+    result = (
+        await _execute_graphql(
+            client._graph,
+            query=queries_gql,
+            variables=variables,
+            operation_name="listQueries",
+        )
     )["listQueries"]
 
     for query in result["queries"]:
         if query.get("subjects"):
             query["subjects"] = _deduplicate_subjects(query["subjects"])
 
-    return clean_gql_response(result)
+    return _fit_response(clean_gql_response(result))
 
 
 def _deduplicate_subjects(subjects: list[dict]) -> list[str]:
@@ -686,19 +1494,41 @@ def _deduplicate_subjects(subjects: list[dict]) -> list[str]:
     return list(updated_subjects)
 
 
+def _lineage_graph_node(
+    entity: Dict[str, Any],
+) -> Tuple[str, Optional[str], Optional[str], Optional[str]]:
+    """Get the (urn, type, name, platform) of a `lineageGraphNode`."""
+    platform = (
+        entity.get("platform") or (entity.get("dataFlow") or {}).get("platform") or {}
+    )
+    name = (
+        entity.get("name")
+        or (entity.get("properties") or {}).get("name")
+        or entity.get("fieldPath")
+    )
+    return entity["urn"], entity.get("type"), name, platform.get("name")
+
+
+# Upper bound on the number of lineage results per direction, like DataHub's own.
+MAX_LINEAGE_RESULTS = 10000
+
+
 class AssetLineageDirective(BaseModel):
     urn: str
     upstream: bool
     downstream: bool
     max_hops: int
     extra_filters: Optional[Filter]
+    max_results: int = 30
 
 
 class AssetLineageAPI:
     def __init__(self, graph: DataHubGraph) -> None:
         self.graph = graph
 
-    def get_degree_filter(self, max_hops: int) -> Filter:
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def get_degree_filter(max_hops: int) -> Filter:
         """
         max_hops: Maximum number of hops to search for lineage
         """
@@ -717,53 +1547,377 @@ class AssetLineageAPI:
         else:
             raise ValueError(f"Invalid number of hops: {max_hops}")
 
-    def get_lineage(
+    def _get_directions(
         self, asset_lineage_directive: AssetLineageDirective
+    ) -> Dict[str, str]:
+        directions: Dict[str, str] = {}
+        if asset_lineage_directive.upstream:
+            directions["upstreams"] = "UPSTREAM"
+        if asset_lineage_directive.downstream:
+            directions["downstreams"] = "DOWNSTREAM"
+        return directions
+
+    async def _search_across_lineage(
+        self,
+        asset_lineage_directive: AssetLineageDirective,
+        direction: str,
+        *,
+        operation_name: str,
     ) -> Dict[str, Any]:
-        result: Dict[str, Any] = {}
+        """Get up to `max_results` lineage results in one direction.
 
+        The first page tells us how many results there are, and the remaining pages
+        are then fetched concurrently, at most LINEAGE_PAGE_CONCURRENCY at once, and
+        appended to the first one.
+        """
         filter = self.get_degree_filter(asset_lineage_directive.max_hops)
         if asset_lineage_directive.extra_filters:
             filter = FilterDsl.and_(filter, asset_lineage_directive.extra_filters)
-        types, compiled_filters = compile_filters(filter)
-        variables = {
-            "urn": asset_lineage_directive.urn,
-            "start": 0,
-            "count": 30,
-            "types": types,
-            "orFilters": compiled_filters,
-            "searchFlags": {"skipHighlighting": True, "maxAggValues": 3},
-        }
-        if asset_lineage_directive.upstream:
-            result["upstreams"] = clean_gql_response(
-                _execute_graphql(
+        types, compiled_filters = _compile_filters(filter)
+
+        max_results = min(asset_lineage_directive.max_results, MAX_LINEAGE_RESULTS)
+        if max_results < 1:
+            raise ValueError(f"Invalid max_results: {max_results}")
+        page_size = min(
+            max_results, max(1, _get_int_env_variable("LINEAGE_PAGE_SIZE", 100))
+        )
+        limiter = anyio.CapacityLimiter(
+            max(1, _get_int_env_variable("LINEAGE_PAGE_CONCURRENCY", 8))
+        )
+
+        async def _get_page(start: int) -> Dict[str, Any]:
+            async with limiter:
+                response = await _execute_graphql(
                     self.graph,
                     query=entity_details_fragment_gql,
                     variables={
                         "input": {
-                            **variables,
-                            "direction": "UPSTREAM",
+                            "urn": asset_lineage_directive.urn,
+                            "direction": direction,
+                            "start": start,
+                            "count": min(page_size, max_results - start),
+                            "types": types,
+                            "orFilters": compiled_filters,
+                            "searchFlags": {
+                                "skipHighlighting": True,
+                                "maxAggValues": 3,
+                            },
                         }
                     },
-                    operation_name="GetEntityLineage",
-                )["searchAcrossLineage"]
+                    operation_name=operation_name,
+                )
+            return response["searchAcrossLineage"]
+
+        result = await _get_page(0)
+        total = min(result.get("total") or 0, max_results)
+        pages = await _gather(
+            *(
+                functools.partial(_get_page, start)
+                for start in range(page_size, total, page_size)
             )
-        if asset_lineage_directive.downstream:
-            result["downstreams"] = clean_gql_response(
-                _execute_graphql(
-                    self.graph,
-                    query=entity_details_fragment_gql,
-                    variables={
-                        "input": {
-                            **variables,
-                            "direction": "DOWNSTREAM",
-                        }
-                    },
+        )
+        for page in pages:
+            result["searchResults"].extend(page["searchResults"])
+        return result
+
+    async def get_lineage(
+        self, asset_lineage_directive: AssetLineageDirective
+    ) -> Dict[str, Any]:
+        directions = self._get_directions(asset_lineage_directive)
+
+        # The directions are independent, so we issue them in parallel.
+        results = await _gather(
+            *(
+                functools.partial(
+                    self._search_across_lineage,
+                    asset_lineage_directive,
+                    direction,
                     operation_name="GetEntityLineage",
-                )["searchAcrossLineage"]
+                )
+                for direction in directions.values()
+            )
+        )
+        result: Dict[str, Any] = dict(zip(directions.keys(), results))
+
+        # Clean, truncate and add urls to both directions in a single pass, off the
+        # event loop.
+        return await anyio.to_thread.run_sync(
+            functools.partial(
+                _lineage_response_processor.process,
+                result,
+                url_for=_url_for_urns(self.graph),
             )
+        )
 
-        return result
+    def _lineage_cache_key(
+        self, asset_lineage_directive: AssetLineageDirective, urn: str, direction: str
+    ) -> Tuple[str, str, bool, str, str]:
+        extra_filters = asset_lineage_directive.extra_filters
+        return (
+            _cache_scope(self.graph),
+            urn,
+            _is_datahub_cloud(self.graph),
+            direction,
+            extra_filters.model_dump_json() if extra_filters else "",
+        )
+
+    def _get_cached_neighbors(
+        self, asset_lineage_directive: AssetLineageDirective, urn: str, direction: str
+    ) -> Optional[LineageNeighbors]:
+        neighbors = _lineage_cache.get(
+            self._lineage_cache_key(asset_lineage_directive, urn, direction)
+        )
+        # An entry that was cut short is still good enough, as long as it has as
+        # many results as we'd fetch now.
+        if neighbors is not None and len(neighbors.neighbors) >= min(
+            neighbors.total, asset_lineage_directive.max_results
+        ):
+            return neighbors
+        return None
+
+    def _remember_neighbors(
+        self,
+        asset_lineage_directive: AssetLineageDirective,
+        direction: str,
+        result: Dict[str, Any],
+    ) -> Optional[LineageNeighbors]:
+        """Cache the direct lineage of the root entity from a `GetEntityLineageGraph`
+        result, if the result contains all of it."""
+        neighbors = tuple(
+            _lineage_graph_node(search_result["entity"])
+            for search_result in result["searchResults"]
+            if search_result["degree"] == 1
+        )
+        total = result.get("total") or 0
+        if asset_lineage_directive.max_hops > 1:
+            # With more than one hop, we only know the full direct lineage if we
+            # got all of the results.
+            if len(result["searchResults"]) < total:
+                return None
+            total = len(neighbors)
+
+        lineage_neighbors = LineageNeighbors(total=total, neighbors=neighbors)
+        _lineage_cache.set(
+            self._lineage_cache_key(
+                asset_lineage_directive, asset_lineage_directive.urn, direction
+            ),
+            lineage_neighbors,
+        )
+        return lineage_neighbors
+
+    async def _fetch_neighbors(
+        self, asset_lineage_directive: AssetLineageDirective, urn: str, direction: str
+    ) -> LineageNeighbors:
+        directive = asset_lineage_directive.model_copy(
+            update={"urn": urn, "max_hops": 1}
+        )
+        result = await self._search_across_lineage(
+            directive, direction, operation_name="GetEntityLineageGraph"
+        )
+        neighbors = self._remember_neighbors(directive, direction, result)
+        assert neighbors is not None  # Always known for a single hop.
+        return neighbors
+
+    async def _expand_lineage_graph(
+        self, asset_lineage_directive: AssetLineageDirective, key: str, direction: str
+    ) -> Optional[LineageGraph]:
+        """Build a graph breadth-first from the direct lineage of each entity.
+
+        Direct lineage we've already seen is served from memory, and only the
+        frontier is fetched. Returns None if that would take more requests than
+        letting DataHub traverse the lineage itself.
+        """
+        root = asset_lineage_directive.urn
+        max_queries = _get_int_env_variable("LINEAGE_EXPANSION_MAX_QUERIES", 10)
+        upstream = direction == "UPSTREAM"
+
+        graph = LineageGraph(root)
+        root_total = 0
+        level = [root]
+        for degree in range(1, asset_lineage_directive.max_hops + 1):
+            neighbors_by_urn = {
+                urn: self._get_cached_neighbors(asset_lineage_directive, urn, direction)
+                for urn in level
+            }
+            missing = [urn for urn, n in neighbors_by_urn.items() if n is None]
+            # Expanding the graph ourselves only pays off once we've seen the
+            # direct lineage of the root.
+            if (degree == 1 and missing) or len(missing) > max_queries:
+                return None
+            fetched = await _gather(
+                *(
+                    functools.partial(
+                        self._fetch_neighbors, asset_lineage_directive, urn, direction
+                    )
+                    for urn in missing
+                )
+            )
+            neighbors_by_urn.update(zip(missing, fetched))
+            if degree == 1 and (root_neighbors := neighbors_by_urn[root]):
+                root_total = root_neighbors.total
+
+            next_level = []
+            for urn, neighbors in neighbors_by_urn.items():
+                assert neighbors is not None
+                for neighbor_urn, type, name, platform in neighbors.neighbors:
+                    if neighbor_urn not in graph.nodes:
+                        next_level.append(neighbor_urn)
+                    graph.add_node(
+                        neighbor_urn,
+                        type=type,
+                        degree=degree,
+                        name=name,
+                        platform=platform,
+                    )
+                    if upstream:
+                        graph.add_edge(neighbor_urn, urn)
+                    else:
+                        graph.add_edge(urn, neighbor_urn)
+            level = next_level
+
+        # Like DataHub, return up to max_results entities, closest to the root first.
+        total = max(len(graph.nodes) - 1, root_total)
+        if len(graph.nodes) - 1 > asset_lineage_directive.max_results:
+            graph = graph.truncate(asset_lineage_directive.max_results)
+        graph.totals[key] = total
+        return graph
+
+    async def _get_lineage_subgraph(
+        self, asset_lineage_directive: AssetLineageDirective, key: str, direction: str
+    ) -> LineageGraph:
+        # With extra filters, DataHub also traverses through entities that don't
+        # match the filters, which we can't replicate hop by hop.
+        if asset_lineage_directive.max_hops == 1 or (
+            asset_lineage_directive.max_hops == 2
+            and asset_lineage_directive.extra_filters is None
+        ):
+            expanded = await self._expand_lineage_graph(
+                asset_lineage_directive, key, direction
+            )
+            if expanded is not None:
+                return expanded
+
+        result = await self._search_across_lineage(
+            asset_lineage_directive, direction, operation_name="GetEntityLineageGraph"
+        )
+        self._remember_neighbors(asset_lineage_directive, direction, result)
+
+        root = asset_lineage_directive.urn
+        graph = LineageGraph(root)
+        graph.totals[key] = result.get("total") or 0
+        upstream = direction == "UPSTREAM"
+        for search_result in result["searchResults"]:
+            urn, type, name, platform = _lineage_graph_node(search_result["entity"])
+            graph.add_node(
+                urn,
+                type=type,
+                degree=search_result["degree"],
+                name=name,
+                platform=platform,
+            )
+            paths = [
+                [e["urn"] for e in path["path"] if e]
+                for path in search_result.get("paths") or []
+                if path and path.get("path")
+            ]
+            for path in paths:
+                graph.add_path(path, upstream=upstream)
+            if not paths and search_result["degree"] == 1:
+                # Without paths, we only know the edges to direct neighbors.
+                graph.add_path([root, urn], upstream=upstream)
+        return graph
+
+    async def get_lineage_graph(
+        self, asset_lineage_directive: AssetLineageDirective
+    ) -> LineageGraph:
+        """Get the lineage around an entity as an adjacency graph.
+
+        This only fetches urns, degrees and lineage paths, so it is much cheaper
+        than `get_lineage` for wide lineage. The direct lineage of every entity is
+        cached, so exploring lineage hop by hop only fetches what's new.
+        """
+        directions = self._get_directions(asset_lineage_directive)
+        subgraphs = await _gather(
+            *(
+                functools.partial(
+                    self._get_lineage_subgraph, asset_lineage_directive, key, direction
+                )
+                for key, direction in directions.items()
+            )
+        )
+
+        graph = LineageGraph(asset_lineage_directive.urn)
+        for subgraph in subgraphs:
+            graph.update(subgraph)
+        return graph
+
+    async def get_columns_lineage(
+        self,
+        asset_lineage_directive: AssetLineageDirective,
+        columns: List[str],
+        *,
+        format: Literal["full", "graph"] = "full",
+    ) -> Dict[str, Any]:
+        """Get the lineage of many columns of a dataset at once.
+
+        The directive's urn must be a dataset urn. Columns are queried concurrently,
+        with at most COLUMN_LINEAGE_CONCURRENCY columns in flight at once. Columns
+        whose lineage can't be fetched, including because of network errors or
+        timeouts, get an "error" instead of failing the call.
+        """
+        dataset_urn = asset_lineage_directive.urn
+        limiter = anyio.CapacityLimiter(
+            max(1, _get_int_env_variable("COLUMN_LINEAGE_CONCURRENCY", 8))
+        )
+
+        async def _get_column_lineage(column: str) -> Any:
+            directive = asset_lineage_directive.model_copy(
+                update={"urn": maybe_convert_to_schema_field_urn(dataset_urn, column)}
+            )
+            async with limiter:
+                try:
+                    if format == "graph":
+                        return await self.get_lineage_graph(directive)
+                    return await self.get_lineage(directive)
+                except (GraphError, OperationalError, httpx.TransportError) as e:
+                    return {"error": str(e) or type(e).__name__}
+
+        # Columns are listed in the order they were requested, without duplicates.
+        columns = list(dict.fromkeys(columns))
+        results = await _gather(
+            *(functools.partial(_get_column_lineage, column) for column in columns)
+        )
+        if format != "graph":
+            return {"columns": dict(zip(columns, results))}
+
+        # Merge the graphs of all columns, so that entities related to several
+        # columns are only listed once.
+        graph = LineageGraph(dataset_urn)
+        column_results: Dict[str, Any] = {}
+        for column, result in zip(columns, results):
+            if not isinstance(result, LineageGraph):
+                column_results[column] = result
+                continue
+            graph.add_node(result.root, type="SCHEMA_FIELD", degree=0, name=column)
+            graph.update(result)
+            column_results[column] = {"total": result.totals}
+        # Totals only make sense per column.
+        graph.totals.clear()
+
+        def _to_dict(graph: LineageGraph) -> Dict[str, Any]:
+            compact = graph.to_compact_dict()
+            node_indexes = {urn: i for i, urn in enumerate(graph.nodes)}
+            compact["columns"] = {}
+            for column, result in zip(columns, results):
+                column_result = dict(column_results[column])
+                if isinstance(result, LineageGraph) and result.root in node_indexes:
+                    column_result["node"] = node_indexes[result.root]
+                compact["columns"][column] = column_result
+            return compact
+
+        # Column nodes are closest to the root, so they are kept when the graph is
+        # pruned to fit the response budget.
+        return _fit_lineage_graph(graph, _to_dict)
 
 
 @mcp.tool(
@@ -772,22 +1926,27 @@ Use this tool to get upstream or downstream lineage for any entity, including da
 Set upstream to True for upstream lineage, False for downstream lineage.
 Set `column: null` to get lineage for entire dataset or for entity type other than dataset.
 Setting max_hops to 3 is equivalent to unlimited hops.
+Up to max_results related entities are returned per direction. Increase it for entities with wide lineage.
+Set format to "graph" to get a compact graph instead of full entity details: a table of nodes, \
+a table of platforms referenced by index, and edges as [upstream, downstream] pairs of node indexes. \
+This is much smaller, so prefer it for impact analysis over wide lineage.
 Usage and format of filters is same as that in search tool.
 """
 )
-@async_background
-def get_lineage(
+async def get_lineage(
     urn: str,
     column: Optional[str],
     filters: Optional[Filter | str] = None,
     upstream: bool = True,
     max_hops: int = 1,
+    max_results: int = 30,
+    format: Literal["full", "graph"] = "full",
 ) -> dict:
     client = get_datahub_client()
     # NOTE: See comment in search tool for why we parse filters as strings.
     if isinstance(filters, str):
         # The Filter type already has a BeforeValidator that parses JSON strings.
-        filters = load_filters(filters)
+        filters = _load_filters(filters)
 
     lineage_api = AssetLineageAPI(client._graph)
 
@@ -798,11 +1957,82 @@ def get_lineage(
         downstream=not upstream,
         max_hops=max_hops,
         extra_filters=filters,
+        max_results=min(max_results, MAX_LINEAGE_RESULTS),
+    )
+    if format == "graph":
+        graph = await lineage_api.get_lineage_graph(asset_lineage_directive)
+        return _fit_lineage_graph(graph, LineageGraph.to_compact_dict)
+    return _fit_response(await lineage_api.get_lineage(asset_lineage_directive))
+
+
+async def _get_schema_field_paths(graph: DataHubGraph, urn: str) -> List[str]:
+    response = await _execute_graphql(
+        graph,
+        query=entity_details_fragment_gql,
+        variables={"urn": urn},
+        operation_name="GetSchemaFieldPaths",
+    )
+    schema_metadata = (response.get("entity") or {}).get("schemaMetadata") or {}
+    return [field["fieldPath"] for field in schema_metadata.get("fields") or []]
+
+
+@mcp.tool(
+    description="""\
+Use this tool to get column-level lineage for many columns of a dataset in a single call, \
+instead of calling get_lineage once per column.
+Set columns to the list of columns to get lineage for, or leave it empty to get lineage for all columns of the dataset. \
+The number of columns per call is limited, so pass the columns you need for wide datasets.
+The other arguments work the same way as for get_lineage, and apply to each column.
+With format "full", returns the lineage of each column keyed by column name.
+With format "graph", returns a single graph for all columns, plus a "columns" object mapping each column to its node.
+Columns whose lineage could not be fetched have an "error" field instead.
+"""
+)
+async def get_columns_lineage(
+    urn: str,
+    columns: Optional[List[str]] = None,
+    filters: Optional[Filter | str] = None,
+    upstream: bool = True,
+    max_hops: int = 1,
+    max_results: int = 30,
+    format: Literal["full", "graph"] = "full",
+) -> dict:
+    client = get_datahub_client()
+    # NOTE: See comment in search tool for why we parse filters as strings.
+    if isinstance(filters, str):
+        filters = _load_filters(filters)
+
+    if Urn.from_string(urn).entity_type != DatasetUrn.ENTITY_TYPE:
+        raise ValueError(f"Input urn should be a dataset urn, but got {urn}.")
+    max_columns = _get_int_env_variable("COLUMN_LINEAGE_MAX_COLUMNS", 100)
+    if not columns:
+        columns = await _get_schema_field_paths(client._graph, urn)
+        if len(columns) > max_columns:
+            raise ValueError(
+                f"{urn} has {len(columns)} columns, but lineage can be fetched for "
+                f"at most {max_columns} columns at once. Pass the columns to get "
+                "lineage for instead."
+            )
+    elif len(set(columns)) > max_columns:
+        raise ValueError(
+            f"Lineage can be fetched for at most {max_columns} columns at once, "
+            f"but got {len(set(columns))}."
+        )
+
+    response = await AssetLineageAPI(client._graph).get_columns_lineage(
+        AssetLineageDirective(
+            urn=urn,
+            upstream=upstream,
+            downstream=not upstream,
+            max_hops=max_hops,
+            extra_filters=filters,
+            max_results=min(max_results, MAX_LINEAGE_RESULTS),
+        ),
+        columns,
+        format=format,
     )
-    lineage = lineage_api.get_lineage(asset_lineage_directive)
-    inject_urls_for_urns(client._graph, lineage, ["*.searchResults[].entity"])
-    truncate_descriptions(lineage)
-    return lineage
+    # Graphs have been fitted already, see AssetLineageAPI.get_columns_lineage.
+    return response if format == "graph" else _fit_response(response)
 
 
 def register_search_tools(mcp_instance: FastMCP) -> None:
@@ -810,7 +2040,7 @@ def register_search_tools(mcp_instance: FastMCP) -> None:
     if is_openai_search_enabled():
         # Register OpenAI-compatible search tool with only query parameter
         mcp_instance.tool(name="search", description=openai_search.__doc__)(
-            async_background(openai_search)
+            openai_search
         )
     elif _is_semantic_search_enabled():
         # Note: Actual semantic search availability is validated at runtime when used
@@ -819,17 +2049,16 @@ def register_search_tools(mcp_instance: FastMCP) -> None:
 
         # Register enhanced search tool with semantic capabilities (as "search")
         mcp_instance.tool(name="search", description=enhanced_search.__doc__)(
-            async_background(enhanced_search)
+            enhanced_search
         )
     else:
         # Register original search tool for backward compatibility (as "search")
-        mcp_instance.tool(name="search", description=search.__doc__)(
-            async_background(search)
-        )
+        mcp_instance.tool(name="search", description=search.__doc__)(search)
 
 
 # Register search tools on the global MCP instance
 register_search_tools(mcp)
 mcp.remove_tool("get_entity")
 mcp.remove_tool("get_dataset_queries")
-mcp.remove_tool("get_lineage")
\ No newline at end of file
+mcp.remove_tool("get_lineage")
+mcp.remove_tool("get_columns_lineage")
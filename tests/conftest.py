@@ -8,3 +8,21 @@ os.environ["DATAHUB_TELEMETRY_ENABLED"] = "false"
 @pytest.fixture(scope="module")
 def anyio_backend() -> str:
     return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def clear_caches() -> None:
+    # Imported lazily, so that the environment above is set up first.
+    from mcp_server_datahub.mcp_server import (
+        _compiled_filter_cache,
+        _entity_cache,
+        _lineage_cache,
+        _parsed_filter_cache,
+        _search_cache,
+    )
+
+    _entity_cache.clear()
+    _search_cache.clear()
+    _parsed_filter_cache.clear()
+    _compiled_filter_cache.clear()
+    _lineage_cache.clear()
@@ -0,0 +1,79 @@
+from mcp_server_datahub._cache import TTLCache
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_hit_and_miss() -> None:
+    cache = TTLCache[str, int](ttl_seconds=10, max_entries=10)
+
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    stats = cache.stats()
+    assert stats.hits == 1
+    assert stats.misses == 1
+    assert stats.entries == 1
+
+
+def test_ttl_cache_expiry() -> None:
+    timer = FakeTimer()
+    cache = TTLCache[str, int](ttl_seconds=10, max_entries=10, timer=timer)
+
+    cache.set("a", 1)
+    timer.now = 9.9
+    assert cache.get("a") == 1
+    timer.now = 10.0
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats.expirations == 1
+    assert stats.entries == 0
+
+
+def test_ttl_cache_lru_eviction() -> None:
+    cache = TTLCache[str, int](ttl_seconds=None, max_entries=2)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # Touch "a" so that "b" becomes the least recently used entry.
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats().evictions == 1
+
+
+def test_ttl_cache_max_bytes() -> None:
+    cache = TTLCache[str, str](
+        ttl_seconds=None, max_entries=10, max_bytes=10, sizeof=len
+    )
+
+    cache.set("a", "xxxx")
+    cache.set("b", "yyyy")
+    assert cache.stats().bytes == 8
+
+    cache.set("c", "zzzz")
+    assert cache.get("a") is None
+    assert cache.stats().bytes == 8
+
+    # Values larger than the whole cache are never stored.
+    cache.set("d", "w" * 11)
+    assert cache.get("d") is None
+    assert cache.get("b") == "yyyy"
+
+
+def test_ttl_cache_disabled() -> None:
+    cache = TTLCache[str, int](ttl_seconds=0, max_entries=10)
+    assert not cache.enabled
+
+    cache.set("a", 1)
+    assert cache.get("a") is None
@@ -0,0 +1,362 @@
+import hashlib
+import json
+import random
+from typing import Any, AsyncIterator, Callable, Dict, List
+from unittest import mock
+
+import anyio
+import httpx
+import pytest
+from datahub.configuration.common import GraphError, OperationalError
+from datahub.ingestion.graph.client import DataHubGraph
+from datahub.ingestion.graph.config import DatahubClientConfig
+
+from mcp_server_datahub._graphql_client import AsyncGraphQLClient
+from mcp_server_datahub.mcp_server import (
+    _get_graphql_client,
+    clean_gql_response,
+    close_graphql_clients,
+)
+
+
+def make_client(
+    handler: Callable[[httpx.Request], httpx.Response],
+    *,
+    persisted_queries: bool = False,
+    streaming_parse: bool = False,
+    thread_parse_min_bytes: int = 256 * 1024,
+) -> AsyncGraphQLClient:
+    graph = DataHubGraph(
+        DatahubClientConfig(
+            server="http://localhost:8080", token="test-token", retry_max_times=2
+        )
+    )
+    return AsyncGraphQLClient(
+        graph,
+        persisted_queries=persisted_queries,
+        streaming_parse=streaming_parse,
+        thread_parse_min_bytes=thread_parse_min_bytes,
+        transport=httpx.MockTransport(handler),
+    )
+
+
+class PersistedQueryServer:
+    """A stand-in GraphQL server implementing automatic persisted queries."""
+
+    def __init__(self, *, supported: bool = True) -> None:
+        self.supported = supported
+        self.store: Dict[str, str] = {}
+        self.bodies: List[Dict[str, Any]] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.bodies.append(body)
+
+        persisted = body.get("extensions", {}).get("persistedQuery")
+        if persisted and not self.supported:
+            return httpx.Response(
+                200, json={"errors": [{"message": "PersistedQueryNotSupported"}]}
+            )
+        if persisted:
+            query_hash = persisted["sha256Hash"]
+            if "query" in body:
+                assert hashlib.sha256(body["query"].encode()).hexdigest() == query_hash
+                self.store[query_hash] = body["query"]
+            elif query_hash not in self.store:
+                return httpx.Response(
+                    200, json={"errors": [{"message": "PersistedQueryNotFound"}]}
+                )
+        return httpx.Response(200, json={"data": {"ok": True}})
+
+
+@pytest.mark.anyio
+async def test_execute_graphql() -> None:
+    requests: List[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"data": {"entity": {"urn": "urn:li:x"}}})
+
+    client = make_client(handler)
+    result = await client.execute(
+        "query GetEntity($urn: String!) { entity(urn: $urn) { urn } }",
+        variables={"urn": "urn:li:x"},
+        operation_name="GetEntity",
+    )
+
+    assert result == {"entity": {"urn": "urn:li:x"}}
+    assert len(requests) == 1
+    assert str(requests[0].url) == "http://localhost:8080/api/graphql"
+    assert requests[0].headers["Authorization"] == "Bearer test-token"
+    body = json.loads(requests[0].content)
+    assert body["operationName"] == "GetEntity"
+    assert body["variables"] == {"urn": "urn:li:x"}
+
+
+@pytest.mark.anyio
+async def test_large_responses_are_parsed_in_a_thread() -> None:
+    data = {"entities": [{"urn": f"urn:li:tag:{i}"} for i in range(100)]}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"data": data})
+
+    small_client = make_client(handler)
+    large_client = make_client(handler, thread_parse_min_bytes=1024)
+    with mock.patch(
+        "anyio.to_thread.run_sync", wraps=anyio.to_thread.run_sync
+    ) as run_sync:
+        assert await small_client.execute("query { x }") == data
+        assert run_sync.call_count == 0
+        assert await large_client.execute("query { x }") == data
+        assert run_sync.call_count == 1
+
+
+@pytest.mark.anyio
+async def test_execute_graphql_errors() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"errors": [{"message": "bad query"}]})
+
+    client = make_client(handler)
+    with pytest.raises(GraphError, match="bad query"):
+        await client.execute("query { x }")
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("streaming_parse", [False, True])
+async def test_execute_graphql_http_error(streaming_parse: bool) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(401, json={"message": "unauthorized"})
+
+    client = make_client(handler, streaming_parse=streaming_parse)
+    with pytest.raises(OperationalError) as exc_info:
+        await client.execute("query { x }")
+    assert exc_info.value.info == {"message": "unauthorized"}
+
+
+@pytest.mark.anyio
+async def test_execute_graphql_retries() -> None:
+    responses = [
+        httpx.Response(503),
+        httpx.Response(503),
+        httpx.Response(200, json={"data": {"ok": True}}),
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return responses.pop(0)
+
+    client = make_client(handler)
+    with mock.patch("mcp_server_datahub._graphql_client.anyio.sleep") as mock_sleep:
+        result = await client.execute("query { ok }")
+
+    assert result == {"ok": True}
+    assert mock_sleep.call_count == 2
+
+
+@pytest.mark.anyio
+async def test_execute_graphql_retries_transport_errors() -> None:
+    attempts = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise httpx.ConnectError("Connection refused", request=request)
+        if attempts == 2:
+            raise httpx.ReadTimeout("Timed out", request=request)
+        return httpx.Response(200, json={"data": {"ok": True}})
+
+    client = make_client(handler)
+    with mock.patch("mcp_server_datahub._graphql_client.anyio.sleep") as mock_sleep:
+        result = await client.execute("query { ok }")
+
+    assert result == {"ok": True}
+    assert mock_sleep.call_count == 2
+
+    # Once the retries are used up, the error is raised.
+    def failing_handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("Connection refused", request=request)
+
+    client = make_client(failing_handler)
+    with (
+        mock.patch("mcp_server_datahub._graphql_client.anyio.sleep") as mock_sleep,
+        pytest.raises(httpx.ConnectError),
+    ):
+        await client.execute("query { ok }")
+    assert mock_sleep.call_count == 2
+
+
+@pytest.mark.anyio
+async def test_close_graphql_clients() -> None:
+    graph = DataHubGraph(DatahubClientConfig(server="http://localhost:8080"))
+    client = _get_graphql_client(graph)
+    assert _get_graphql_client(graph) is client
+
+    await close_graphql_clients()
+
+    assert client._client.is_closed
+    # A new client is created for later requests.
+    assert _get_graphql_client(graph) is not client
+    await close_graphql_clients()
+
+
+QUERY = "query GetEntity($urn:String!){entity(urn:$urn){urn}}"
+
+
+@pytest.mark.anyio
+async def test_persisted_queries() -> None:
+    server = PersistedQueryServer()
+    client = make_client(server, persisted_queries=True)
+
+    for _ in range(2):
+        result = await client.execute(
+            QUERY, variables={"urn": "urn:li:x"}, operation_name="GetEntity"
+        )
+        assert result == {"ok": True}
+
+    # Miss, register, then hash-only hit.
+    assert ["query" in body for body in server.bodies] == [False, True, False]
+    assert server.bodies[2]["operationName"] == "GetEntity"
+    assert server.bodies[2]["variables"] == {"urn": "urn:li:x"}
+    assert server.bodies[2]["extensions"]["persistedQuery"] == {
+        "version": 1,
+        "sha256Hash": hashlib.sha256(QUERY.encode()).hexdigest(),
+    }
+
+
+@pytest.mark.anyio
+async def test_persisted_queries_not_supported() -> None:
+    server = PersistedQueryServer(supported=False)
+    client = make_client(server, persisted_queries=True)
+
+    assert await client.execute(QUERY) == {"ok": True}
+    assert not client.persisted_queries
+
+    assert await client.execute(QUERY) == {"ok": True}
+    assert ["query" in body for body in server.bodies] == [False, True, True]
+    assert "extensions" not in server.bodies[2]
+
+
+def rejecting_handler(
+    status_code: int, bodies: List[Dict[str, Any]]
+) -> Callable[[httpx.Request], httpx.Response]:
+    """A server that doesn't implement the protocol, and rejects requests without
+    a query with the given status code."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        bodies.append(body)
+        if "query" not in body:
+            return httpx.Response(status_code, json={"message": "query is required"})
+        return httpx.Response(200, json={"data": {"ok": True}})
+
+    return handler
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("status_code", [404, 405])
+async def test_persisted_queries_rejected(status_code: int) -> None:
+    bodies: List[Dict[str, Any]] = []
+    client = make_client(rejecting_handler(status_code, bodies), persisted_queries=True)
+
+    assert await client.execute(QUERY) == {"ok": True}
+    assert not client.persisted_queries
+
+    assert await client.execute(QUERY) == {"ok": True}
+    assert ["query" in body for body in bodies] == [False, True, True]
+
+
+@pytest.mark.anyio
+async def test_persisted_queries_bad_request() -> None:
+    # A 400 may be specific to the request, so it is retried with the query, but
+    # persisted queries stay enabled.
+    bodies: List[Dict[str, Any]] = []
+    client = make_client(rejecting_handler(400, bodies), persisted_queries=True)
+
+    assert await client.execute(QUERY) == {"ok": True}
+    assert client.persisted_queries
+
+    assert await client.execute(QUERY) == {"ok": True}
+    assert ["query" in body for body in bodies] == [False, True, False, True]
+    assert all("extensions" in body for body in bodies)
+
+
+@pytest.mark.anyio
+async def test_persisted_queries_auth_error() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(401, json={"message": "unauthorized"})
+
+    client = make_client(handler, persisted_queries=True)
+    with pytest.raises(OperationalError):
+        await client.execute(QUERY)
+    assert client.persisted_queries
+
+
+@pytest.mark.anyio
+async def test_persisted_queries_disabled_by_default() -> None:
+    server = PersistedQueryServer()
+    client = make_client(server)
+
+    await client.execute(QUERY)
+    assert server.bodies == [{"query": QUERY}]
+
+
+def random_value(rng: random.Random, depth: int = 0) -> Any:
+    kind = rng.randrange(6 if depth < 5 else 3)
+    if kind == 0:
+        return None
+    if kind == 1:
+        return rng.choice([True, False, 0, -3, 1.5, ""])
+    if kind == 2:
+        return rng.choice(["x", "urn:li:tag:a", 'quoted "ünïcode" ✓'])
+    if kind == 3:
+        return [random_value(rng, depth + 1) for _ in range(rng.randrange(3))]
+    keys = ["urn", "name", "__typename", "fields", "entity"]
+    return {rng.choice(keys): random_value(rng, depth + 1) for _ in range(4)}
+
+
+def chunked_response(body: bytes) -> httpx.Response:
+    async def chunks() -> AsyncIterator[bytes]:
+        for i in range(0, len(body), 7):
+            yield body[i : i + 7]
+
+    return httpx.Response(200, content=chunks())
+
+
+@pytest.mark.anyio
+async def test_streaming_parse_cleans_data() -> None:
+    # Streaming parsing needs the optional ijson dependency.
+    pytest.importorskip("ijson")
+    rng = random.Random(3)
+    responses: List[Dict[str, Any]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return chunked_response(json.dumps(responses[-1]).encode())
+
+    client = make_client(handler, streaming_parse=True)
+    for _ in range(200):
+        data = {"entity": random_value(rng), "entities": random_value(rng)}
+        responses.append({"data": data, "extensions": {"cost": None}})
+
+        result = await client.execute("query { x }", clean=True)
+
+        # Top-level fields are kept even if they are null or empty.
+        expected = {key: clean_gql_response(value) for key, value in data.items()}
+        assert repr(result) == repr(expected)
+
+
+@pytest.mark.anyio
+async def test_streaming_parse_without_cleaning() -> None:
+    # Streaming parsing needs the optional ijson dependency.
+    pytest.importorskip("ijson")
+    response: Dict[str, Any] = {
+        "data": {"entity": {"urn": "urn:li:x", "tags": [], "name": None}}
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return chunked_response(json.dumps(response).encode())
+
+    client = make_client(handler, streaming_parse=True)
+    assert await client.execute("query { x }") == response["data"]
+    assert await client.execute("query { x }", clean=True) == {
+        "entity": {"urn": "urn:li:x"}
+    }
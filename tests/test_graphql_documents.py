@@ -0,0 +1,107 @@
+import pytest
+
+from mcp_server_datahub._graphql_documents import minify_document, split_document
+from mcp_server_datahub.mcp_server import (
+    _enable_cloud_fields,
+    entity_details_fragment_gql,
+    queries_gql,
+    search_gql,
+    semantic_search_gql,
+)
+
+DOCUMENT = """
+# A comment
+query First($urn: String!) {
+    entity(urn: $urn) {
+        ...a
+    }
+}
+
+query Second {
+    search(input: { query: "{ not a brace }" }) {
+        ...b
+    }
+}
+
+fragment a on Entity {
+    urn # trailing comment
+    ...c
+}
+
+fragment b on Entity {
+    type
+}
+
+fragment c on Entity {
+    ... on Dataset {
+        name
+    }
+}
+"""
+
+
+def test_minify_document() -> None:
+    assert (
+        minify_document('query Q { a(x: "#  b") # comment\n  ...on T { c } }')
+        == 'query Q{a(x:"#  b")...on T{c}}'
+    )
+
+
+def test_split_document() -> None:
+    documents = split_document(DOCUMENT)
+
+    assert documents == {
+        "First": (
+            "query First($urn:String!){entity(urn:$urn){...a}} "
+            "fragment a on Entity{urn ...c} "
+            "fragment c on Entity{... on Dataset{name}}"
+        ),
+        "Second": (
+            'query Second{search(input:{query:"{ not a brace }"}){...b}} '
+            "fragment b on Entity{type}"
+        ),
+    }
+
+
+def test_split_document_unknown_fragment() -> None:
+    with pytest.raises(ValueError, match="unknown fragment missing"):
+        split_document("query Q { ...missing }")
+
+
+@pytest.mark.parametrize(
+    "document",
+    [entity_details_fragment_gql, search_gql, semantic_search_gql, queries_gql],
+)
+@pytest.mark.parametrize("is_cloud", [False, True])
+def test_split_repo_documents(document: str, is_cloud: bool) -> None:
+    if is_cloud:
+        document = _enable_cloud_fields(document)
+
+    documents = split_document(document)
+    assert documents
+    for text in documents.values():
+        assert len(text) < len(document)
+        assert "#" not in text
+
+
+def test_split_entity_details_prunes_fragments() -> None:
+    documents = split_document(entity_details_fragment_gql)
+
+    assert set(documents) == {
+        "GetEntity",
+        "GetEntityStandard",
+        "GetEntitySummary",
+        "GetEntities",
+        "GetEntitiesStandard",
+        "GetEntitiesSummary",
+        "GetEntityLineage",
+        "GetEntityLineageGraph",
+        "GetSchemaFieldPaths",
+        "GetSchemaFields",
+    }
+    assert "fragment entityStatus " in documents["GetEntity"]
+    assert "fragment entityStatus " not in documents["GetEntityLineage"]
+    assert "fragment entityPreview " in documents["GetEntityLineage"]
+    assert "fragment entityPreview " not in documents["GetEntityLineageGraph"]
+    assert "fragment schemaMetadataFields " not in documents["GetEntitySummary"]
+    assert "fragment ownershipFields " not in documents["GetEntitySummary"]
@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+from mcp_server_datahub import _json
+
+
+def test_dumps_is_compact() -> None:
+    assert _json.dumps({"name": "tëst", "values": [1, None]}) == (
+        '{"name":"tëst","values":[1,null]}'
+    )
+
+
+def test_dumps_splices_fragments() -> None:
+    encoded = _json.dumps({"urn": "urn:li:tag:a", "description": 'say "hi"\n'})
+    document = _json.dumps({"entity": _json.Fragment(encoded), "lineage": {}})
+
+    assert document == '{"entity":' + encoded + ',"lineage":{}}'
+    assert json.loads(document)["entity"]["description"] == 'say "hi"\n'
+
+
+def test_dumps_without_orjson(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(_json, "_orjson", None)
+    assert _json.dumps({1: "a"}) == '{"1":"a"}'
+    assert _json.dumps({"a": _json.Fragment("[1,2]")}) == '{"a":[1,2]}'
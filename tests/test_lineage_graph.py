@@ -0,0 +1,72 @@
+from mcp_server_datahub._lineage_graph import LineageGraph
+
+
+def test_lineage_graph_paths() -> None:
+    graph = LineageGraph("urn:root", root_type="DATASET")
+    graph.add_path(["urn:root", "urn:a", "urn:b"], upstream=False)
+    graph.add_path(["urn:root", "urn:b"], upstream=False)
+    graph.add_path(["urn:root", "urn:up"], upstream=True)
+
+    assert graph.edges == [
+        ("urn:root", "urn:a"),
+        ("urn:root", "urn:b"),
+        ("urn:a", "urn:b"),
+        ("urn:up", "urn:root"),
+    ]
+    assert graph.downstreams("urn:root") == ["urn:a", "urn:b"]
+    assert graph.upstreams("urn:b") == ["urn:a", "urn:root"]
+    assert graph.upstreams("urn:root") == ["urn:up"]
+    # Nodes keep the shortest distance from the root.
+    assert {urn: node.degree for urn, node in graph.nodes.items()} == {
+        "urn:root": 0,
+        "urn:a": 1,
+        "urn:b": 1,
+        "urn:up": 1,
+    }
+
+
+def test_lineage_graph_add_node_keeps_type() -> None:
+    graph = LineageGraph("urn:root")
+    graph.add_node("urn:a", type="DATASET", degree=3)
+    node = graph.add_node("urn:a", type=None, degree=2)
+    assert (node.type, node.degree) == ("DATASET", 2)
+
+
+def test_lineage_graph_to_compact_dict() -> None:
+    graph = LineageGraph("urn:root", root_type="DATASET")
+    graph.add_node("urn:a", type="DATASET", degree=1, name="a", platform="dbt")
+    graph.add_node("urn:b", type="CHART", degree=2, name="b", platform="looker")
+    graph.add_node("urn:c", type="DATASET", degree=1, name="c", platform="dbt")
+    graph.add_path(["urn:root", "urn:a", "urn:b"], upstream=False)
+    graph.add_path(["urn:root", "urn:c"], upstream=True)
+    graph.totals = {"downstreams": 2, "upstreams": 1}
+
+    assert graph.to_compact_dict() == {
+        "root": 0,
+        "total": {"downstreams": 2, "upstreams": 1},
+        "platforms": ["dbt", "looker"],
+        "node_columns": ["urn", "type", "name", "platform", "degree"],
+        "nodes": [
+            ["urn:root", "DATASET", None, None, 0],
+            ["urn:a", "DATASET", "a", 0, 1],
+            ["urn:b", "CHART", "b", 1, 2],
+            ["urn:c", "DATASET", "c", 0, 1],
+        ],
+        "edges": [[0, 1], [1, 2], [3, 0]],
+    }
+
+
+def test_lineage_graph_truncate() -> None:
+    graph = LineageGraph("urn:root", root_type="DATASET")
+    graph.add_path(["urn:root", "urn:a", "urn:b"], upstream=False)
+    graph.add_path(["urn:root", "urn:c"], upstream=True)
+    graph.totals = {"downstreams": 2, "upstreams": 1}
+
+    truncated = graph.truncate(2)
+
+    # urn:b is furthest from the root, so it is dropped with its edge.
+    assert list(truncated.nodes) == ["urn:root", "urn:a", "urn:c"]
+    assert truncated.nodes["urn:root"].type == "DATASET"
+    assert truncated.edges == [("urn:root", "urn:a"), ("urn:c", "urn:root")]
+    assert truncated.totals == {"downstreams": 2, "upstreams": 1}
+    assert len(graph.nodes) == 4
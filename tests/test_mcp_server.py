@@ -172,10 +172,11 @@ async def test_get_dataset_queries() -> None:
     not os.environ.get("TEST_SEMANTIC_SEARCH", "false").lower() == "true",
     reason="Semantic search integration test disabled. Set TEST_SEMANTIC_SEARCH=true to enable.",
 )
-def test_semantic_search_integration() -> None:
+@pytest.mark.anyio
+async def test_semantic_search_integration() -> None:
     """Test that semantic search works end-to-end when enabled."""
     # Test keyword strategy (should work like regular search)
-    res = _search_implementation(
+    res = await _search_implementation(
         query="*", filters=None, num_results=5, search_strategy="keyword"
     )
     assert isinstance(res, dict)
@@ -183,7 +184,7 @@ def test_semantic_search_integration() -> None:
     assert "total" in res
 
     # Test semantic strategy - this will hit the actual semanticSearchAcrossEntities
-    res = _search_implementation(
+    res = await _search_implementation(
         query="data analytics", filters=None, num_results=3, search_strategy="semantic"
     )
     assert isinstance(res, dict)
@@ -1,62 +1,92 @@
+import json
+import random
+import time
+from typing import Any, Optional
+
+import anyio
+import httpx
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
+from datahub.configuration.common import GraphError
+from datahub.errors import ItemNotFoundError
+from datahub.sdk.search_filters import load_filters
 from mcp_server_datahub.mcp_server import (
-    inject_urls_for_urns,
+    DESCRIPTION_LENGTH_HARD_LIMIT,
+    AssetLineageAPI,
+    AssetLineageDirective,
+    _cache_scope,
+    _entity_cache,
+    _get_entities_details,
+    _get_entity_details,
+    _get_query_variant,
+    _is_datahub_cloud,
+    _search_cache,
+    _search_implementation,
+    _compile_filters,
+    _load_filters,
+    entity_details_fragment_gql,
+    fetch,
+    get_cache_stats,
+    get_columns_lineage,
+    get_lineage,
+    get_schema_fields,
+    with_datahub_client,
     maybe_convert_to_schema_field_urn,
+    sanitize_and_truncate_description,
+    sanitize_html_content,
+    sanitize_markdown_content,
+    truncate_with_ellipsis,
     clean_gql_response,
-    clean_get_entity_response,
-    truncate_descriptions,
 )
+from datahub.ingestion.graph.config import DatahubClientConfig
+from mcp_server_datahub._response_processor import ResponseProcessor
 from datahub.ingestion.graph.links import make_url_for_urn
 
 
 def test_inject_urls_for_urns() -> None:
-    mock_graph = Mock()
-    mock_graph.url_for.side_effect = lambda urn: make_url_for_urn(
-        "https://xyz.com", urn
-    )
+    url_for = Mock(side_effect=lambda urn: make_url_for_urn("https://xyz.com", urn))
+    processor = ResponseProcessor(url_paths=["searchResults[].entity"])
 
-    with patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=True):
-        response = {
-            "searchResults": [
-                {
-                    "entity": {
-                        "urn": "urn:li:dataset:(urn:li:dataPlatform:snowflake,analytics_db.raw_schema.users,PROD)",
-                        "name": "users",
-                    }
-                },
-                {
-                    "entity": {
-                        "urn": "urn:li:chart:(looker,baz)",
-                        "name": "baz",
-                    }
-                },
-            ]
-        }
+    response = {
+        "searchResults": [
+            {
+                "entity": {
+                    "urn": "urn:li:dataset:(urn:li:dataPlatform:snowflake,analytics_db.raw_schema.users,PROD)",
+                    "name": "users",
+                }
+            },
+            {
+                "entity": {
+                    "urn": "urn:li:chart:(looker,baz)",
+                    "name": "baz",
+                }
+            },
+        ]
+    }
 
-        inject_urls_for_urns(mock_graph, response, ["searchResults[].entity"])
+    result = processor.process(response, url_for=url_for)
 
-        expected_response = {
-            "searchResults": [
-                {
-                    "entity": {
-                        "urn": "urn:li:dataset:(urn:li:dataPlatform:snowflake,analytics_db.raw_schema.users,PROD)",
-                        "url": "https://xyz.com/dataset/urn%3Ali%3Adataset%3A%28urn%3Ali%3AdataPlatform%3Asnowflake%2Canalytics_db.raw_schema.users%2CPROD%29/",
-                        "name": "users",
-                    }
-                },
-                {
-                    "entity": {
-                        "urn": "urn:li:chart:(looker,baz)",
-                        "url": "https://xyz.com/chart/urn%3Ali%3Achart%3A%28looker%2Cbaz%29/",
-                        "name": "baz",
-                    }
-                },
-            ]
-        }
+    expected_response = {
+        "searchResults": [
+            {
+                "entity": {
+                    "urn": "urn:li:dataset:(urn:li:dataPlatform:snowflake,analytics_db.raw_schema.users,PROD)",
+                    "url": "https://xyz.com/dataset/urn%3Ali%3Adataset%3A%28urn%3Ali%3AdataPlatform%3Asnowflake%2Canalytics_db.raw_schema.users%2CPROD%29/",
+                    "name": "users",
+                }
+            },
+            {
+                "entity": {
+                    "urn": "urn:li:chart:(looker,baz)",
+                    "url": "https://xyz.com/chart/urn%3Ali%3Achart%3A%28looker%2Cbaz%29/",
+                    "name": "baz",
+                }
+            },
+        ]
+    }
 
-        assert response == expected_response
-        assert mock_graph.url_for.call_count == 2
+    assert result == expected_response
+    assert url_for.call_count == 2
 
 
 def test_maybe_convert_to_schema_field_urn_with_column() -> None:
@@ -142,7 +172,7 @@ def test_clean_gql_response_with_nested_empty_objects() -> None:
     assert result == expected_result
 
 
-def test_clean_get_entity_response_with_schema_metadata() -> None:
+def test_clean_entity_response_with_schema_metadata() -> None:
     raw_response = {
         "urn": "urn:li:dataset:(urn:li:dataPlatform:snowflake,analytics_db.raw_schema.users,PROD)",
         "name": "users",
@@ -173,7 +203,7 @@ def test_clean_get_entity_response_with_schema_metadata() -> None:
         },
     }
 
-    result = clean_get_entity_response(raw_response)
+    result = ResponseProcessor(strip_schema_field_defaults=True).process(raw_response)
 
     expected_result = {
         "urn": "urn:li:dataset:(urn:li:dataPlatform:snowflake,analytics_db.raw_schema.users,PROD)",
@@ -224,21 +254,24 @@ def test_truncate_descriptions() -> None:
         }
     }
 
-    truncate_descriptions(result, 50)
+    result = ResponseProcessor(
+        transform_description=sanitize_and_truncate_description,
+        description_limit=50,
+    ).process(result)
 
     assert result == {
         "downstreams": {
             "searchResults": [
                 {
                     "entity": {
-                        "description": "Description with image and more content that exceeds the limit",
+                        "description": "Description with image and more content that ex...",
                         "properties": {
-                            "description": "Description with image  and more content that exceeds the limit"
+                            "description": "Description with image  and more content that e..."
                         },
                         "fields": [
                             {
                                 "fieldPath": "description",
-                                "description": "Description with image  and more content that exceeds the limit",
+                                "description": "Description with image  and more content that e...",
                             },
                             {
                                 "fieldPath": "description",
@@ -250,3 +283,928 @@ def test_truncate_descriptions() -> None:
             ]
         }
     }
+
+
+def test_truncate_descriptions_default_limit() -> None:
+    long_description = "x" * 2000
+    result: dict = {
+        "description": long_description,
+        "domain": {"description": long_description},
+    }
+
+    result = ResponseProcessor(
+        transform_description=sanitize_and_truncate_description,
+        description_limit=DESCRIPTION_LENGTH_HARD_LIMIT,
+    ).process(result)
+
+    assert len(result["description"]) == DESCRIPTION_LENGTH_HARD_LIMIT
+    assert len(result["domain"]["description"]) == DESCRIPTION_LENGTH_HARD_LIMIT
+
+
+@pytest.mark.anyio
+async def test_get_entity_details_is_cached() -> None:
+    mock_client = Mock()
+    urn = "urn:li:dataset:(urn:li:dataPlatform:snowflake,analytics_db.raw_schema.users,PROD)"
+    _entity_cache.clear()
+
+    with (
+        patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=False),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            return_value={"entity": {"urn": urn, "name": "users", "tags": []}},
+        ) as mock_execute_graphql,
+    ):
+        first = await _get_entity_details(mock_client, urn)
+        # Mutating the result must not affect the cached copy.
+        first["name"] = "changed"
+        second = await _get_entity_details(mock_client, urn)
+
+    assert second == {"urn": urn, "name": "users"}
+    assert mock_execute_graphql.call_count == 1
+    _entity_cache.clear()
+
+
+def make_client(token: Optional[str]) -> Mock:
+    client = Mock()
+    client._graph.config = DatahubClientConfig(
+        server="http://localhost:8080", token=token
+    )
+    return client
+
+
+@pytest.mark.anyio
+async def test_entity_cache_is_scoped_by_credentials() -> None:
+    urn = "urn:li:dataset:(urn:li:dataPlatform:snowflake,db.users,PROD)"
+    alice, alice_again = make_client("alice"), make_client("alice")
+    bob = make_client("bob")
+    assert _cache_scope(alice._graph) == _cache_scope(alice_again._graph)
+    assert _cache_scope(alice._graph) != _cache_scope(bob._graph)
+    assert _cache_scope(alice._graph) != _cache_scope(make_client(None)._graph)
+
+    with (
+        patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=False),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            return_value={"entity": {"urn": urn, "name": "users"}},
+        ) as mock_execute_graphql,
+    ):
+        await _get_entity_details(alice, urn)
+        await _get_entity_details(alice_again, urn)
+        assert mock_execute_graphql.call_count == 1
+        # A client with a different token must not be served alice's entity.
+        await _get_entity_details(bob, urn)
+        assert mock_execute_graphql.call_count == 2
+
+
+@pytest.mark.anyio
+async def test_get_entity_details_detail_level() -> None:
+    urn = "urn:li:chart:(looker,baz)"
+    graph = Mock()
+    _entity_cache.clear()
+
+    with (
+        patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=False),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            return_value={"entity": {"urn": urn}},
+        ) as mock_execute_graphql,
+    ):
+        await _get_entity_details(graph, urn, "summary")
+        await _get_entity_details(graph, urn, "full")
+        # Each detail level is cached separately.
+        await _get_entity_details(graph, urn, "summary")
+
+    assert [
+        call.kwargs["operation_name"] for call in mock_execute_graphql.call_args_list
+    ] == ["GetEntitySummary", "GetEntity"]
+    _entity_cache.clear()
+
+
+@pytest.mark.anyio
+async def test_get_entities_details(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("ENTITY_BATCH_SIZE", "2")
+    graph = Mock()
+    _entity_cache.clear()
+
+    async def execute_graphql(graph: Any, **kwargs: Any) -> dict:
+        if kwargs["operation_name"] == "GetEntity":
+            urn = kwargs["variables"]["urn"]
+            return {"entity": {"urn": urn, "name": urn[-1]}}
+        assert kwargs["operation_name"] == "GetEntities"
+        return {
+            "entities": [
+                {"urn": urn, "name": urn[-1]}
+                for urn in reversed(kwargs["variables"]["urns"])
+                if urn != "urn:li:tag:c"
+            ]
+        }
+
+    with (
+        patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=False),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            side_effect=execute_graphql,
+        ) as mock_execute_graphql,
+    ):
+        await _get_entity_details(graph, "urn:li:tag:b")
+        result = await _get_entities_details(
+            graph,
+            [
+                "urn:li:tag:a",
+                "urn:li:tag:b",
+                "urn:li:tag:c",
+                "urn:li:tag:d",
+                "urn:li:tag:a",
+            ],
+        )
+
+    assert result == {
+        "urn:li:tag:a": {"urn": "urn:li:tag:a", "name": "a"},
+        "urn:li:tag:b": {"urn": "urn:li:tag:b", "name": "b"},
+        "urn:li:tag:c": {"error": "Entity urn:li:tag:c not found"},
+        "urn:li:tag:d": {"urn": "urn:li:tag:d", "name": "d"},
+    }
+    assert list(result) == [
+        "urn:li:tag:a",
+        "urn:li:tag:b",
+        "urn:li:tag:c",
+        "urn:li:tag:d",
+    ]
+    # One call for get_entity, then the three uncached urns in two chunks.
+    assert [
+        call.kwargs["variables"] for call in mock_execute_graphql.call_args_list[1:]
+    ] == [
+        {"urns": ["urn:li:tag:a", "urn:li:tag:c"]},
+        {"urns": ["urn:li:tag:d"]},
+    ]
+    _entity_cache.clear()
+
+
+@pytest.mark.anyio
+async def test_get_entities_details_bounds_concurrency(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("ENTITY_BATCH_SIZE", "1")
+    monkeypatch.setenv("ENTITY_BATCH_CONCURRENCY", "2")
+    graph = Mock()
+    urns = [f"urn:li:tag:{i}" for i in range(6)]
+    in_flight = max_in_flight = 0
+    _entity_cache.clear()
+
+    async def execute_graphql(graph: Any, **kwargs: Any) -> dict:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await anyio.sleep(0.01)
+        in_flight -= 1
+        return {"entities": [{"urn": urn} for urn in kwargs["variables"]["urns"]]}
+
+    with (
+        patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=False),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            side_effect=execute_graphql,
+        ),
+    ):
+        await _get_entities_details(graph, urns)
+    assert max_in_flight == 2
+
+    # Cached entities are decoded with _loads, which moves large ones off the loop.
+    with (
+        patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=False),
+        patch(
+            "mcp_server_datahub.mcp_server._loads",
+            new_callable=AsyncMock,
+            side_effect=json.loads,
+        ) as mock_loads,
+    ):
+        result = await _get_entities_details(graph, urns)
+    assert result == {urn: {"urn": urn} for urn in urns}
+    assert mock_loads.await_count == len(urns)
+    _entity_cache.clear()
+
+
+@pytest.mark.parametrize(
+    "raw_entity",
+    [
+        # GMS returns a stub entity for well-formed urns that don't exist.
+        {"urn": "urn:li:chart:(looker,baz)", "exists": False},
+        {"urn": "urn:li:chart:(looker,baz)", "status": {"removed": True}},
+    ],
+)
+@pytest.mark.anyio
+async def test_get_entity_details_not_found(raw_entity: dict) -> None:
+    _entity_cache.clear()
+
+    with (
+        patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=False),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            return_value={"entity": raw_entity},
+        ),
+        pytest.raises(ItemNotFoundError),
+    ):
+        await _get_entity_details(Mock(), "urn:li:chart:(looker,baz)")
+
+    # Missing entities must not be cached.
+    assert _entity_cache.stats().entries == 0
+
+
+@pytest.mark.anyio
+async def test_get_entity_details_strips_status() -> None:
+    _entity_cache.clear()
+
+    with (
+        patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=False),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            return_value={
+                "entity": {
+                    "urn": "urn:li:chart:(looker,baz)",
+                    "exists": True,
+                    "status": {"removed": False},
+                }
+            },
+        ),
+    ):
+        result = await _get_entity_details(Mock(), "urn:li:chart:(looker,baz)")
+
+    assert result == {"urn": "urn:li:chart:(looker,baz)"}
+    _entity_cache.clear()
+
+
+@pytest.mark.anyio
+async def test_asset_lineage_api_queries_directions_concurrently() -> None:
+    async def slow_execute_graphql(graph: Any, **kwargs: Any) -> dict:
+        await anyio.sleep(0.3)
+        direction = kwargs["variables"]["input"]["direction"]
+        return {"searchAcrossLineage": {"total": 1, "direction": direction}}
+
+    with patch(
+        "mcp_server_datahub.mcp_server._execute_graphql",
+        side_effect=slow_execute_graphql,
+    ):
+        start_time = time.time()
+        result = await AssetLineageAPI(Mock()).get_lineage(
+            AssetLineageDirective(
+                urn="urn:li:chart:(looker,baz)",
+                upstream=True,
+                downstream=True,
+                max_hops=1,
+                extra_filters=None,
+            )
+        )
+        duration = time.time() - start_time
+
+    assert result == {
+        "upstreams": {"total": 1, "direction": "UPSTREAM"},
+        "downstreams": {"total": 1, "direction": "DOWNSTREAM"},
+    }
+    # The two directions should not be serialized.
+    assert duration < 0.55
+
+
+def fake_search_across_lineage(total: int) -> Any:
+    # Downstream results form a chain, each one a hop further from the root.
+    results = [
+        {
+            "entity": {
+                "urn": f"urn:{i}",
+                "type": "DATASET",
+                "name": f"table_{i}",
+                "platform": {"name": "snowflake"},
+            },
+            "degree": i,
+            "paths": [{"path": [{"urn": f"urn:{j}"} for j in range(i + 1)]}],
+        }
+        for i in range(1, total + 1)
+    ]
+
+    async def execute_graphql(graph: Any, **kwargs: Any) -> dict:
+        input = kwargs["variables"]["input"]
+        start, count = input["start"], input["count"]
+        return {
+            "searchAcrossLineage": {
+                "total": total,
+                "searchResults": results[start : start + count],
+            }
+        }
+
+    return execute_graphql
+
+
+def lineage_directive(max_results: int) -> AssetLineageDirective:
+    return AssetLineageDirective(
+        urn="urn:0",
+        upstream=False,
+        downstream=True,
+        max_hops=3,
+        extra_filters=None,
+        max_results=max_results,
+    )
+
+
+@pytest.mark.anyio
+async def test_asset_lineage_api_pages_results() -> None:
+    with (
+        patch.dict("os.environ", {"LINEAGE_PAGE_SIZE": "10"}),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            side_effect=fake_search_across_lineage(45),
+        ) as mock_execute_graphql,
+    ):
+        result = await AssetLineageAPI(Mock()).get_lineage(lineage_directive(35))
+
+    urns = [r["entity"]["urn"] for r in result["downstreams"]["searchResults"]]
+    assert urns == [f"urn:{i}" for i in range(1, 36)]
+    assert [
+        call.kwargs["variables"]["input"]["count"]
+        for call in mock_execute_graphql.call_args_list
+    ] == [10, 10, 10, 5]
+
+
+@pytest.mark.anyio
+async def test_asset_lineage_api_bounds_pages() -> None:
+    in_flight, max_in_flight = 0, 0
+
+    async def execute_graphql(graph: Any, **kwargs: Any) -> dict:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await anyio.sleep(0.01)
+        in_flight -= 1
+        return {"searchAcrossLineage": {"total": 10**9, "searchResults": []}}
+
+    with (
+        patch.dict(
+            "os.environ", {"LINEAGE_PAGE_SIZE": "1000", "LINEAGE_PAGE_CONCURRENCY": "2"}
+        ),
+        with_datahub_client(Mock()),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            side_effect=execute_graphql,
+        ) as mock_execute_graphql,
+    ):
+        await get_lineage.fn("urn:0", column=None, max_results=10**9)
+
+    # max_results is capped at 10000 results, i.e. 10 pages.
+    assert mock_execute_graphql.call_count == 10
+    assert max_in_flight == 2
+
+
+@pytest.mark.anyio
+async def test_asset_lineage_api_get_lineage_graph() -> None:
+    with patch(
+        "mcp_server_datahub.mcp_server._execute_graphql",
+        side_effect=fake_search_across_lineage(3),
+    ) as mock_execute_graphql:
+        graph = await AssetLineageAPI(Mock()).get_lineage_graph(lineage_directive(30))
+
+    assert mock_execute_graphql.call_args.kwargs["operation_name"] == (
+        "GetEntityLineageGraph"
+    )
+    assert graph.edges == [("urn:0", "urn:1"), ("urn:1", "urn:2"), ("urn:2", "urn:3")]
+    assert graph.nodes["urn:3"].degree == 3
+    assert graph.nodes["urn:3"].type == "DATASET"
+    assert graph.nodes["urn:3"].name == "table_3"
+    assert graph.nodes["urn:3"].platform == "snowflake"
+    assert graph.totals == {"downstreams": 3}
+
+
+@pytest.mark.anyio
+async def test_get_lineage_graph_format() -> None:
+    with (
+        with_datahub_client(Mock()),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            side_effect=fake_search_across_lineage(2),
+        ),
+    ):
+        result = await get_lineage.fn(
+            "urn:0", column=None, upstream=False, max_hops=3, format="graph"
+        )
+
+    assert result["platforms"] == ["snowflake"]
+    assert result["nodes"][result["root"]][0] == "urn:0"
+    assert result["nodes"][2] == ["urn:2", "DATASET", "table_2", 0, 2]
+    assert result["edges"] == [[0, 1], [1, 2]]
+
+
+@pytest.mark.anyio
+async def test_get_lineage_graph_format_fits_response_budget(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("MAX_RESPONSE_BYTES", "1000")
+    with (
+        with_datahub_client(Mock()),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            side_effect=fake_search_across_lineage(30),
+        ),
+    ):
+        result = await get_lineage.fn(
+            "urn:0", column=None, upstream=False, max_hops=3, format="graph"
+        )
+
+    assert len(json.dumps(result, separators=(",", ":"))) <= 1000
+    # The nodes furthest from the root are dropped, and so are their edges.
+    num_nodes = len(result["nodes"])
+    assert 1 < num_nodes < 31
+    assert [node[0] for node in result["nodes"]] == [
+        f"urn:{i}" for i in range(num_nodes)
+    ]
+    assert result["edges"] == [[i, i + 1] for i in range(num_nodes - 1)]
+    assert result["total"] == {"downstreams": 30}
+
+
+def test_is_datahub_cloud_is_probed_once() -> None:
+    class FakeGraph:
+        probes = 0
+
+        @property
+        def frontend_base_url(self) -> str:
+            self.probes += 1
+            raise ValueError("baseUrl not found in server config")
+
+    graph = FakeGraph()
+    assert not _is_datahub_cloud(graph)  # type: ignore[arg-type]
+    assert not _is_datahub_cloud(graph)  # type: ignore[arg-type]
+    assert graph.probes == 1
+
+
+def test_get_query_variant() -> None:
+    assert "#[CLOUD]" in entity_details_fragment_gql
+
+    oss_query = _get_query_variant(
+        entity_details_fragment_gql, operation_name="GetEntity", is_cloud=False
+    )
+    cloud_query = _get_query_variant(
+        entity_details_fragment_gql, operation_name="GetEntity", is_cloud=True
+    )
+    assert "query GetEntity(" in oss_query
+    assert "GetEntityLineage" not in oss_query
+    assert "documentationFields" in cloud_query
+    assert "#[CLOUD]" not in cloud_query
+    # The precomputed variant is reused rather than rebuilt.
+    assert (
+        _get_query_variant(
+            entity_details_fragment_gql, operation_name="GetEntity", is_cloud=True
+        )
+        is cloud_query
+    )
+
+    # Unknown queries fall back to rewriting the full query text.
+    assert (
+        _get_query_variant("#[CLOUD] foo", operation_name=None, is_cloud=True) == " foo"
+    )
+
+
+@pytest.mark.anyio
+async def test_search_results_are_cached() -> None:
+    with (
+        with_datahub_client(Mock()),
+        patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=False),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            return_value={"scrollAcrossEntities": {"total": 1, "searchResults": []}},
+        ) as mock_execute_graphql,
+    ):
+        first = await _search_implementation(
+            "*", '{"platform": ["looker", "dbt"]}', 10, "keyword"
+        )
+        # Mutating the result must not affect the cached copy.
+        first["total"] = 2
+        # Equivalent searches are served from the cache.
+        second = await _search_implementation(
+            " * ", '{"platform": ["dbt", "looker"]}', 10, "keyword"
+        )
+        assert mock_execute_graphql.call_count == 1
+        assert second == {"total": 1}
+
+        # Different result counts are different searches.
+        await _search_implementation(
+            "*", '{"platform": ["looker", "dbt"]}', 5, "keyword"
+        )
+        assert mock_execute_graphql.call_count == 2
+
+    stats = get_cache_stats()["search"]
+    assert stats.hits == 1
+    assert stats.entries == 2
+    _search_cache.clear()
+
+
+def test_filters_are_memoized() -> None:
+    before = get_cache_stats()
+    with patch(
+        "mcp_server_datahub.mcp_server.load_filters",
+        wraps=load_filters,
+    ) as mock_load_filters:
+        parsed = _load_filters('{"platform": ["looker"]}')
+        assert _load_filters('{"platform": ["looker"]}') is parsed
+        assert mock_load_filters.call_count == 1
+
+    compiled = _compile_filters(parsed)
+    # Equal filters share the compiled form, even if they're different objects.
+    assert _compile_filters(_load_filters('{"platform":["looker"]}')) is compiled
+    not_removed = {
+        "field": "removed",
+        "condition": "EQUAL",
+        "values": ["true"],
+        "negated": True,
+    }
+    assert _compile_filters(None) == (None, [{"and": [not_removed]}])
+
+    stats = get_cache_stats()
+    assert stats["parsed_filters"].hits - before["parsed_filters"].hits == 1
+    assert stats["compiled_filters"].hits - before["compiled_filters"].hits == 1
+    assert stats["compiled_filters"].entries == 2
+
+    assert AssetLineageAPI.get_degree_filter(3) is AssetLineageAPI.get_degree_filter(3)
+
+
+# Downstream lineage: 0 -> 1 -> 3 and 0 -> 2 -> 3.
+LINEAGE = {"urn:0": ["urn:1", "urn:2"], "urn:1": ["urn:3"], "urn:2": ["urn:3"]}
+
+
+async def fake_lineage_graph_execute_graphql(graph: Any, **kwargs: Any) -> dict:
+    input = kwargs["variables"]["input"]
+    degrees = next(
+        f["values"] for f in input["orFilters"][0]["and"] if f["field"] == "degree"
+    )
+    max_hops = 1000 if "3+" in degrees else len(degrees)
+
+    # Breadth-first search, like DataHub does.
+    paths = {input["urn"]: [input["urn"]]}
+    level = [input["urn"]]
+    for _ in range(max_hops):
+        level = [n for urn in level for n in LINEAGE.get(urn, []) if n not in paths]
+        for urn in level:
+            parent = next(p for p in paths if urn in LINEAGE.get(p, []))
+            paths[urn] = paths[parent] + [urn]
+    del paths[input["urn"]]
+
+    return {
+        "searchAcrossLineage": {
+            "total": len(paths),
+            "searchResults": [
+                {
+                    "entity": {"urn": urn, "type": "DATASET"},
+                    "degree": len(path) - 1,
+                    "paths": [{"path": [{"urn": u} for u in path]}],
+                }
+                for urn, path in paths.items()
+            ],
+        }
+    }
+
+
+async def get_lineage_graph(urn: str, max_hops: int) -> Any:
+    return await get_lineage.fn(
+        urn, column=None, upstream=False, max_hops=max_hops, format="graph"
+    )
+
+
+@pytest.mark.anyio
+async def test_lineage_graph_is_expanded_from_cache() -> None:
+    with (
+        with_datahub_client(Mock()),
+        patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=False),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            side_effect=fake_lineage_graph_execute_graphql,
+        ) as mock_execute_graphql,
+    ):
+        # Exploring hop by hop fetches each entity's direct lineage once.
+        await get_lineage_graph("urn:0", max_hops=1)
+        await get_lineage_graph("urn:1", max_hops=1)
+        await get_lineage_graph("urn:0", max_hops=1)
+        assert mock_execute_graphql.call_count == 2
+
+        # Only urn:2 is on the frontier that hasn't been fetched yet.
+        result = await get_lineage_graph("urn:0", max_hops=2)
+        assert mock_execute_graphql.call_count == 3
+        assert (
+            mock_execute_graphql.call_args.kwargs["variables"]["input"]["urn"]
+            == "urn:2"
+        )
+
+    nodes = [node[0] for node in result["nodes"]]
+    assert nodes == ["urn:0", "urn:1", "urn:2", "urn:3"]
+    assert [node[4] for node in result["nodes"]] == [0, 1, 1, 2]
+    assert result["edges"] == [[0, 1], [0, 2], [1, 3], [2, 3]]
+    assert result["total"] == {"downstreams": 3}
+
+
+@pytest.mark.anyio
+async def test_lineage_graph_remembers_multi_hop_results() -> None:
+    with (
+        with_datahub_client(Mock()),
+        patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=False),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            side_effect=fake_lineage_graph_execute_graphql,
+        ) as mock_execute_graphql,
+    ):
+        # DataHub traverses the lineage itself when we haven't seen it before.
+        result = await get_lineage_graph("urn:0", max_hops=3)
+        assert mock_execute_graphql.call_count == 1
+        assert result["total"] == {"downstreams": 3}
+
+        # The direct lineage of the root is known from the full results.
+        result = await get_lineage_graph("urn:0", max_hops=1)
+        assert mock_execute_graphql.call_count == 1
+        assert [node[0] for node in result["nodes"]] == ["urn:0", "urn:1", "urn:2"]
+
+        # Different filters are cached separately.
+        await get_lineage.fn(
+            "urn:0",
+            column=None,
+            filters='{"platform": ["snowflake"]}',
+            upstream=False,
+            format="graph",
+        )
+        assert mock_execute_graphql.call_count == 2
+
+    assert get_cache_stats()["lineage"].entries == 2
+
+
+@pytest.mark.anyio
+async def test_get_columns_lineage() -> None:
+    dataset = "urn:li:dataset:(urn:li:dataPlatform:snowflake,db.orders,PROD)"
+    upstream = "urn:li:dataset:(urn:li:dataPlatform:snowflake,db.raw_orders,PROD)"
+    in_flight = max_in_flight = 0
+
+    async def execute_graphql(graph: Any, **kwargs: Any) -> dict:
+        nonlocal in_flight, max_in_flight
+        if kwargs["operation_name"] == "GetSchemaFieldPaths":
+            fields = [{"fieldPath": f"col_{i}"} for i in range(5)]
+            return {"entity": {"schemaMetadata": {"fields": fields}}}
+
+        urn = kwargs["variables"]["input"]["urn"]
+        if urn.endswith("col_3)"):
+            raise GraphError("Failed to fetch lineage")
+        if urn.endswith("col_4)"):
+            raise httpx.ReadTimeout("timed out")
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await anyio.sleep(0.01)
+        in_flight -= 1
+        result = {"entity": {"urn": upstream, "type": "DATASET"}, "degree": 1}
+        return {"searchAcrossLineage": {"total": 1, "searchResults": [result]}}
+
+    with (
+        with_datahub_client(Mock()),
+        patch.dict("os.environ", {"COLUMN_LINEAGE_CONCURRENCY": "2"}),
+        patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=False),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            side_effect=execute_graphql,
+        ),
+    ):
+        full = await get_columns_lineage.fn(dataset)
+        graph = await get_columns_lineage.fn(
+            dataset, columns=["col_1", "col_3", "col_1", "col_2"], format="graph"
+        )
+        with pytest.raises(ValueError, match="should be a dataset urn"):
+            await get_columns_lineage.fn("urn:li:chart:(looker,baz)", columns=["a"])
+
+    assert list(full["columns"]) == [f"col_{i}" for i in range(5)]
+    assert full["columns"]["col_0"]["upstreams"]["total"] == 1
+    assert full["columns"]["col_3"] == {"error": "Failed to fetch lineage"}
+    assert full["columns"]["col_4"] == {"error": "timed out"}
+    assert max_in_flight == 2
+
+    # The shared upstream is only listed once.
+    assert [node[0] for node in graph["nodes"]] == [
+        dataset,
+        f"urn:li:schemaField:({dataset},col_1)",
+        upstream,
+        f"urn:li:schemaField:({dataset},col_2)",
+    ]
+    assert graph["edges"] == [[2, 1], [2, 3]]
+    assert graph["columns"] == {
+        "col_1": {"total": {"upstreams": 1}, "node": 1},
+        "col_3": {"error": "Failed to fetch lineage"},
+        "col_2": {"total": {"upstreams": 1}, "node": 3},
+    }
+
+
+@pytest.mark.anyio
+async def test_get_columns_lineage_bounds_columns() -> None:
+    dataset = "urn:li:dataset:(urn:li:dataPlatform:snowflake,db.orders,PROD)"
+    fields = [{"fieldPath": f"col_{i}"} for i in range(5)]
+
+    with (
+        with_datahub_client(Mock()),
+        patch.dict("os.environ", {"COLUMN_LINEAGE_MAX_COLUMNS": "4"}),
+        patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=False),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            return_value={"entity": {"schemaMetadata": {"fields": fields}}},
+        ) as mock_execute_graphql,
+    ):
+        with pytest.raises(ValueError, match="Pass the columns"):
+            await get_columns_lineage.fn(dataset)
+        with pytest.raises(ValueError, match="at most 4 columns"):
+            await get_columns_lineage.fn(dataset, columns=[f"c{i}" for i in range(5)])
+
+    # Only the schema was fetched, not the lineage of any column.
+    assert mock_execute_graphql.call_count == 1
+
+
+def test_sanitize_and_truncate_description() -> None:
+    assert sanitize_and_truncate_description("  plain text  ", 100) == "plain text"
+    assert (
+        sanitize_and_truncate_description(
+            "<p>A &amp; B ![chart](data:image/png;base64,AAAA)</p>", 100
+        )
+        == "A & B chart"
+    )
+    # A "<" that doesn't start a tag is kept, even in very long descriptions.
+    assert sanitize_and_truncate_description("<" + "x" * 200, 10) == "<xxxxxx..."
+
+
+def test_sanitize_and_truncate_description_pre_truncation() -> None:
+    # Very long descriptions are truncated before they are sanitized, which must
+    # not change the result, wherever the cut happens to fall.
+    tokens = [
+        "word",
+        " ",
+        "\n",
+        "<b>",
+        "</b>",
+        "<p class='x'>",
+        "&amp;",
+        "&notin;",
+        "&#x41;",
+        "R&D",
+        "![alt](data:image/png;base64," + "A" * 50 + ")",
+        "![link](http://example.com)",
+    ]
+    rng = random.Random(0)
+    for _ in range(500):
+        max_length = rng.choice([20, 50, 100])
+        text = "".join(rng.choice(tokens) for _ in range(rng.randint(50, 400)))
+        expected = truncate_with_ellipsis(
+            sanitize_markdown_content(sanitize_html_content(text)), max_length
+        )
+        assert sanitize_and_truncate_description(text, max_length) == expected
+
+
+@pytest.mark.anyio
+async def test_fetch_encodes_document() -> None:
+    urn = "urn:li:dataset:(urn:li:dataPlatform:snowflake,db.orders,PROD)"
+
+    async def execute_graphql(graph: Any, **kwargs: Any) -> dict:
+        if kwargs["operation_name"] == "GetEntity":
+            return {
+                "entity": {
+                    "urn": urn,
+                    "type": "DATASET",
+                    "name": "orders",
+                    "properties": {"description": 'Orders "placed" ✓'},
+                }
+            }
+        return {"searchAcrossLineage": {"total": 0, "searchResults": []}}
+
+    client = Mock()
+    client._graph.url_for.return_value = "https://example.com/dataset"
+    with (
+        with_datahub_client(client),
+        patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=False),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            side_effect=execute_graphql,
+        ),
+    ):
+        # Once uncached and once from the cache.
+        results = [await fetch.fn(urn), await fetch.fn(urn)]
+
+    for result in results:
+        document = json.loads(result.content[0].text)
+        assert document["id"] == urn
+        payload = json.loads(document["text"])
+        assert payload["entity"]["properties"]["description"] == 'Orders "placed" ✓'
+        assert payload["lineage"]["upstreams"]["total"] == 0
+
+
+@pytest.mark.anyio
+async def test_fetch_fits_response_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("MAX_RESPONSE_BYTES", "2000")
+    urn = "urn:li:dataset:(urn:li:dataPlatform:snowflake,db.orders,PROD)"
+    fields = [{"fieldPath": f"column_{i}", "nullable": True} for i in range(100)]
+
+    async def execute_graphql(graph: Any, **kwargs: Any) -> dict:
+        if kwargs["operation_name"] == "GetEntity":
+            return {
+                "entity": {
+                    "urn": urn,
+                    "type": "DATASET",
+                    "name": "orders",
+                    "schemaMetadata": {"fields": fields},
+                }
+            }
+        return {"searchAcrossLineage": {"total": 0, "searchResults": []}}
+
+    client = Mock()
+    client._graph.url_for.return_value = "https://example.com/dataset"
+    with (
+        with_datahub_client(client),
+        patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=False),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            side_effect=execute_graphql,
+        ),
+    ):
+        result = await fetch.fn(urn)
+
+    text = json.loads(result.content[0].text)["text"]
+    assert len(text.encode()) <= 2000
+    pruned_fields = json.loads(text)["entity"]["schemaMetadata"]["fields"]
+    assert pruned_fields[-1].endswith(" more fields not shown)")
+
+
+WIDE_DATASET_URN = "urn:li:dataset:(urn:li:dataPlatform:snowflake,db.wide,PROD)"
+
+
+async def fake_wide_dataset_execute_graphql(graph: Any, **kwargs: Any) -> dict:
+    return {
+        "entity": {
+            "urn": WIDE_DATASET_URN,
+            "schemaMetadata": {
+                "fields": [
+                    {"fieldPath": f"column_{i}", "recursive": False} for i in range(250)
+                ]
+            },
+            "editableSchemaMetadata": {
+                "editableSchemaFieldInfo": [
+                    {"fieldPath": "column_1", "description": "First"},
+                    {"fieldPath": "column_200", "description": "Late"},
+                ]
+            },
+        }
+    }
+
+
+@pytest.mark.anyio
+async def test_get_entity_limits_schema_fields(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("ENTITY_SCHEMA_FIELDS_LIMIT", "100")
+    with (
+        patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=False),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            side_effect=fake_wide_dataset_execute_graphql,
+        ),
+    ):
+        entity = await _get_entity_details(Mock(), WIDE_DATASET_URN)
+
+    fields = entity["schemaMetadata"]["fields"]
+    assert [field["fieldPath"] for field in fields] == [
+        f"column_{i}" for i in range(100)
+    ]
+    assert entity["schemaMetadata"]["totalFields"] == 250
+    # Only the editable info of the included fields is kept.
+    assert entity["editableSchemaMetadata"]["editableSchemaFieldInfo"] == [
+        {"fieldPath": "column_1", "description": "First"}
+    ]
+
+
+@pytest.mark.anyio
+async def test_get_schema_fields() -> None:
+    with (
+        with_datahub_client(Mock()),
+        patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=False),
+        patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            side_effect=fake_wide_dataset_execute_graphql,
+        ) as mock_execute_graphql,
+    ):
+        page = await get_schema_fields.fn(WIDE_DATASET_URN, start=190, count=20)
+        matches = await get_schema_fields.fn(WIDE_DATASET_URN, pattern="^COLUMN_1.$")
+        with pytest.raises(ValueError, match="Invalid pattern"):
+            await get_schema_fields.fn(WIDE_DATASET_URN, pattern="(")
+        with pytest.raises(ValueError, match="Pattern is too long"):
+            await get_schema_fields.fn(WIDE_DATASET_URN, pattern="a" * 201)
+        with pytest.raises(ValueError, match="should be a dataset urn"):
+            await get_schema_fields.fn("urn:li:corpuser:datahub")
+
+    # The schema is fetched once, and then paged from the cache.
+    assert mock_execute_graphql.call_count == 1
+    assert mock_execute_graphql.call_args.kwargs["operation_name"] == "GetSchemaFields"
+
+    assert page["total"] == 250
+    assert page["start"] == 190
+    assert page["count"] == 20
+    # Schema field defaults are stripped, like in get_entity.
+    assert page["fields"][0] == {"fieldPath": "column_190"}
+    assert page["editableSchemaFieldInfo"] == [
+        {"fieldPath": "column_200", "description": "Late"}
+    ]
+
+    assert matches["total"] == 10
+    assert [field["fieldPath"] for field in matches["fields"]] == [
+        f"column_1{i}" for i in range(10)
+    ]
+    assert "editableSchemaFieldInfo" not in matches
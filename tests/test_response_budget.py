@@ -0,0 +1,116 @@
+from typing import Any, Dict
+
+from mcp_server_datahub import _json
+from mcp_server_datahub._response_budget import estimate_size, fit_to_budget
+
+
+def make_entity(num_fields: int) -> Dict[str, Any]:
+    return {
+        "urn": "urn:li:dataset:(urn:li:dataPlatform:snowflake,db.orders,PROD)",
+        "properties": {
+            "description": 'One row per "order".\nSee the wiki ✓',
+            "customProperties": [{"key": f"k{i}", "value": "v"} for i in range(20)],
+        },
+        "health": [{"type": "ASSERTIONS", "status": "PASS", "message": None}],
+        "schemaMetadata": {
+            "fields": [
+                {"fieldPath": f"column_{i}", "nullable": True, "description": "x" * 50}
+                for i in range(num_fields)
+            ]
+        },
+    }
+
+
+def encoded_size(value: Any) -> int:
+    return len(_json.dumps(value).encode())
+
+
+def test_estimate_size_matches_encoded_size_for_typical_responses() -> None:
+    entity = make_entity(10)
+    entity["count"] = 12.5
+    entity["deprecated"] = False
+    entity["empty"] = {"list": [], "dict": {}}
+    assert estimate_size(entity) == encoded_size(entity)
+
+
+def test_fit_to_budget_leaves_small_responses_alone() -> None:
+    entity = make_entity(10)
+    assert fit_to_budget(make_entity(10), encoded_size(entity)) == entity
+
+
+def test_fit_to_budget_drops_low_priority_keys_first() -> None:
+    entity = make_entity(10)
+    budget = encoded_size(entity) - 10
+    result = fit_to_budget(entity, budget)
+
+    # Dropping health is enough, so custom properties are kept.
+    assert "health" not in result
+    assert len(result["properties"]["customProperties"]) == 20
+    assert len(result["schemaMetadata"]["fields"]) == 10
+    assert encoded_size(result) <= budget
+
+
+def test_fit_to_budget_keeps_facets() -> None:
+    # Facets are what agents refine searches with, so they are cut short like any
+    # other list rather than dropped.
+    response = {
+        "total": 1000,
+        "searchResults": [{"entity": {"urn": f"urn:li:tag:{i}"}} for i in range(20)],
+        "facets": [{"field": f"field_{i}", "aggregations": []} for i in range(5)],
+    }
+    budget = encoded_size(response) - 10
+    result = fit_to_budget(response, budget)
+
+    assert len(result["facets"]) == 5
+    assert len(result["searchResults"]) < 20
+    assert encoded_size(result) <= budget
+
+
+def test_fit_to_budget_caps_lists() -> None:
+    result = fit_to_budget(make_entity(1000), 20_000)
+
+    assert "health" not in result
+    assert "customProperties" not in result["properties"]
+    fields = result["schemaMetadata"]["fields"]
+    assert fields[-1] == f"({1000 - (len(fields) - 1)} more fields not shown)"
+    assert (
+        fields[:-1] == make_entity(1000)["schemaMetadata"]["fields"][: len(fields) - 1]
+    )
+    assert 19_000 < encoded_size(result) <= 20_000
+
+
+def test_fit_to_budget_truncates_strings_last() -> None:
+    entity = {"urn": "urn:li:tag:a", "description": "x" * 10_000}
+    result = fit_to_budget(entity, 1_000)
+
+    assert result["description"].endswith("...")
+    assert encoded_size(result) <= 1_000
+
+
+def test_fit_to_budget_keeps_editable_schema_metadata() -> None:
+    editable_schema_metadata = {
+        "editableSchemaFieldInfo": [
+            {"fieldPath": "column_0", "description": "Curated column docs"}
+        ]
+    }
+    entity = make_entity(10)
+    del entity["health"], entity["properties"]["customProperties"]
+    budget = encoded_size(entity) - 10
+    entity["editableSchemaMetadata"] = editable_schema_metadata
+    result = fit_to_budget(entity, budget)
+
+    # Column docs written by users are kept, and the schema is cut short instead.
+    assert result["editableSchemaMetadata"] == editable_schema_metadata
+    assert len(result["schemaMetadata"]["fields"]) < 10
+    assert encoded_size(result) <= budget
+
+
+def test_fit_to_budget_never_truncates_urns_and_urls() -> None:
+    urn = "urn:li:dataset:(urn:li:dataPlatform:snowflake," + "a" * 2_000 + ",PROD)"
+    url = "https://example.acryl.io/dataset/" + "b" * 2_000
+    entity = {"urn": urn, "url": url, "description": "x" * 1_000}
+    result = fit_to_budget(entity, 4_000)
+
+    assert result["urn"] == urn
+    assert result["url"] == url
+    assert result["description"].endswith("...")
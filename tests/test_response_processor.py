@@ -0,0 +1,201 @@
+import copy
+import random
+from typing import Any
+
+from mcp_server_datahub._response_processor import ResponseProcessor
+from mcp_server_datahub.mcp_server import (
+    DESCRIPTION_LENGTH_HARD_LIMIT,
+    NESTED_DESCRIPTION_LENGTH_LIMIT,
+    SCHEMA_FIELD_DESCRIPTION_LENGTH_LIMIT,
+    _entity_response_processor,
+    _lineage_response_processor,
+    clean_gql_response,
+)
+
+KEYS = ["urn", "name", "description", "__typename", "entity", "fields", "tags"]
+
+
+def url_for(urn: str) -> str:
+    return f"https://example.com/{urn}"
+
+
+def random_value(rng: random.Random, depth: int = 0) -> Any:
+    kind = rng.randrange(7 if depth < 4 else 4)
+    if kind == 0:
+        return None
+    if kind == 1:
+        return rng.choice([True, False, 0, 1.5])
+    if kind == 2:
+        return rng.choice(["", "x", "<b>bold</b> text " * rng.randrange(1, 100)])
+    if kind == 3:
+        return f"urn:li:corpuser:{rng.randrange(10)}"
+    if kind == 4:
+        return [random_value(rng, depth + 1) for _ in range(rng.randrange(3))]
+    value = {
+        rng.choice(KEYS): random_value(rng, depth + 1) for _ in range(rng.randrange(5))
+    }
+    if "urn" in value:
+        value["urn"] = rng.choice([None, "", f"urn:li:corpuser:{rng.randrange(10)}"])
+    return value
+
+
+def test_processor_matches_clean_gql_response() -> None:
+    rng = random.Random(42)
+    for _ in range(500):
+        response = random_value(rng)
+        original = copy.deepcopy(response)
+
+        result = ResponseProcessor().process(response)
+
+        assert response == original
+        expected = clean_gql_response(response)
+        assert result == expected
+        assert repr(result) == repr(expected)
+
+
+def test_processor_strips_schema_field_defaults() -> None:
+    processor = ResponseProcessor(strip_schema_field_defaults=True)
+    entity = {
+        "urn": "urn:li:dataset:x",
+        "schemaMetadata": {
+            "platformSchema": {"__typename": "TableSchema", "schema": ""},
+            "fields": [
+                {"fieldPath": "a", "recursive": False, "isPartOfKey": True},
+                {"fieldPath": "b", "recursive": None, "isPartOfKey": False},
+            ],
+        },
+        # Only schema fields of the entity itself are affected.
+        "other": {"fields": [{"fieldPath": "c", "recursive": False}]},
+    }
+
+    assert processor.process(entity) == {
+        "urn": "urn:li:dataset:x",
+        "schemaMetadata": {
+            "fields": [{"fieldPath": "a", "isPartOfKey": True}, {"fieldPath": "b"}]
+        },
+        "other": {"fields": [{"fieldPath": "c", "recursive": False}]},
+    }
+
+
+def test_processor_truncates_descriptions() -> None:
+    processor = ResponseProcessor(
+        transform_description=lambda text, limit: text[:limit], description_limit=3
+    )
+
+    result = processor.process(
+        {"a": [{"description": "abcdef"}], "description": {"description": "xyz!"}}
+    )
+
+    assert result == {
+        "a": [{"description": "abc"}],
+        "description": {"description": "xyz"},
+    }
+
+
+def test_processor_description_limits() -> None:
+    processor = ResponseProcessor(
+        transform_description=lambda text, limit: text[:limit],
+        description_limit=1,
+        description_limits={
+            "": 5,
+            "properties": 4,
+            "schemaMetadata.fields[]": 3,
+            "*": 2,
+        },
+    )
+    description = "abcdefgh"
+
+    result = processor.process(
+        {
+            "description": description,
+            "properties": {"description": description},
+            "schemaMetadata": {
+                "description": description,
+                "fields": [{"description": description}],
+            },
+            "domain": {"description": description, "owner": {"description": "xy"}},
+        }
+    )
+
+    # Each object gets the limit of the first path that matches it, and limits
+    # only apply to an object's own description.
+    assert result == {
+        "description": "abcde",
+        "properties": {"description": "abcd"},
+        "schemaMetadata": {"description": "ab", "fields": [{"description": "abc"}]},
+        "domain": {"description": "ab", "owner": {"description": "x"}},
+    }
+
+
+def test_processor_url_paths() -> None:
+    processor = ResponseProcessor(url_paths=["results[].entity", "owner"])
+
+    result = processor.process(
+        {
+            "results": [{"entity": {"name": "a", "urn": "urn:a"}}, {"entity": {}}],
+            "owner": {"urn": "urn:b"},
+            "other": {"urn": "urn:c"},
+        },
+        url_for=url_for,
+    )
+
+    assert result == {
+        "results": [
+            {"entity": {"urn": "urn:a", "url": url_for("urn:a"), "name": "a"}},
+            {},
+        ],
+        "owner": {"urn": "urn:b", "url": url_for("urn:b")},
+        "other": {"urn": "urn:c"},
+    }
+    assert list(result["results"][0]["entity"]) == ["urn", "url", "name"]
+
+
+def test_processor_handles_deep_nesting() -> None:
+    response: dict = {"urn": "leaf"}
+    for _ in range(5000):
+        response = {"child": response, "__typename": "Node"}
+
+    result = ResponseProcessor().process(response)
+
+    for _ in range(5000):
+        result = result["child"]
+    assert result == {"urn": "leaf"}
+
+
+def test_description_limit_is_hard_limit() -> None:
+    description = "x" * (DESCRIPTION_LENGTH_HARD_LIMIT * 2)
+    result = _lineage_response_processor.process(
+        {"upstreams": {"searchResults": [{"entity": {"description": description}}]}}
+    )
+
+    entity = result["upstreams"]["searchResults"][0]["entity"]
+    assert len(entity["description"]) == DESCRIPTION_LENGTH_HARD_LIMIT
+
+
+def test_description_limits_depend_on_path() -> None:
+    description = "x" * (DESCRIPTION_LENGTH_HARD_LIMIT * 2)
+    result = _entity_response_processor.process(
+        {
+            "urn": "urn:li:dataset:x",
+            "properties": {"description": description},
+            "schemaMetadata": {
+                "fields": [{"fieldPath": "a", "description": description}]
+            },
+            "editableSchemaMetadata": {
+                "editableSchemaFieldInfo": [
+                    {"fieldPath": "a", "description": description}
+                ]
+            },
+            "glossaryTerms": {
+                "terms": [{"term": {"properties": {"description": description}}}]
+            },
+        }
+    )
+
+    assert len(result["properties"]["description"]) == DESCRIPTION_LENGTH_HARD_LIMIT
+    field = result["schemaMetadata"]["fields"][0]
+    assert len(field["description"]) == SCHEMA_FIELD_DESCRIPTION_LENGTH_LIMIT
+    field = result["editableSchemaMetadata"]["editableSchemaFieldInfo"][0]
+    assert len(field["description"]) == SCHEMA_FIELD_DESCRIPTION_LENGTH_LIMIT
+    term = result["glossaryTerms"]["terms"][0]["term"]
+    assert len(term["properties"]["description"]) == NESTED_DESCRIPTION_LENGTH_LIMIT
@@ -0,0 +1,183 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from unittest import mock
+
+import pytest
+from fastmcp import Client
+
+from mcp_server_datahub.mcp_server import (
+    _search_implementation,
+    mcp,
+    with_datahub_client,
+)
+
+PAGES: Dict[Optional[str], Dict[str, Any]] = {
+    None: {
+        "count": 2,
+        "total": 5,
+        "nextScrollId": "scroll-1",
+        "searchResults": [
+            {"entity": {"urn": "urn:li:tag:a"}},
+            {"entity": {"urn": "urn:li:tag:b"}},
+        ],
+        "facets": [{"field": "platform", "aggregations": []}],
+    },
+    "scroll-1": {
+        "count": 2,
+        "total": 5,
+        "nextScrollId": "scroll-2",
+        "searchResults": [
+            {"entity": {"urn": "urn:li:tag:c"}},
+            {"entity": {"urn": "urn:li:tag:d"}},
+        ],
+        "facets": [{"field": "platform", "aggregations": []}],
+    },
+    "scroll-2": {
+        "count": 1,
+        "total": 5,
+        "nextScrollId": None,
+        "searchResults": [{"entity": {"urn": "urn:li:tag:e"}}],
+        "facets": [{"field": "platform", "aggregations": []}],
+    },
+}
+
+
+async def fake_execute_graphql(graph: Any, **kwargs: Any) -> Dict[str, Any]:
+    scroll_id = kwargs["variables"]["scrollId"]
+    return {"scrollAcrossEntities": json.loads(json.dumps(PAGES[scroll_id]))}
+
+
+@pytest.fixture
+def execute_graphql() -> Any:
+    with (
+        mock.patch(
+            "mcp_server_datahub.mcp_server._execute_graphql",
+            side_effect=fake_execute_graphql,
+        ) as mock_execute_graphql,
+        with_datahub_client(mock.Mock()),
+    ):
+        yield mock_execute_graphql
+
+
+def result_urns(result: Dict[str, Any]) -> List[str]:
+    return [r["entity"]["urn"] for r in result["searchResults"]]
+
+
+@pytest.mark.anyio
+async def test_search_cursor_round_trip(execute_graphql: Any) -> None:
+    first = await _search_implementation("*", None, 2, "keyword")
+    assert result_urns(first) == ["urn:li:tag:a", "urn:li:tag:b"]
+    assert "nextScrollId" not in first
+
+    second = await _search_implementation(
+        "*", None, 2, "keyword", cursor=first["nextCursor"]
+    )
+    assert execute_graphql.call_args.kwargs["variables"]["scrollId"] == "scroll-1"
+    assert result_urns(second) == ["urn:li:tag:c", "urn:li:tag:d"]
+
+    third = await _search_implementation(
+        "*", None, 2, "keyword", cursor=second["nextCursor"]
+    )
+    assert "nextCursor" not in third
+
+
+@pytest.mark.anyio
+async def test_search_cursor_is_tied_to_search(execute_graphql: Any) -> None:
+    first = await _search_implementation("*", None, 2, "keyword")
+
+    with pytest.raises(ValueError, match="different search"):
+        await _search_implementation(
+            "orders", None, 2, "keyword", cursor=first["nextCursor"]
+        )
+    with pytest.raises(ValueError, match="Invalid search cursor"):
+        await _search_implementation("*", None, 2, "keyword", cursor="garbage")
+    with pytest.raises(ValueError, match="not supported for semantic search"):
+        await _search_implementation(
+            "*", None, 2, "semantic", cursor=first["nextCursor"]
+        )
+
+
+@pytest.mark.anyio
+async def test_search_cursor_ignores_whitespace(execute_graphql: Any) -> None:
+    await _search_implementation("orders  table", None, 2, "keyword")
+    # Served from the cache, including the cursor of the first search.
+    first = await _search_implementation(" orders table", None, 2, "keyword")
+    assert execute_graphql.call_count == 1
+
+    second = await _search_implementation(
+        "orders table", None, 2, "keyword", cursor=first["nextCursor"]
+    )
+    assert execute_graphql.call_args.kwargs["variables"]["scrollId"] == "scroll-1"
+    assert result_urns(second) == ["urn:li:tag:c", "urn:li:tag:d"]
+
+
+@pytest.mark.anyio
+async def test_search_cursor_ignores_filter_order(execute_graphql: Any) -> None:
+    filters = [
+        {"platform": ["snowflake"]},
+        {"entity_type": ["dataset", "chart"]},
+    ]
+    await _search_implementation("*", json.dumps({"and": filters}), 2, "keyword")
+    reordered = json.dumps(
+        {"and": [{"entity_type": ["chart", "dataset"]}, {"platform": ["snowflake"]}]}
+    )
+    # Served from the cache, including the cursor of the first search.
+    first = await _search_implementation("*", reordered, 2, "keyword")
+    assert execute_graphql.call_count == 1
+
+    second = await _search_implementation(
+        "*", reordered, 2, "keyword", cursor=first["nextCursor"]
+    )
+    assert execute_graphql.call_args.kwargs["variables"]["scrollId"] == "scroll-1"
+    assert result_urns(second) == ["urn:li:tag:c", "urn:li:tag:d"]
+
+
+@pytest.mark.anyio
+async def test_search_tool_streams_pages(execute_graphql: Any) -> None:
+    progress: List[Tuple[float, Optional[float], Optional[str]]] = []
+
+    async def progress_handler(
+        progress_value: float, total: Optional[float], message: Optional[str]
+    ) -> None:
+        progress.append((progress_value, total, message))
+
+    async with Client(mcp, progress_handler=progress_handler) as mcp_client:
+        result = await mcp_client.call_tool(
+            "search", {"query": "*", "num_results": 2, "max_pages": 5}
+        )
+
+    data = result.structured_content
+    assert data is not None
+    assert result_urns(data) == [
+        "urn:li:tag:a",
+        "urn:li:tag:b",
+        "urn:li:tag:c",
+        "urn:li:tag:d",
+        "urn:li:tag:e",
+    ]
+    assert data["count"] == 5
+    assert "nextCursor" not in data
+    assert len(data["facets"]) == 1
+    assert execute_graphql.call_count == 3
+
+    # Each page is streamed as it arrives.
+    assert [(p, t) for p, t, _ in progress] == [(1, 5), (2, 5), (3, 5)]
+    assert result_urns(json.loads(progress[2][2] or "")) == ["urn:li:tag:e"]
+
+
+@pytest.mark.anyio
+async def test_search_tool_max_pages_returns_cursor(execute_graphql: Any) -> None:
+    async with Client(mcp) as mcp_client:
+        result = await mcp_client.call_tool(
+            "search", {"query": "*", "num_results": 2, "max_pages": 2}
+        )
+        data = result.structured_content
+        assert data is not None
+        assert len(data["searchResults"]) == 4
+
+        result = await mcp_client.call_tool(
+            "search", {"query": "*", "num_results": 2, "cursor": data["nextCursor"]}
+        )
+        data = result.structured_content
+        assert data is not None
+        assert result_urns(data) == ["urn:li:tag:e"]
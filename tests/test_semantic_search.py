@@ -60,9 +60,10 @@ def with_test_mcp_server(enabled: bool) -> Iterator[FastMCP]:
 class TestSearchImplementation:
     """Test the core search implementation logic."""
 
+    @pytest.mark.anyio
     @mock.patch("mcp_server_datahub.mcp_server.get_datahub_client")
     @mock.patch("mcp_server_datahub.mcp_server._execute_graphql")
-    def test_search_implementation_semantic_strategy(
+    async def test_search_implementation_semantic_strategy(
         self, mock_execute_graphql, mock_get_client
     ):
         """Test that semantic strategy uses the correct GraphQL query and parameters."""
@@ -83,7 +84,7 @@ class TestSearchImplementation:
         mock_execute_graphql.return_value = mock_response
 
         # Call the function
-        result = _search_implementation(
+        result = await _search_implementation(
             query="customer data",
             filters=None,
             num_results=10,
@@ -108,9 +109,10 @@ class TestSearchImplementation:
         assert result["count"] == 5
         assert result["total"] == 100
 
+    @pytest.mark.anyio
     @mock.patch("mcp_server_datahub.mcp_server.get_datahub_client")
     @mock.patch("mcp_server_datahub.mcp_server._execute_graphql")
-    def test_search_implementation_keyword_strategy(
+    async def test_search_implementation_keyword_strategy(
         self, mock_execute_graphql, mock_get_client
     ):
         """Test that keyword strategy uses the correct GraphQL query and parameters."""
@@ -131,7 +133,7 @@ class TestSearchImplementation:
         mock_execute_graphql.return_value = mock_response
 
         # Call the function
-        _search_implementation(
+        await _search_implementation(
             query="user_events", filters=None, num_results=5, search_strategy="keyword"
         )
 
@@ -149,9 +151,10 @@ class TestSearchImplementation:
         assert variables["count"] == 5
         assert variables["scrollId"] is None  # Keyword search includes scrollId
 
+    @pytest.mark.anyio
     @mock.patch("mcp_server_datahub.mcp_server.get_datahub_client")
     @mock.patch("mcp_server_datahub.mcp_server._execute_graphql")
-    def test_search_implementation_default_strategy(
+    async def test_search_implementation_default_strategy(
         self, mock_execute_graphql, mock_get_client
     ):
         """Test that None/default strategy defaults to keyword search."""
@@ -172,7 +175,7 @@ class TestSearchImplementation:
         mock_execute_graphql.return_value = mock_response
 
         # Call without search_strategy (should default to keyword)
-        _search_implementation(
+        await _search_implementation(
             query="test", filters=None, num_results=1, search_strategy=None
         )
 
@@ -181,11 +184,12 @@ class TestSearchImplementation:
         assert call_args[1]["query"] == search_gql
         assert call_args[1]["operation_name"] == "search"
 
+    @pytest.mark.anyio
     @mock.patch("mcp_server_datahub.mcp_server.get_datahub_client")
     @mock.patch("mcp_server_datahub.mcp_server._execute_graphql")
     @mock.patch("mcp_server_datahub.mcp_server.load_filters")
     @mock.patch("mcp_server_datahub.mcp_server.compile_filters")
-    def test_search_implementation_with_filters(
+    async def test_search_implementation_with_filters(
         self,
         mock_compile_filters,
         mock_load_filters,
@@ -215,7 +219,7 @@ class TestSearchImplementation:
         # Test with filter string (gets parsed)
         filters = '{"platform": ["snowflake"]}'
 
-        _search_implementation(
+        await _search_implementation(
             query="analytics",
             filters=filters,
             num_results=10,
@@ -235,9 +239,10 @@ class TestSearchImplementation:
         assert variables["types"] == ["DATASET"]
         assert variables["orFilters"] == [{"platform": "snowflake"}]
 
+    @pytest.mark.anyio
     @mock.patch("mcp_server_datahub.mcp_server.get_datahub_client")
     @mock.patch("mcp_server_datahub.mcp_server._execute_graphql")
-    def test_search_implementation_num_results_zero_hack(
+    async def test_search_implementation_num_results_zero_hack(
         self, mock_execute_graphql, mock_get_client
     ):
         """Test the num_results=0 hack works correctly."""
@@ -260,7 +265,7 @@ class TestSearchImplementation:
         mock_execute_graphql.return_value = mock_response
 
         # Call with num_results=0
-        result = _search_implementation(
+        result = await _search_implementation(
             query="test", filters=None, num_results=0, search_strategy="semantic"
         )
 
@@ -270,12 +275,13 @@ class TestSearchImplementation:
         assert "total" in result  # total should remain
         assert "facets" in result  # facets should remain (non-empty so not cleaned out)
 
+    @pytest.mark.anyio
     @mock.patch(
         "mcp_server_datahub.mcp_server.is_openai_search_enabled", return_value=True
     )
     @mock.patch("mcp_server_datahub.mcp_server.get_datahub_client")
     @mock.patch("mcp_server_datahub.mcp_server._execute_graphql")
-    def test_search_implementation_openai_format(
+    async def test_search_implementation_openai_format(
         self,
         mock_execute_graphql,
         mock_get_client,
@@ -306,7 +312,7 @@ class TestSearchImplementation:
         }
         mock_execute_graphql.return_value = mock_response
 
-        result = _search_implementation(
+        result = await _search_implementation(
             query="*", filters=None, num_results=5, search_strategy="keyword"
         )
 
@@ -375,9 +381,10 @@ class TestSearchImplementation:
 
         mock_graph.url_for.assert_called_once_with(urn_without_url)
 
+    @pytest.mark.anyio
     @mock.patch("mcp_server_datahub.mcp_server.get_datahub_client")
     @mock.patch("mcp_server_datahub.mcp_server._execute_graphql")
-    def test_openai_search_function(self, mock_execute_graphql, mock_get_client):
+    async def test_openai_search_function(self, mock_execute_graphql, mock_get_client):
         """Test the dedicated openai_search function."""
         from mcp_server_datahub.mcp_server import openai_search
 
@@ -404,7 +411,7 @@ class TestSearchImplementation:
         }
         mock_execute_graphql.return_value = mock_response
 
-        result = openai_search("test query")
+        result = await openai_search("test query")
 
         # Should always return a ToolResult with JSON content
         from fastmcp.tools.tool import ToolResult
@@ -441,7 +448,7 @@ async def test_tool_binding_basic_search() -> None:
         mock_search_response = {"count": 3, "total": 50, "searchResults": []}
 
         # Create mock with automatic call tracking
-        mock_search_impl = mock.Mock(return_value=mock_search_response)
+        mock_search_impl = mock.AsyncMock(return_value=mock_search_response)
 
         # Set up mock DataHub client context
         mock_client = mock.Mock(spec=DataHubClient)
@@ -485,7 +492,7 @@ async def test_tool_binding_enhanced_search() -> None:
         mock_search_response = {"count": 5, "total": 100, "searchResults": []}
 
         # Create mock with automatic call tracking
-        mock_search_impl = mock.Mock(return_value=mock_search_response)
+        mock_search_impl = mock.AsyncMock(return_value=mock_search_response)
 
         # Test tool binding with isolated MCP server
         print("Testing tool binding with enhanced search enabled...")
@@ -0,0 +1,122 @@
+from typing import Any, Dict, List
+from unittest.mock import Mock, patch
+
+import anyio
+import pytest
+
+from mcp_server_datahub._single_flight import SingleFlight
+from mcp_server_datahub.mcp_server import _execute_graphql
+
+
+@pytest.mark.anyio
+async def test_single_flight_coalesces_concurrent_calls() -> None:
+    single_flight = SingleFlight[str, Dict[str, Any]]()
+    calls = 0
+    results: List[Dict[str, Any]] = []
+
+    async def fn() -> Dict[str, Any]:
+        nonlocal calls
+        calls += 1
+        await anyio.sleep(0.05)
+        return {"tags": ["a"]}
+
+    async def do(key: str) -> None:
+        result = await single_flight.do(key, fn)
+        result["tags"].append("mutated")
+        results.append(result)
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(3):
+            tg.start_soon(do, "same")
+        tg.start_soon(do, "other")
+
+    assert calls == 2
+    assert single_flight.coalesced == 2
+    assert single_flight.in_flight() == 0
+    # Each caller gets its own copy of the result.
+    assert results == [{"tags": ["a", "mutated"]}] * 4
+
+
+@pytest.mark.anyio
+async def test_single_flight_shares_errors() -> None:
+    single_flight = SingleFlight[str, int]()
+    errors: List[Exception] = []
+
+    async def fn() -> int:
+        await anyio.sleep(0.05)
+        raise ValueError("boom")
+
+    async def do() -> None:
+        try:
+            await single_flight.do("key", fn)
+        except ValueError as e:
+            errors.append(e)
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(do)
+        tg.start_soon(do)
+
+    assert len(errors) == 2
+    assert single_flight.coalesced == 1
+
+
+@pytest.mark.anyio
+async def test_single_flight_retries_when_leader_is_cancelled() -> None:
+    single_flight = SingleFlight[str, int]()
+    calls = 0
+
+    async def fn() -> int:
+        nonlocal calls
+        calls += 1
+        await anyio.sleep(0.1)
+        return calls
+
+    leader_scope = anyio.CancelScope()
+    follower_result: List[int] = []
+
+    async def leader() -> None:
+        with leader_scope:
+            await single_flight.do("key", fn)
+
+    async def follower() -> None:
+        follower_result.append(await single_flight.do("key", fn))
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(leader)
+        await anyio.sleep(0.01)
+        tg.start_soon(follower)
+        await anyio.sleep(0.01)
+        leader_scope.cancel()
+
+    assert follower_result == [2]
+    assert calls == 2
+
+
+@pytest.mark.anyio
+async def test_execute_graphql_coalesces_identical_requests() -> None:
+    graphql_client = Mock()
+
+    async def execute(query: str, **kwargs: Any) -> Dict[str, Any]:
+        await anyio.sleep(0.05)
+        return {"entity": {"urn": kwargs["variables"]["urn"]}}
+
+    graphql_client.execute.side_effect = execute
+    graph = Mock()
+
+    async def get(urn: str) -> None:
+        await _execute_graphql(
+            graph, query="query GetEntity { x }", variables={"urn": urn}
+        )
+
+    with (
+        patch("mcp_server_datahub.mcp_server._is_datahub_cloud", return_value=False),
+        patch(
+            "mcp_server_datahub.mcp_server._get_graphql_client",
+            return_value=graphql_client,
+        ),
+    ):
+        async with anyio.create_task_group() as tg:
+            for urn in ["urn:a", "urn:a", "urn:b"]:
+                tg.start_soon(get, urn)
+
+    assert graphql_client.execute.call_count == 2